@@ -0,0 +1,68 @@
+"""Add composite and JSONB indexes for scan query patterns
+
+The base tables are created by init_db (Base.metadata.create_all), which
+also creates these indexes on fresh databases; this revision adds them to
+existing ones. Indexes are built CONCURRENTLY so live tables stay writable.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-15 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        # Jobs per user by recency (dashboard / history)
+        op.create_index(
+            "ix_scan_jobs_user_id_created_at", "scan_jobs",
+            ["user_id", sa.text("created_at DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Pending/running jobs (queue monitoring, retention)
+        op.create_index(
+            "ix_scan_jobs_active_created_at", "scan_jobs", ["status", "created_at"],
+            postgresql_where=sa.text("status IN ('pending', 'running')"),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Results per job in keyset order: WHERE job_id = ? ORDER BY created_at, id
+        op.create_index(
+            "ix_scan_results_job_id_created_at_id", "scan_results",
+            ["job_id", "created_at", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Finding lookups by containment: raw_data @> '{"port": 22}'
+        op.create_index(
+            "ix_scan_results_raw_data_gin", "scan_results", ["raw_data"],
+            postgresql_using="gin", postgresql_ops={"raw_data": "jsonb_path_ops"},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "ix_reports_job_id", "reports", ["job_id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table in [
+            ("ix_reports_job_id", "reports"),
+            ("ix_scan_results_raw_data_gin", "scan_results"),
+            ("ix_scan_results_job_id_created_at_id", "scan_results"),
+            ("ix_scan_jobs_active_created_at", "scan_jobs"),
+            ("ix_scan_jobs_user_id_created_at", "scan_jobs"),
+        ]:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
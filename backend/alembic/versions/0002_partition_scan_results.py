@@ -0,0 +1,108 @@
+"""Partition scan_results by month on created_at
+
+Rebuilds scan_results as a RANGE-partitioned table with one partition per
+month plus a DEFAULT partition, copies existing rows across, and recreates
+the result indexes on the parent so every partition inherits them. The
+primary key becomes (id, created_at) because a partitioned table's unique
+constraints must include the partition key.
+
+ensure_scan_results_partition(month) creates a month's partition on demand;
+the maintenance tasks call it ahead of time and drop expired months.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-15 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ENSURE_PARTITION_FN = """
+CREATE OR REPLACE FUNCTION ensure_scan_results_partition(month date)
+RETURNS text AS $$
+DECLARE
+    start_date date := date_trunc('month', month)::date;
+    end_date date := (date_trunc('month', month) + interval '1 month')::date;
+    partition_name text := 'scan_results_' || to_char(start_date, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF scan_results FOR VALUES FROM (%L) TO (%L)',
+            partition_name, start_date, end_date
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE scan_results RENAME TO scan_results_unpartitioned")
+    op.execute("ALTER TABLE scan_results_unpartitioned RENAME CONSTRAINT scan_results_pkey TO scan_results_unpartitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_scan_results_job_id_created_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_scan_results_raw_data_gin")
+
+    op.execute("""
+        CREATE TABLE scan_results (
+            LIKE scan_results_unpartitioned INCLUDING DEFAULTS INCLUDING COMMENTS,
+            PRIMARY KEY (id, created_at),
+            FOREIGN KEY (job_id) REFERENCES scan_jobs (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(ENSURE_PARTITION_FN)
+    op.execute("CREATE TABLE scan_results_default PARTITION OF scan_results DEFAULT")
+
+    # One partition for every month that has data, plus the next three months
+    op.execute("""
+        SELECT ensure_scan_results_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', LEAST(COALESCE((SELECT min(created_at) FROM scan_results_unpartitioned), now()), now())),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        ) AS month
+    """)
+    op.execute("INSERT INTO scan_results SELECT * FROM scan_results_unpartitioned")
+    op.execute("DROP TABLE scan_results_unpartitioned")
+
+    op.create_index(
+        "ix_scan_results_job_id_created_at_id", "scan_results", ["job_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_scan_results_raw_data_gin", "scan_results", ["raw_data"],
+        postgresql_using="gin", postgresql_ops={"raw_data": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE scan_results RENAME TO scan_results_partitioned")
+    op.execute("""
+        CREATE TABLE scan_results (
+            LIKE scan_results_partitioned INCLUDING DEFAULTS INCLUDING COMMENTS,
+            CONSTRAINT scan_results_pkey PRIMARY KEY (id),
+            FOREIGN KEY (job_id) REFERENCES scan_jobs (id) ON DELETE CASCADE
+        )
+    """)
+    op.execute("INSERT INTO scan_results SELECT * FROM scan_results_partitioned")
+    op.execute("DROP TABLE scan_results_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_scan_results_partition(date)")
+
+    op.create_index(
+        "ix_scan_results_job_id_created_at_id", "scan_results", ["job_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_scan_results_raw_data_gin", "scan_results", ["raw_data"],
+        postgresql_using="gin", postgresql_ops={"raw_data": "jsonb_path_ops"},
+    )
@@ -0,0 +1,47 @@
+"""Drop the DEFAULT partition of scan_results
+
+Postgres refuses DETACH PARTITION ... CONCURRENTLY on a table that has a
+DEFAULT partition, which retention needs to expire month partitions without
+locking scan_results. Rows that landed in the default partition are moved
+into their month partitions (created on demand) and the default is dropped;
+retention keeps RETENTION_PARTITIONS_AHEAD months pre-created instead.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-02-03 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Month partitions cannot be created while the default holds their rows
+    op.execute("ALTER TABLE scan_results DETACH PARTITION scan_results_default")
+    op.execute("""
+        SELECT ensure_scan_results_partition(month::date)
+        FROM (
+            SELECT DISTINCT date_trunc('month', created_at) AS month FROM scan_results_default
+            UNION
+            SELECT generate_series(
+                date_trunc('month', now()), date_trunc('month', now()) + interval '3 months', interval '1 month'
+            )
+        ) AS months
+    """)
+    op.execute("INSERT INTO scan_results SELECT * FROM scan_results_default")
+    op.execute("DROP TABLE scan_results_default")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE TABLE scan_results_default PARTITION OF scan_results DEFAULT")
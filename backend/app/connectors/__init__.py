@@ -1,13 +1,7 @@
-import pkgutil
-import importlib
 from .base import BaseConnector
+from .registry import ConnectorRegistry, ConnectorSpec, MANIFEST
 
-connectors = {}
+# Connector modules are imported on first use, not here (see registry.py)
+connector_registry = ConnectorRegistry()
 
-# Auto-discover and register all connector subclasses
-for _, mod_name, _ in pkgutil.iter_modules(__path__):
-    mod = importlib.import_module(f"{__name__}.{mod_name}")
-
-# Register all subclasses of BaseConnector
-for cls in BaseConnector.__subclasses__():
-    connectors[cls.name] = cls() 
\ No newline at end of file
+connectors = connector_registry.connectors()
@@ -1,18 +1,57 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .runtime import ConnectorRuntime
 
 
 class BaseConnector(ABC):
     """Abstract OSINT connector"""
     
     name: str
+    scan_types: Tuple[str, ...] = ("domain",)  # Target kinds this connector handles ("domain", "email")
+    description: str = ""
+    inputs: Optional[Tuple[str, ...]] = None  # Entity kinds consumed ("domain", "email", "subdomain"...); None = the scan target only
+    outputs: Tuple[str, ...] = ()  # Entity kinds this connector's findings can feed downstream
+    timeout: Optional[float] = None  # Per-connector deadline, defaults to SCAN_CONNECTOR_TIMEOUT
+    dimensions: Tuple[str, ...] = ()  # OES dimensions ("D1".."D6") fed by this connector; empty = all
+    data_ttl: int = 0  # Seconds a previous finding is reused by incremental rescans without asking upstream
+    cache_ttl: int = 0  # Seconds a fetch() response stays fresh in the cache (0 = no cache)
+    cache_stale_ttl: int = 0  # Extra seconds a stale response is served while refreshing
+    rate_limit: Optional[float] = None  # Upstream calls per second across all workers (None = unlimited)
+    rate_burst: Optional[int] = None  # Bucket size, defaults to one second of rate_limit
     
     @abstractmethod
-    async def fetch(self, target: str) -> Dict:
-        """Fetch raw data from the OSINT source"""
+    async def fetch(self, target: str, runtime: Optional["ConnectorRuntime"] = None) -> Dict:
+        """
+        Fetch raw data from the OSINT source
+
+        HTTP-based connectors should issue requests through ``runtime`` (the
+        shared pooled client) rather than opening their own.
+        """
         pass
     
     @abstractmethod
     def normalize(self, raw: Dict) -> Dict:
         """Normalize raw data to standardized format"""
-        pass 
\ No newline at end of file
+        pass
+    
+    async def revalidate(
+        self,
+        target: str,
+        validators: Dict,
+        runtime: Optional["ConnectorRuntime"] = None
+    ) -> Optional[bool]:
+        """
+        Ask the source whether data fetched with ``validators`` has changed
+
+        ``validators`` are the ones the previous finding carried (ETag,
+        Last-Modified, a zone serial...). Return False when the source
+        confirms nothing changed, True when it has, or None when it cannot
+        tell; incremental rescans re-fetch on anything but False.
+        """
+        return None
+    
+    def discover(self, finding) -> Dict[str, List[str]]:
+        """Entities in a normalized finding that downstream connectors should consume"""
+        return {kind: values for kind, values in finding.entities.items() if kind in self.outputs}
@@ -0,0 +1,456 @@
+"""
+Two-tier cache for connector responses: an in-process LRU (L1) in front of Redis (L2)
+"""
+import asyncio
+import json
+import logging
+import time
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import replace, is_dataclass
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.connectors.singleflight import SingleFlight
+from app.connectors.ratelimit import RateLimiter, get_rate_limiter
+from app.schemas import ScanFinding
+
+logger = logging.getLogger("app.connectors.cache")
+
+# Delete the cross-worker flight lock at KEYS[1] only while it still holds this
+# worker's token (ARGV[1]), so a holder whose lock expired cannot release the
+# lock a newer holder took.
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def normalize_target(target: str) -> str:
+    """Canonical form of a domain or email used in cache keys"""
+    return target.strip().lower().rstrip(".")
+
+
+def connector_cache_ttl(conn) -> int:
+    """Fresh TTL in seconds declared by the connector (0 disables caching)"""
+    ttl = getattr(conn, "cache_ttl", None)
+    if isinstance(ttl, int) and not isinstance(ttl, bool) and ttl > 0:
+        return ttl
+    return 0
+
+
+def connector_stale_ttl(conn) -> int:
+    """Extra seconds a stale entry may be served while it is refreshed"""
+    stale = getattr(conn, "cache_stale_ttl", None)
+    if isinstance(stale, int) and not isinstance(stale, bool) and stale > 0:
+        return stale
+    return 0
+
+
+class LRUCache:
+    """
+    Size-bounded in-process LRU with per-entry TTL.
+
+    Capacity is tracked both as an entry count and as an approximate byte
+    total supplied by the caller, evicting least recently used entries until
+    both limits hold.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, _, value = item
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._data[key] = (time.monotonic() + ttl, size, value)
+        self.current_bytes += size
+        while len(self._data) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def delete(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.current_bytes -= item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.current_bytes = 0
+
+
+class ConnectorCache:
+    """
+    Caches connector responses keyed by (connector name, normalized target).
+
+    Every upstream conn.fetch() first waits on the connector's rate limit, so
+    cache hits never spend quota.
+
+    L2 entries in Redis are zlib-compressed JSON with their write time. An
+    entry younger than the connector's ``cache_ttl`` is fresh; after that it
+    is kept for ``cache_stale_ttl`` more seconds and served stale while a
+    single background refresh (guarded by a Redis lock) fetches a new copy.
+
+    Fresh fetch() and normalize() outputs are also kept in a per-process L1
+    LRU for at most CONNECTOR_L1_TTL seconds. Purges go through
+    ``invalidate``, which publishes the key so every worker drops its L1 copy;
+    L1 is only consulted while this worker is subscribed to those purges.
+
+    Identical concurrent lookups are coalesced: within a worker through
+    SingleFlight, and across workers through a Redis lock whose holder fetches
+    upstream and announces the filled key on a pub/sub channel that wakes the
+    other workers' waiters.
+    """
+
+    key_prefix = "connector-cache"
+    invalidation_channel = "connector-cache:invalidate"
+    filled_channel = "connector-cache:filled"
+
+    def __init__(self, redis=None, l1: Optional[LRUCache] = None, limiter: Optional[RateLimiter] = None):
+        self._redis = redis
+        self.limiter = limiter or get_rate_limiter()
+        self.l1 = l1 or LRUCache(settings.CONNECTOR_L1_MAX_ENTRIES, settings.CONNECTOR_L1_MAX_BYTES)
+        self.stats: Counter = Counter()
+        self._refreshes: Set[asyncio.Task] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self._l1_live = False
+        self.flights = SingleFlight()
+        self._fill_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._release_script = None
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from app.db.redis import redis_binary_client
+            self._redis = redis_binary_client
+        return self._redis
+
+    def key(self, name: str, target: str) -> str:
+        return f"{self.key_prefix}:{name}:{normalize_target(target)}"
+
+    @staticmethod
+    def encode(raw: Any, stored_at: Optional[float] = None) -> bytes:
+        payload = {"stored_at": stored_at or time.time(), "raw": raw}
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+
+    @staticmethod
+    def decode(blob: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(blob))
+
+    async def get(self, name: str, target: str) -> Optional[Dict[str, Any]]:
+        """Return the cached L2 entry ({"stored_at", "raw", "size"}) or None"""
+        try:
+            blob = await self.redis.get(self.key(name, target))
+        except Exception:
+            logger.warning("Connector cache read failed for %s", name, exc_info=True)
+            self.stats["errors"] += 1
+            return None
+        if not blob:
+            return None
+        entry = self.decode(blob)
+        entry["size"] = len(blob)
+        return entry
+
+    async def set(
+        self,
+        name: str,
+        target: str,
+        raw: Any,
+        ttl: int,
+        stale_ttl: int = 0,
+        stored_at: Optional[float] = None
+    ) -> int:
+        """
+        Store a response; the Redis key lives for ttl + stale_ttl seconds.
+
+        Returns the stored payload size in bytes (0 if it was not cached).
+        """
+        try:
+            blob = self.encode(raw, stored_at)
+        except (TypeError, ValueError):
+            logger.debug("Connector %s returned a non-JSON response, not caching", name)
+            return 0
+        try:
+            await self.redis.set(self.key(name, target), blob, ex=ttl + stale_ttl)
+        except Exception:
+            logger.warning("Connector cache write failed for %s", name, exc_info=True)
+            self.stats["errors"] += 1
+        return len(blob)
+
+    async def invalidate(self, name: str, target: str) -> None:
+        """Purge one connector/target pair from Redis and every worker's L1"""
+        key = self.key(name, target)
+        await self.redis.delete(key)
+        self._drop_l1(key)
+        await self.redis.publish(self.invalidation_channel, key)
+
+    def _drop_l1(self, key: str) -> None:
+        self.l1.delete(f"{key}|raw")
+        self.l1.delete(f"{key}|normalized")
+
+    def _l1_get(self, key: str) -> Optional[Any]:
+        return self.l1.get(key) if self._l1_live else None
+
+    def _l1_set(self, key: str, value: Any, ttl: int, size: int) -> None:
+        if self._l1_live:
+            self.l1.set(key, value, min(ttl, settings.CONNECTOR_L1_TTL), size)
+
+    async def _upstream(self, conn, target: str, runtime) -> Any:
+        """Call the connector's source once its rate limit allows"""
+        await self.limiter.acquire(conn)
+        return await conn.fetch(target, runtime=runtime)
+
+    async def _fetch_raw(self, conn, target: str, runtime, ttl: int) -> Tuple[Any, bool, int, float]:
+        """L1 -> Redis -> upstream; returns (raw, fresh, payload size, time it was fetched upstream)"""
+        key = self.key(conn.name, target)
+        cached = self._l1_get(f"{key}|raw")
+        if cached is not None:
+            self.stats[f"{conn.name}:l1_hit"] += 1
+            return cached[0], True, cached[1], cached[2]
+        return await self.flights.do(key, lambda: self._fetch_shared(conn, target, runtime, ttl))
+
+    async def _fetch_shared(self, conn, target: str, runtime, ttl: int) -> Tuple[Any, bool, int, float]:
+        """The single in-loop flight for a key: Redis, then upstream via the cross-worker lock"""
+        name = conn.name
+        key = self.key(name, target)
+        entry = await self.get(name, target)
+        if entry is not None:
+            if time.time() - entry["stored_at"] < ttl:
+                self.stats[f"{name}:hit"] += 1
+                self._l1_set(f"{key}|raw", (entry["raw"], entry["size"], entry["stored_at"]), ttl, entry["size"])
+                return entry["raw"], True, entry["size"], entry["stored_at"]
+            self.stats[f"{name}:stale"] += 1
+            self._schedule_refresh(conn, target, runtime, ttl)
+            return entry["raw"], False, entry["size"], entry["stored_at"]
+
+        self.stats[f"{name}:miss"] += 1
+        token = None
+        if self._l1_live:
+            coalesced, token = await self._follow_other_worker(conn, target, ttl)
+            if coalesced is not None:
+                return coalesced
+
+        try:
+            raw = await self._upstream(conn, target, runtime)
+            stored_at = time.time()
+            size = await self.set(name, target, raw, ttl, connector_stale_ttl(conn), stored_at)
+        finally:
+            # Followers re-read Redis as soon as the fill is written (or the fetch failed)
+            if token is not None:
+                await self._release_lock(key, token)
+        if size:
+            self._l1_set(f"{key}|raw", (raw, size, stored_at), ttl, size)
+        return raw, True, size, stored_at
+
+    async def _follow_other_worker(
+        self, conn, target: str, ttl: int
+    ) -> Tuple[Optional[Tuple[Any, bool, int, float]], Optional[str]]:
+        """
+        Take the cross-worker fetch lock, or wait for its holder's result.
+
+        Returns (the other worker's result, None), or (None, lock token) when
+        this worker won the lock and must fetch upstream and then release it,
+        or (None, None) when it should fetch without the lock (the holder
+        failed or Redis is unavailable).
+        """
+        key = self.key(conn.name, target)
+        lock_key = f"{key}:inflight"
+        try:
+            token = uuid.uuid4().hex
+            if await self.redis.set(lock_key, token, ex=settings.CONNECTOR_FLIGHT_LOCK_TTL, nx=True):
+                return None, token
+        except Exception:
+            logger.warning("Connector flight lock failed for %s", conn.name, exc_info=True)
+            return None, None
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._fill_waiters.setdefault(key, []).append(waiter)
+        try:
+            # The holder may have finished between our cache miss and subscribing
+            entry = await self.get(conn.name, target)
+            if entry is None:
+                await asyncio.wait_for(waiter, settings.CONNECTOR_FLIGHT_LOCK_TTL)
+                entry = await self.get(conn.name, target)
+        except asyncio.TimeoutError:
+            entry = None
+        finally:
+            waiters = self._fill_waiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._fill_waiters.pop(key, None)
+
+        if entry is None:
+            return None, None
+        self.stats[f"{conn.name}:coalesced"] += 1
+        self._l1_set(f"{key}|raw", (entry["raw"], entry["size"], entry["stored_at"]), ttl, entry["size"])
+        return (entry["raw"], True, entry["size"], entry["stored_at"]), None
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        """Release the flight lock if this worker still holds it, and wake followers"""
+        try:
+            if self._release_script is None:
+                self._release_script = self.redis.register_script(RELEASE_LOCK_LUA)
+            await self._release_script(keys=[f"{key}:inflight"], args=[token])
+            await self.redis.publish(self.filled_channel, key)
+        except Exception:
+            logger.warning("Connector flight lock release failed for %s", key, exc_info=True)
+
+    def _wake_fill_waiters(self, key: str) -> None:
+        for waiter in self._fill_waiters.pop(key, []):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def fetch(self, conn, target: str, runtime=None) -> Any:
+        """
+        conn.fetch() through the cache.
+
+        Connectors without a positive ``cache_ttl`` are called directly.
+        """
+        ttl = connector_cache_ttl(conn)
+        if not ttl:
+            return await self.flights.do(
+                f"{conn.name}:{normalize_target(target)}",
+                lambda: self._upstream(conn, target, runtime)
+            )
+        self.ensure_invalidation_listener()
+        raw, _, _, _ = await self._fetch_raw(conn, target, runtime, ttl)
+        return raw
+
+    async def fetch_normalized(self, conn, target: str, runtime=None) -> Any:
+        """
+        conn.normalize(conn.fetch()) with the normalized output also kept in L1
+
+        A ScanFinding served from cache keeps the time its response was
+        fetched upstream as ``fetched_at``, not the time of the cache hit.
+        """
+        ttl = connector_cache_ttl(conn)
+        if not ttl:
+            raw = await self.flights.do(
+                f"{conn.name}:{normalize_target(target)}",
+                lambda: self._upstream(conn, target, runtime)
+            )
+            return conn.normalize(raw)
+        self.ensure_invalidation_listener()
+
+        key = f"{self.key(conn.name, target)}|normalized"
+        finding = self._l1_get(key)
+        if finding is not None:
+            self.stats[f"{conn.name}:l1_hit"] += 1
+            # Hand out a copy so callers cannot mutate the cached finding
+            return replace(finding) if is_dataclass(finding) else finding
+
+        raw, fresh, size, stored_at = await self._fetch_raw(conn, target, runtime, ttl)
+        finding = conn.normalize(raw)
+        if isinstance(finding, ScanFinding) and finding.fetched_at is None:
+            finding.fetched_at = stored_at
+        if fresh and size:
+            self._l1_set(key, finding, ttl, size)
+            return replace(finding) if is_dataclass(finding) else finding
+        return finding
+
+    def ensure_invalidation_listener(self) -> None:
+        """Start the pub/sub listener on the running loop if it is not already up"""
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._l1_live = False
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def _listen_for_invalidations(self) -> None:
+        """Drop L1 entries purged by any worker and wake waiters for filled keys"""
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.invalidation_channel, self.filled_channel)
+                # Purges may have been missed while disconnected
+                self.l1.clear()
+                self._l1_live = True
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    key = message["data"]
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    channel = message.get("channel")
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    if channel == self.filled_channel:
+                        self._wake_fill_waiters(key)
+                    elif key == "*":
+                        self.l1.clear()
+                    else:
+                        self._drop_l1(key)
+            except asyncio.CancelledError:
+                self._l1_live = False
+                raise
+            except Exception:
+                logger.warning("Connector cache invalidation listener failed, L1 disabled until reconnect", exc_info=True)
+            self._l1_live = False
+            self.l1.clear()
+            for key in list(self._fill_waiters):
+                self._wake_fill_waiters(key)
+            await asyncio.sleep(settings.CONNECTOR_L1_RECONNECT_DELAY)
+
+    async def aclose(self) -> None:
+        """Stop the invalidation listener and any in-flight refreshes"""
+        tasks = [t for t in [self._listener, *self._refreshes] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._listener = None
+        self._l1_live = False
+        self.l1.clear()
+
+    def _schedule_refresh(self, conn, target: str, runtime, ttl: int) -> None:
+        task = asyncio.create_task(self._refresh(conn, target, runtime, ttl))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, conn, target: str, runtime, ttl: int) -> None:
+        """Revalidate a stale entry; only one worker refreshes a key at a time"""
+        key = self.key(conn.name, target)
+        try:
+            if not await self.redis.set(f"{key}:refresh", b"1", ex=settings.CONNECTOR_CACHE_REFRESH_LOCK, nx=True):
+                return
+            raw = await self._upstream(conn, target, runtime)
+            await self.set(conn.name, target, raw, ttl, connector_stale_ttl(conn))
+            self.stats[f"{conn.name}:refresh"] += 1
+        except Exception:
+            logger.warning("Background refresh failed for %s %s", conn.name, target, exc_info=True)
+
+
+_cache: Optional[ConnectorCache] = None
+
+
+def get_connector_cache() -> ConnectorCache:
+    """Process-wide connector cache"""
+    global _cache
+    if _cache is None:
+        _cache = ConnectorCache()
+    return _cache
+
+
+async def close_connector_cache() -> None:
+    """Shut down the process-wide cache's background tasks (worker shutdown)"""
+    if _cache is not None:
+        await _cache.aclose()
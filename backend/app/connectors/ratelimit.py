@@ -0,0 +1,129 @@
+"""
+Distributed token-bucket rate limiting for connector upstream calls
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("app.connectors.ratelimit")
+
+# Reserve `requested` tokens from the bucket at KEYS[1] and return how long the
+# caller must wait before using them. Tokens may go negative, which queues
+# callers fairly instead of having them race and retry. Uses the Redis server
+# clock so every worker agrees on elapsed time.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - requested
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+if tokens >= 0 then
+  return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+def connector_rate(conn) -> Optional[Tuple[float, float]]:
+    """(tokens per second, burst) declared by the connector, or None if unlimited"""
+    rate = getattr(conn, "rate_limit", None)
+    if not isinstance(rate, (int, float)) or isinstance(rate, bool) or rate <= 0:
+        return None
+    burst = getattr(conn, "rate_burst", None)
+    if not isinstance(burst, (int, float)) or isinstance(burst, bool) or burst <= 0:
+        burst = max(1.0, float(rate))
+    return float(rate), float(burst)
+
+
+class LocalTokenBucket:
+    """In-process token bucket, used when Redis is unreachable"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.ts = time.monotonic()
+
+    def reserve(self, requested: float = 1.0) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate) - requested
+        self.ts = now
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter shared by every worker through one Redis key per connector.
+
+    Connectors declare ``rate_limit`` (tokens per second) and optionally
+    ``rate_burst``. ``acquire`` reserves a token atomically in Redis and sleeps
+    for the returned wait, recording per-connector wait-time metrics. If Redis
+    is unavailable the limiter degrades to a per-process bucket.
+    """
+
+    key_prefix = "connector-ratelimit"
+
+    def __init__(self, redis=None):
+        self._redis = redis
+        self._script = None
+        self._local: Dict[str, LocalTokenBucket] = {}
+        self.metrics: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        )
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from app.db.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+    async def _reserve(self, name: str, rate: float, burst: float) -> float:
+        try:
+            if self._script is None:
+                self._script = self.redis.register_script(TOKEN_BUCKET_LUA)
+            wait = await self._script(keys=[f"{self.key_prefix}:{name}"], args=[rate, burst, 1])
+            return float(wait)
+        except Exception:
+            logger.warning("Rate limiter unavailable for %s, using local bucket", name, exc_info=True)
+            bucket = self._local.get(name)
+            if bucket is None:
+                bucket = self._local[name] = LocalTokenBucket(rate, burst)
+            return bucket.reserve()
+
+    async def acquire(self, conn) -> float:
+        """Wait for one token of the connector's quota; returns seconds waited"""
+        limits = connector_rate(conn)
+        if limits is None:
+            return 0.0
+        name = conn.name
+        wait = await self._reserve(name, *limits)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        stats = self.metrics[name]
+        stats["acquired"] += 1
+        if wait > 0:
+            stats["waited"] += 1
+            stats["wait_seconds"] += wait
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+        return wait
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide rate limiter"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter()
+    return _limiter
@@ -0,0 +1,243 @@
+"""
+Connector registry: a manifest of connectors whose modules are imported on first use
+"""
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from .base import BaseConnector
+
+logger = logging.getLogger("app.connectors.registry")
+
+# Third-party packages can ship connectors under this entry point group
+ENTRY_POINT_GROUP = "revealme.connectors"
+
+
+@dataclass(frozen=True)
+class ConnectorSpec:
+    """Everything known about a connector without importing it"""
+
+    name: str
+    target: str  # "module:ClassName"
+    scan_types: Tuple[str, ...] = ("domain",)
+    description: str = ""
+    enabled: bool = True  # Default, overridable through CONNECTORS_ENABLED/CONNECTORS_DISABLED
+    source: str = "manifest"
+
+    @property
+    def module(self) -> str:
+        return self.target.partition(":")[0]
+
+
+# Built-in connectors. Adding one means adding its spec here; the module is
+# only imported when a scan (or the admin API) first asks for it.
+MANIFEST: Tuple[ConnectorSpec, ...] = (
+    ConnectorSpec(
+        name="whois",
+        target="app.connectors.whois:WhoisConnector",
+        scan_types=("domain",),
+        description="Domain registration details (registrar, expiry, contacts)",
+    ),
+)
+
+
+class ConnectorRegistry:
+    """
+    Lazily instantiated connectors keyed by name
+    
+    Specs come from MANIFEST plus the revealme.connectors entry point group.
+    A connector's module is imported and its singleton created the first
+    time it is requested; import time is recorded for the admin metadata.
+    """
+
+    def __init__(self, specs: Optional[Tuple[ConnectorSpec, ...]] = None, discover: bool = True):
+        self._specs: Dict[str, ConnectorSpec] = {}
+        self._instances: Dict[str, BaseConnector] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for spec in specs if specs is not None else MANIFEST:
+            self.register(spec)
+        if discover:
+            self._discover_entry_points()
+
+    def register(self, spec: ConnectorSpec) -> None:
+        """Add a connector spec (later registrations replace earlier ones)"""
+        self._specs[spec.name] = spec
+        self._instances.pop(spec.name, None)
+
+    def _discover_entry_points(self) -> None:
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            if ep.name in self._specs:
+                continue
+            # Plugin metadata lives on the class; it is read when the plugin loads
+            self.register(ConnectorSpec(name=ep.name, target=ep.value, scan_types=(), source="entry_point"))
+
+    def spec(self, name: str) -> ConnectorSpec:
+        return self._specs[name]
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def is_enabled(self, name: str) -> bool:
+        """Feature flag check: CONNECTORS_DISABLED wins, CONNECTORS_ENABLED (if set) is an allow-list"""
+        if name in settings.CONNECTORS_DISABLED:
+            return False
+        if settings.CONNECTORS_ENABLED:
+            return name in settings.CONNECTORS_ENABLED
+        return self._specs[name].enabled
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> BaseConnector:
+        """
+        The connector's singleton, importing its module on first use
+        
+        Raises:
+            KeyError: If no connector of that name is registered
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        spec = self._specs[name]
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                module_name, _, class_name = spec.target.partition(":")
+                try:
+                    cls = getattr(importlib.import_module(module_name), class_name)
+                except Exception as exc:
+                    self._errors[name] = f"{type(exc).__name__}: {exc}"
+                    raise
+                instance = cls()
+                self._load_seconds[name] = time.perf_counter() - started
+                self._errors.pop(name, None)
+                if not spec.scan_types:
+                    self._specs[name] = ConnectorSpec(
+                        name=name,
+                        target=spec.target,
+                        scan_types=tuple(getattr(cls, "scan_types", ("domain",))),
+                        description=getattr(cls, "description", "") or (cls.__doc__ or "").strip(),
+                        enabled=spec.enabled,
+                        source=spec.source,
+                    )
+                self._instances[name] = instance
+        return instance
+
+    def for_scan_type(self, scan_type: str) -> Dict[str, BaseConnector]:
+        """
+        Enabled connectors that handle a scan type, imported on demand
+        
+        Connectors that fail to import are logged and left out so one broken
+        plugin cannot fail every scan.
+        """
+        selected = {}
+        for name in self.names():
+            if not self.is_enabled(name):
+                continue
+            if self._specs[name].scan_types == ():
+                # Entry point plugins declare their scan types on the class
+                try:
+                    self.get(name)
+                except Exception:
+                    logger.exception("Connector %s failed to load", name)
+                    continue
+            if scan_type not in self._specs[name].scan_types:
+                continue
+            try:
+                selected[name] = self.get(name)
+            except Exception:
+                logger.exception("Connector %s failed to load", name)
+        return selected
+
+    def for_scan_graph(self, scan_type: str) -> Dict[str, BaseConnector]:
+        """
+        Connectors for a scan type plus those consuming what they discover
+
+        Follows declared ``outputs`` transitively, so a domain scan also pulls
+        in email connectors when a domain connector discovers emails.
+        """
+        selected: Dict[str, BaseConnector] = {}
+        kinds, frontier = set(), [scan_type]
+        while frontier:
+            kind = frontier.pop()
+            if kind in kinds:
+                continue
+            kinds.add(kind)
+            for name, conn in self.for_scan_type(kind).items():
+                if name in selected:
+                    continue
+                inputs = getattr(conn, "inputs", None)
+                if kind != scan_type and (inputs is None or kind not in inputs):
+                    # Only runs on scan targets, never on discovered entities
+                    continue
+                selected[name] = conn
+                frontier.extend(getattr(conn, "outputs", ()))
+        return selected
+
+    def load_all(self) -> None:
+        """Import every registered connector (the old eager behaviour)"""
+        for name in self.names():
+            self.get(name)
+
+    def metadata(self) -> List[Dict[str, Any]]:
+        """Admin view of every connector, without importing any"""
+        items = []
+        for name, spec in self._specs.items():
+            item = {
+                "id": name,
+                "name": name,
+                "description": spec.description,
+                "scan_types": list(spec.scan_types),
+                "module": spec.module,
+                "source": spec.source,
+                "enabled": self.is_enabled(name),
+                "status": "active" if self.is_enabled(name) else "inactive",
+                "loaded": self.is_loaded(name),
+            }
+            if name in self._errors:
+                item["error"] = self._errors[name]
+            if self.is_loaded(name):
+                cls = type(self._instances[name])
+                item.update({
+                    "load_seconds": round(self._load_seconds[name], 6),
+                    "timeout": cls.timeout,
+                    "cache_ttl": cls.cache_ttl,
+                    "rate_limit": cls.rate_limit,
+                })
+            items.append(item)
+        return items
+
+    def connectors(self) -> "LazyConnectors":
+        """Mapping view of every enabled connector, loading each on access"""
+        return LazyConnectors(self)
+
+
+class LazyConnectors(Mapping):
+    """
+    Read-only ``{name: connector}`` mapping over the enabled connectors
+    
+    Keeps ``from app.connectors import connectors`` working: membership and
+    iteration need no imports, item access loads the connector.
+    """
+
+    def __init__(self, registry: ConnectorRegistry):
+        self._registry = registry
+
+    def __getitem__(self, name: str) -> BaseConnector:
+        if name not in self._registry.names() or not self._registry.is_enabled(name):
+            raise KeyError(name)
+        return self._registry.get(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self._registry.names() if self._registry.is_enabled(name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -0,0 +1,154 @@
+"""
+Connector runtime: the shared transport injected into every connector fetch
+"""
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+
+class ConnectorRuntime:
+    """
+    Owns one pooled httpx.AsyncClient per event loop.
+
+    Connections are kept alive and multiplexed over HTTP/2 across all
+    connectors and scans, with a global pool limit plus a per-host cap so one
+    upstream cannot take every connection.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.max_connections = max_connections or settings.CONNECTOR_HTTP_MAX_CONNECTIONS
+        self.max_keepalive_connections = (
+            max_keepalive_connections or settings.CONNECTOR_HTTP_MAX_KEEPALIVE
+        )
+        self.max_connections_per_host = (
+            max_connections_per_host or settings.CONNECTOR_HTTP_MAX_PER_HOST
+        )
+        self.timeout = timeout or settings.CONNECTOR_HTTP_TIMEOUT
+        self.http2 = settings.CONNECTOR_HTTP2 if http2 is None else http2
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._loop_guard = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client, created on first use so idle scans open no sockets"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=settings.CONNECTOR_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                headers={"User-Agent": "Reveal.me OSINT scanner"},
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def host_slot(self, url: str):
+        """Hold one of the per-host connection slots for the duration of a call"""
+        host = urlsplit(url).netloc
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        async with slot:
+            yield
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Issue a request on the shared client under the per-host limit"""
+        async with self.host_slot(url):
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @staticmethod
+    def validators(response: httpx.Response) -> Dict[str, str]:
+        """ETag / Last-Modified of a response, to store on its finding"""
+        found = {}
+        if response.headers.get("etag"):
+            found["etag"] = response.headers["etag"]
+        if response.headers.get("last-modified"):
+            found["last_modified"] = response.headers["last-modified"]
+        return found
+
+    async def not_modified(self, url: str, validators: Dict[str, str], **kwargs) -> Optional[bool]:
+        """
+        Conditional GET against stored validators
+
+        Returns True on 304 Not Modified, False when the resource changed and
+        None when there is nothing to validate with.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        if not headers.keys() & {"If-None-Match", "If-Modified-Since"}:
+            return None
+        response = await self.get(url, headers=headers, **kwargs)
+        return response.status_code == 304
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._host_slots.clear()
+
+
+# httpx clients are bound to the loop they were created on, so keep one
+# runtime per loop (in practice: the worker's long-lived scan loop)
+_runtimes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ConnectorRuntime]" = weakref.WeakKeyDictionary()
+
+
+async def _close_with_loop(runtime: ConnectorRuntime):
+    """
+    Suspended for the life of the loop; loop.shutdown_asyncgens() (run by
+    asyncio.run and at worker shutdown) finalizes it, closing the runtime on
+    the loop that owns its connections
+    """
+    try:
+        yield
+    finally:
+        await runtime.aclose()
+
+
+async def _start(guard) -> None:
+    await guard.__anext__()
+
+
+def get_connector_runtime() -> ConnectorRuntime:
+    """Return the runtime for the running event loop"""
+    loop = asyncio.get_running_loop()
+    runtime = _runtimes.get(loop)
+    if runtime is None:
+        runtime = _runtimes[loop] = ConnectorRuntime()
+        # The loop only tracks async generators weakly
+        runtime._loop_guard = _close_with_loop(runtime)
+        loop.create_task(_start(runtime._loop_guard))
+    return runtime
+
+
+async def close_connector_runtime() -> None:
+    """Close the running loop's runtime (called at worker shutdown)"""
+    runtime = _runtimes.pop(asyncio.get_running_loop(), None)
+    if runtime is not None:
+        await runtime.aclose()
@@ -1,5 +1,6 @@
 from .base import BaseConnector
-from typing import Dict
+from .runtime import ConnectorRuntime
+from typing import Dict, Optional
 from app.schemas import ScanFinding
 
 
@@ -7,8 +8,18 @@ class WhoisConnector(BaseConnector):
     """WHOIS connector for domain information"""
     
     name = "whois"
+    scan_types = ("domain",)
+    description = "Domain registration details (registrar, expiry, contacts)"
+    inputs = ("domain",)
+    outputs = ("email",)  # Registrant and admin contacts feed breach lookups
+    dimensions = ("D1",)
+    cache_ttl = 24 * 60 * 60  # Registration data changes on a scale of days
+    cache_stale_ttl = 6 * 60 * 60
+    data_ttl = 24 * 60 * 60  # WHOIS has no change signal, so rescans trust a day-old record
+    rate_limit = 2.0  # Registries throttle aggressive WHOIS clients
+    rate_burst = 5
     
-    async def fetch(self, target: str) -> Dict:
+    async def fetch(self, target: str, runtime: Optional[ConnectorRuntime] = None) -> Dict:
         """Fetch WHOIS data for the target domain"""
         # TODO: call python-whois or external API
         return {"raw": {"domain": target}}
@@ -16,4 +27,5 @@ class WhoisConnector(BaseConnector):
     def normalize(self, raw: dict) -> ScanFinding:
         """Normalize WHOIS data to standardized format"""
         # TODO: map raw to standardized fields
-        return ScanFinding(category="whois", details=raw) 
\ No newline at end of file
+        emails = raw.get("raw", {}).get("emails") or []
+        return ScanFinding(category="whois", details=raw, entities={"email": list(emails)} if emails else {}) 
\ No newline at end of file
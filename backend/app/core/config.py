@@ -39,6 +39,16 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = Field(default="your-secret-key-here")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_PRINCIPAL_CACHE_TTL: int = 60  # Redis lifetime of a cached user principal (seconds)
+    AUTH_PRINCIPAL_L1_TTL: float = 10.0  # In-process lifetime of a cached user principal
+    AUTH_PRINCIPAL_L1_MAX_ENTRIES: int = 10_000
+    
+    # Password hashing
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Hashes below this cost are rehashed on login
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4  # Executor size
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4  # bcrypt calls in flight per process; the rest queue
+    PASSWORD_REHASH_ON_LOGIN: bool = True  # Upgrade outdated hashes after a successful login
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:5174"]
@@ -46,6 +56,8 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379")
     CELERY_RESULT_BACKEND: str = Field(default="redis://localhost:6379")
+    CELERY_SCAN_CONCURRENCY: int = 64  # Threads per scan worker; all share one asyncio loop
+    CELERY_REPORT_CONCURRENCY: int = 2  # Prefork children per report worker (each with its PDF pool)
     
     # Application
     DEBUG: bool = True
@@ -56,9 +68,69 @@ class Settings(BaseSettings):
     SPIDERFOOT_URL: str = "http://spiderfoot:8080"
     SPIDERFOOT_API_KEY: str = ""
     
+    # Scans
+    SCAN_MAX_CONCURRENCY: int = 8  # Connectors running at once per scan
+    SCAN_CONNECTOR_TIMEOUT: float = 120.0  # Default per-connector deadline (seconds)
+    SCAN_TIMEOUT: float = 20 * 60  # Whole-scan deadline, below Celery's soft limit
+    SCAN_GRAPH_MAX_DEPTH: int = 3  # Hops of discovered entities followed from the target
+    SCAN_GRAPH_MAX_ENTITIES: int = 200  # Discovered entities followed per kind and scan
+    SCAN_BATCH_CONCURRENCY: int = 32  # Targets in flight per worker in batch scans
+    SCAN_BATCH_CONNECTOR_CONCURRENCY: int = 128  # Connector calls shared across a batch
+    SCAN_RESULTS_BATCH_SIZE: int = 5000  # Rows per COPY batch when persisting findings
+    SCAN_RESULTS_PAGE_SIZE: int = 100  # Default page size for GET /scans/{job_id}/results
+    SCAN_RESULTS_MAX_PAGE_SIZE: int = 1000
+    SCAN_RESULTS_STREAM_CHUNK: int = 500  # Rows per server-side cursor fetch in NDJSON mode
+    SCAN_EVENTS_TTL: int = 3600  # How long a scan's event backlog is kept for late subscribers
+    SCAN_EVENTS_HEARTBEAT: float = 15.0  # Seconds between SSE keep-alives
+    
+    # Scoring
+    SCORING_DISTINCT_EXACT_LIMIT: int = 4096  # Distinct emails/subdomains counted exactly before estimating
+    SCORING_RULES_FILE: Optional[str] = None  # JSON rule spec replacing the built-in PRD table
+    
+    # Connector registry (feature flags)
+    CONNECTORS_ENABLED: List[str] = []  # Allow-list; empty means every connector enabled by default
+    CONNECTORS_DISABLED: List[str] = []  # Always off, wins over CONNECTORS_ENABLED
+    
+    # Connector HTTP transport (shared pooled client)
+    CONNECTOR_HTTP_MAX_CONNECTIONS: int = 100
+    CONNECTOR_HTTP_MAX_KEEPALIVE: int = 50
+    CONNECTOR_HTTP_MAX_PER_HOST: int = 10
+    CONNECTOR_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    CONNECTOR_HTTP_TIMEOUT: float = 30.0
+    CONNECTOR_HTTP2: bool = True
+    CONNECTOR_CACHE_REFRESH_LOCK: int = 60  # Seconds one worker owns a stale-entry refresh
+    CONNECTOR_L1_TTL: int = 300  # In-process cache lifetime cap (seconds)
+    CONNECTOR_L1_MAX_ENTRIES: int = 10_000
+    CONNECTOR_L1_MAX_BYTES: int = 64 * 1024 * 1024
+    CONNECTOR_L1_RECONNECT_DELAY: float = 5.0
+    CONNECTOR_FLIGHT_LOCK_TTL: int = 130  # Cross-worker single-flight lock, > SCAN_CONNECTOR_TIMEOUT
+    
+    # Retention
+    SCAN_RETENTION_DAYS: int = 90  # Scan jobs, results and their reports older than this are deleted
+    REPORT_RETENTION_DAYS: int = 90  # Reports older than this are deleted
+    RETENTION_BATCH_SIZE: int = 5000  # Rows per delete transaction
+    RETENTION_BATCH_SLEEP: float = 0.2  # Pause between batches (seconds) to cap WAL rate and I/O
+    RETENTION_LOCK_TIMEOUT_MS: int = 500  # Give up a batch rather than queue API queries behind it
+    RETENTION_STATEMENT_TIMEOUT_MS: int = 30_000
+    RETENTION_LOCK_RETRIES: int = 3
+    RETENTION_UNLINK_WORKERS: int = 8  # Threads unlinking report files
+    RETENTION_PARTITIONS_AHEAD: int = 3  # scan_results month partitions kept pre-created
+    RETENTION_SCHEDULE_HOUR: int = 3  # UTC hour of the nightly cleanup
+    
     # Reports
     REPORT_OUTPUT_DIR: str = "/app/reports"
-    REPORT_ENCRYPTION_KEY: str = ""
+    REPORT_ENCRYPTION_KEY: str = ""  # Base64/hex AES key; reports are encrypted at rest when set
+    REPORT_ENCRYPTION_SEGMENT_SIZE: int = 64 * 1024  # Plaintext bytes per AES-GCM segment
+    REPORT_TEMPLATE_DIR: str = ""  # Override for app/templates/reports
+    REPORT_PDF_WORKERS: int = 2  # WeasyPrint processes per worker; 0 renders inline
+    REPORT_RENDER_TIMEOUT: float = 300.0  # Seconds one PDF conversion may take
+    REPORT_MAX_FINDINGS: int = 500  # Findings listed in a report; the rest are counted
+    
+    @validator("CONNECTORS_ENABLED", "CONNECTORS_DISABLED", pre=True)
+    def split_connector_names(cls, v):
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        return v
     
     @validator("CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v):
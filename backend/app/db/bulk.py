@@ -0,0 +1,61 @@
+"""
+Bulk write helpers for high-volume tables
+"""
+import json
+import uuid
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def batched(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``size`` items"""
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+async def copy_rows(
+    db: AsyncSession,
+    table: Table,
+    rows: Iterable[Dict[str, Any]],
+    columns: Sequence[str],
+    batch_size: int,
+    json_columns: Sequence[str] = ()
+) -> int:
+    """
+    Write rows with one round trip per batch.
+
+    On asyncpg this streams each batch through COPY (copy_records_to_table);
+    other drivers fall back to a multi-row INSERT. Columns left out of
+    ``columns`` get their server defaults. Returns the number of rows written.
+    """
+    connection = await db.connection()
+    written = 0
+    if connection.dialect.driver == "asyncpg":
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        for batch in batched(rows, batch_size):
+            records = [
+                tuple(
+                    json.dumps(row[c]) if c in json_columns else row[c]
+                    for c in columns
+                )
+                for row in batch
+            ]
+            await driver.copy_records_to_table(
+                table.name, records=records, columns=list(columns), schema_name=table.schema
+            )
+            written += len(records)
+    else:
+        for batch in batched(rows, batch_size):
+            await connection.execute(insert(table).values([{c: row[c] for c in columns} for row in batch]))
+            written += len(batch)
+    return written
+
+
+def new_ids(count: int) -> List[uuid.UUID]:
+    """Client-side primary keys, so COPY callers know the ids they wrote"""
+    return [uuid.uuid4() for _ in range(count)]
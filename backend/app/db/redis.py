@@ -14,6 +14,9 @@ redis_client = aioredis.from_url(
     decode_responses=True
 )
 
+# Binary-safe connection for compressed payloads (connector cache)
+redis_binary_client = aioredis.from_url(settings.REDIS_URL)
+
 
 async def get_redis() -> AsyncGenerator[aioredis.Redis, None]:
     """
@@ -36,4 +39,5 @@ async def close_redis():
     """
     Close Redis connection
     """
-    await redis_client.close() 
\ No newline at end of file
+    await redis_client.close()
+    await redis_binary_client.close() 
\ No newline at end of file
@@ -10,6 +10,7 @@ import sys
 from app.core.config import settings
 from app.utils.logging import setup_logging
 from app.routers import auth, scans, reports, admin
+from app.utils.security import password_hasher
 
 # Setup logging before app creation
 setup_logging()
@@ -44,6 +45,11 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "ok"}
 
+@app.on_event("shutdown")
+async def shutdown_password_hasher():
+    """Release the password hashing executor"""
+    password_hasher.shutdown(wait=False)
+
 # Global exception handler
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
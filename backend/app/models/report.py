@@ -27,6 +27,7 @@ class Report(Base, TimestampMixin):
         PostgresUUID(as_uuid=True), 
         ForeignKey("scan_jobs.id", ondelete="CASCADE"), 
         nullable=False,
+        index=True,
         comment="ID of the scan job this report belongs to"
     )
     
@@ -1,7 +1,7 @@
 """
 ScanJob model for managing scan operations
 """
-from sqlalchemy import Column, String, Enum, UUID, ForeignKey
+from sqlalchemy import Column, String, Enum, UUID, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 import sqlalchemy as sql
@@ -14,6 +14,17 @@ class ScanJob(Base, TimestampMixin):
     """ScanJob model for tracking scan operations"""
     
     __tablename__ = "scan_jobs"
+    __table_args__ = (
+        # Jobs per user by recency
+        Index("ix_scan_jobs_user_id_created_at", "user_id", sql.text("created_at DESC")),
+        # Pending/running jobs
+        Index(
+            "ix_scan_jobs_active_created_at",
+            "status",
+            "created_at",
+            postgresql_where=sql.text("status IN ('pending', 'running')"),
+        ),
+    )
     
     # Primary key using UUID
     id = Column(
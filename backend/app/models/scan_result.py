@@ -1,7 +1,7 @@
 """
 ScanResult model for storing scan findings
 """
-from sqlalchemy import Column, String, Float, UUID, ForeignKey
+from sqlalchemy import Column, String, Float, UUID, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID, JSONB
 import sqlalchemy as sql
@@ -13,6 +13,19 @@ class ScanResult(Base, TimestampMixin):
     """ScanResult model for storing individual scan findings"""
     
     __tablename__ = "scan_results"
+    __table_args__ = (
+        # Results per job in keyset order (GET /scans/{job_id}/results)
+        Index("ix_scan_results_job_id_created_at_id", "job_id", "created_at", "id"),
+        # Finding lookups by JSONB containment
+        Index(
+            "ix_scan_results_raw_data_gin",
+            "raw_data",
+            postgresql_using="gin",
+            postgresql_ops={"raw_data": "jsonb_path_ops"},
+        ),
+        # Production databases partition this table monthly by created_at
+        # (alembic revision 0002)
+    )
     
     # Primary key using UUID
     id = Column(
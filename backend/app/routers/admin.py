@@ -5,6 +5,7 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.connectors import connector_registry
 from app.db.session import get_db
 from app.utils.dependencies import require_admin
 
@@ -51,27 +52,12 @@ async def get_connectors(
 ) -> Any:
     """
     Get available connectors (admin only)
+    
+    Metadata comes from the connector registry manifest, so listing does
+    not import any connector module.
     """
-    # In a real implementation, you would query the database
-    # For now, return mock data
+    items = connector_registry.metadata()
     return {
-        "connectors": [
-            {
-                "id": "spiderfoot",
-                "name": "SpiderFoot",
-                "description": "OSINT data collection engine",
-                "status": "active",
-                "version": "4.0",
-                "last_check": "2023-12-01T10:00:00Z"
-            },
-            {
-                "id": "nmap",
-                "name": "Nmap",
-                "description": "Network discovery and security auditing",
-                "status": "inactive",
-                "version": "7.94",
-                "last_check": "2023-11-30T15:30:00Z"
-            }
-        ],
-        "total_count": 2
-    } 
\ No newline at end of file
+        "connectors": items,
+        "total_count": len(items)
+    }
@@ -2,13 +2,14 @@
 Reports router for report management and download
 """
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_user, get_owned_scan_job
+from app.models.user import User
 from app.services.report import ReportService
+from app.utils.file_response import conditional_file_response
 
 router = APIRouter()
 
@@ -16,16 +17,17 @@ router = APIRouter()
 @router.get("/{job_id}")
 async def get_report_metadata(
     job_id: str,
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Get report metadata
     """
+    job = await get_owned_scan_job(job_id, current_user, db)
     report_service = ReportService()
     
     # Get report metadata
-    report = await report_service.get_report_metadata(job_id, db)
+    report = await report_service.get_report_metadata(str(job.id), db)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,30 +48,39 @@ async def get_report_metadata(
     }
 
 
-@router.get("/{job_id}/download")
+@router.api_route("/{job_id}/download", methods=["GET", "HEAD"])
 async def download_report(
     job_id: str,
-    current_user: dict = Depends(get_current_user),
+    request: Request,
+    format: str = Query("pdf", pattern="^(pdf|html)$"),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Download report file
+    
+    Responses carry a strong ETag derived from the report's content hash;
+    If-None-Match answers 304, Range requests get 206 partial content and
+    HTML is served from its precompressed gzip/brotli variant when accepted.
     """
+    job = await get_owned_scan_job(job_id, current_user, db)
     report_service = ReportService()
     
     # Get report file
-    report_file = await report_service.get_report_file(job_id, db)
+    report_file = await report_service.get_report_file(str(job.id), format, db)
     if not report_file:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report file not found"
         )
     
-    # Return file response
-    return FileResponse(
+    return conditional_file_response(
+        request,
         path=report_file["path"],
+        content_hash=report_file["content_hash"],
+        media_type="application/pdf" if report_file["type"] == "pdf" else "text/html; charset=utf-8",
         filename=report_file["filename"],
-        media_type="application/pdf" if report_file["type"] == "pdf" else "application/octet-stream"
+        precompressed=report_file["type"] == "html",
     )
 
 
@@ -77,20 +88,21 @@ async def download_report(
 async def generate_report(
     job_id: str,
     report_type: str = "pdf",
-    current_user: dict = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Generate report for scan job
     """
+    job = await get_owned_scan_job(job_id, current_user, db)
     report_service = ReportService()
     
     # Generate report
-    report = await report_service.generate_report(job_id, report_type, db)
+    report_uuid = await report_service.generate_report(str(job.id), report_type, db)
     
     return {
         "job_id": job_id,
-        "report_id": report.uuid,
+        "report_id": report_uuid,
         "status": "generating",
         "message": "Report generation started"
     } 
\ No newline at end of file
@@ -1,22 +1,29 @@
 """
 Scans router for managing scan operations
 """
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Optional
+import json
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.utils.dependencies import get_current_user, require_user
-from app.services.scan import ScanService
+from app.utils.dependencies import get_current_user, get_owned_scan_job, require_user
+from app.core.config import settings
+from app.services.scan import ScanService, parse_fields
+from app.services.events import scan_events, format_sse
 from app.models.user import User
 
 router = APIRouter()
 
 
+
 @router.post("/")
 async def create_scan(
     target: str,
     scan_type: str = "domain",
+    incremental: bool = False,
     current_user: User = Depends(require_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
@@ -26,10 +33,10 @@ async def create_scan(
     scan_service = ScanService()
     
     # Enqueue scan task
-    job = await scan_service.start_scan(target, scan_type, str(current_user.id), db)
+    job = await scan_service.start_scan(target, scan_type, str(current_user.id), db, incremental=incremental)
     
     return {
-        "job_id": job.job_id,
+        "job_id": str(job.id),
         "status": job.status,
         "target": job.target,
         "scan_type": job.scan_type,
@@ -46,46 +53,94 @@ async def get_scan_status(
     """
     Get scan job status
     """
-    scan_service = ScanService()
-    
-    # Get job status
-    job = await scan_service.get_scan_status(job_id, db)
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Scan job not found"
-        )
+    job = await get_owned_scan_job(job_id, current_user, db)
     
     return {
-        "job_id": job.job_id,
+        "job_id": str(job.id),
         "status": job.status,
         "progress": job.progress,
         "target": job.target,
         "scan_type": job.scan_type,
         "created_at": job.created_at,
-        "started_at": job.started_at,
-        "completed_at": job.completed_at,
-        "result_summary": job.result_summary,
-        "error_message": job.error_message
     }
 
 
 @router.get("/{job_id}/results")
 async def get_scan_results(
     job_id: str,
+    limit: int = Query(settings.SCAN_RESULTS_PAGE_SIZE, ge=1, le=settings.SCAN_RESULTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
     current_user: User = Depends(require_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Get scan results
+
+    - json (default): one keyset page ordered by (created_at, id); pass the
+      returned next_cursor to fetch the following page
+    - ndjson: every result streamed one JSON object per line from a
+      server-side cursor
+    - fields: comma-separated projection, e.g. fields=category,penalty_score
+      to leave out raw_data
     """
     scan_service = ScanService()
-    
-    # Get scan results
-    results = await scan_service.get_scan_results(job_id, db)
-    
+    try:
+        job_uuid = uuid.UUID(job_id)
+        selected = parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    await get_owned_scan_job(job_uuid, current_user, db)
+
+    if format == "ndjson":
+        async def ndjson_stream():
+            async for row in scan_service.stream_scan_results(job_uuid, db, selected):
+                yield json.dumps(row, default=str) + "\n"
+
+        return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+    try:
+        results, next_cursor = await scan_service.get_scan_results_page(
+            job_uuid, db, limit, cursor, selected
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
     return {
         "job_id": job_id,
         "results": results,
-        "total_count": len(results)
-    } 
\ No newline at end of file
+        "count": len(results),
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/{job_id}/events")
+async def stream_scan_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(require_user),
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Stream scan progress and findings as Server-Sent Events
+
+    Events are relayed from the worker through Redis pub/sub, so clients see
+    each finding as soon as its connector finishes without polling the API.
+    Reconnecting clients resume after their Last-Event-ID.
+    """
+    await get_owned_scan_job(job_id, current_user, db)
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_stream():
+        async for event in scan_events(job_id, last_event_id=resume_from):
+            if await request.is_disconnected():
+                break
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -2,8 +2,8 @@
 Pydantic schemas for request/response validation
 """
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
 __all__ = ["ScanFinding"]
 
@@ -11,4 +11,9 @@ __all__ = ["ScanFinding"]
 class ScanFinding:
     """Normalized output of every OSINT connector."""
     category: str          # e.g. "whois", "shodan", …
-    details: Dict[str, Any] 
\ No newline at end of file
+    details: Dict[str, Any]
+    status: str = "completed"  # "completed" or "timed_out"
+    entity: Optional[str] = None  # Input the connector ran on; None means the scan target
+    entities: Dict[str, List[str]] = field(default_factory=dict)  # Discovered inputs for downstream connectors, by kind
+    validators: Dict[str, Any] = field(default_factory=dict)  # Upstream change markers ("etag", "last_modified", "serial")
+    fetched_at: Optional[float] = None  # Epoch seconds the data was last fetched or confirmed unchanged upstream 
\ No newline at end of file
@@ -10,7 +10,7 @@ from sqlalchemy import select
 
 from app.core.config import settings
 from app.models.user import User
-from app.utils.security import verify_password, hash_password
+from app.utils.security import password_hasher
 
 
 def create_access_token(data: dict) -> str:
@@ -25,8 +25,9 @@ def create_access_token(data: dict) -> str:
     """
     to_encode = data.copy()
     # Set token expiration based on config
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now, "type": "access"})
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm="HS256")
 
 
@@ -94,10 +95,16 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     if not user:
         return None
     
-    # Verify password
-    if not verify_password(password, str(user.hashed_password)):
+    # Verify password off the event loop, upgrading outdated hashes
+    matches, new_hash = await password_hasher.verify_and_update(password, str(user.hashed_password))
+    if not matches:
         return None
     
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+        await db.refresh(user)
+    
     return user
 
 
@@ -144,7 +151,7 @@ async def create_user(db: AsyncSession, email: str, password: str, role: str = "
     Returns:
         Created User object
     """
-    hashed_password = hash_password(password)
+    hashed_password = await password_hasher.hash(password)
     user = User(
         email=email,
         hashed_password=hashed_password,
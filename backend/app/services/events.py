@@ -0,0 +1,134 @@
+"""
+Scan event relay: worker -> Redis pub/sub -> API streaming endpoint
+"""
+import asyncio
+import json
+import logging
+from dataclasses import asdict, is_dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.events")
+
+# Event types that end a scan's stream
+TERMINAL_EVENTS = {"completed", "failed"}
+
+
+def scan_channel(job_id: str) -> str:
+    return f"scan-events:{job_id}"
+
+
+def scan_backlog_key(job_id: str) -> str:
+    return f"scan-events:{job_id}:log"
+
+
+def _default_redis():
+    from app.db.redis import redis_client
+    return redis_client
+
+
+class ScanEventPublisher:
+    """
+    Publishes one scan's progress and findings as they happen.
+
+    Every event is sent on the job's pub/sub channel and appended to a
+    short-lived backlog list, so a client that connects mid-scan (or
+    reconnects with Last-Event-ID) still sees the events it missed.
+    """
+
+    def __init__(self, job_id: str, redis=None):
+        self.job_id = job_id
+        self._redis = redis
+        self.seq = 0
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = _default_redis()
+        return self._redis
+
+    async def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Send an event; failures are logged and never break the scan"""
+        self.seq += 1
+        message = json.dumps({"id": self.seq, "event": event, "data": data}, default=str)
+        try:
+            backlog = scan_backlog_key(self.job_id)
+            await self.redis.rpush(backlog, message)
+            await self.redis.expire(backlog, settings.SCAN_EVENTS_TTL)
+            await self.redis.publish(scan_channel(self.job_id), message)
+        except Exception:
+            logger.warning("Failed to publish %s event for scan %s", event, self.job_id, exc_info=True)
+
+    async def finding(self, finding, completed: int, total: int, score: Optional[float] = None) -> None:
+        """Publish a connector's finding followed by the scan's progress and live OES"""
+        await self.publish("finding", asdict(finding) if is_dataclass(finding) else finding)
+        progress = {
+            "completed": completed,
+            "total": total,
+            "progress": int(completed * 100 / total) if total else 100,
+        }
+        if score is not None:
+            progress["overall_score"] = score
+        await self.publish("progress", progress)
+
+
+async def scan_events(
+    job_id: str,
+    redis=None,
+    last_event_id: int = 0,
+    heartbeat: Optional[float] = None
+) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Yield a scan's events: backlog first, then live, until a terminal event.
+
+    Yields None whenever ``heartbeat`` seconds pass without an event so the
+    caller can keep the connection alive.
+    """
+    redis = redis or _default_redis()
+    heartbeat = heartbeat or settings.SCAN_EVENTS_HEARTBEAT
+    pubsub = redis.pubsub()
+    # Subscribe before reading the backlog so nothing falls between the two
+    await pubsub.subscribe(scan_channel(job_id))
+    next_message = None
+    try:
+        seen = last_event_id
+        for raw in await redis.lrange(scan_backlog_key(job_id), 0, -1):
+            event = json.loads(raw)
+            if event["id"] <= seen:
+                continue
+            seen = event["id"]
+            yield event
+            if event["event"] in TERMINAL_EVENTS:
+                return
+
+        messages = pubsub.listen().__aiter__()
+        while True:
+            # Wait without cancelling the read, which would close the listener
+            next_message = next_message or asyncio.ensure_future(messages.__anext__())
+            done, _ = await asyncio.wait({next_message}, timeout=heartbeat)
+            if not done:
+                yield None
+                continue
+            message, next_message = next_message.result(), None
+            if message.get("type") != "message":
+                continue
+            event = json.loads(message["data"])
+            if event["id"] <= seen:
+                continue
+            seen = event["id"]
+            yield event
+            if event["event"] in TERMINAL_EVENTS:
+                return
+    finally:
+        if next_message is not None:
+            next_message.cancel()
+        await pubsub.unsubscribe(scan_channel(job_id))
+        await pubsub.close()
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Render an event (or a heartbeat for None) as a Server-Sent Events frame"""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
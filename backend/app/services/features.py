@@ -0,0 +1,275 @@
+"""
+Feature extraction: fold connector findings into a ScoringInput as they arrive
+"""
+import hashlib
+import heapq
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.schemas import ScanFinding
+from app.services.scoring import (
+    RULES,
+    ScoringInput,
+    ScoringResult,
+    calculate_oes,
+    rescore,
+)
+from app.services.scoring_rules import RuleSet
+
+# A signal is one observation of a ScoringInput field, e.g. ("open_ports_count", 3)
+# or ("subdomain_count", "mail.example.com") for fields counted as distinct values
+Signal = Tuple[str, Any]
+SignalExtractor = Callable[[Dict[str, Any]], Iterable[Signal]]
+
+
+class Sum:
+    """Total of the observed counts"""
+
+    def __init__(self):
+        self.value: Optional[int] = None
+
+    def add(self, value) -> None:
+        self.value = (self.value or 0) + int(value)
+
+
+class Minimum:
+    """Smallest observed value"""
+
+    def __init__(self):
+        self.value: Optional[int] = None
+
+    def add(self, value) -> None:
+        value = int(value)
+        self.value = value if self.value is None else min(self.value, value)
+
+
+class AnyOf:
+    """True once any observation is true (risk indicators)"""
+
+    def __init__(self):
+        self.value: Optional[bool] = None
+
+    def add(self, value) -> None:
+        self.value = bool(self.value) or bool(value)
+
+
+class AllOf:
+    """True only while every observation is true (controls such as a WAF)"""
+
+    def __init__(self):
+        self.value: Optional[bool] = None
+
+    def add(self, value) -> None:
+        self.value = (self.value is None or self.value) and bool(value)
+
+
+class DistinctCount:
+    """
+    Number of distinct values in bounded memory
+
+    Values are hashed to 64 bits. Up to ``limit`` distinct hashes the count
+    is exact; past that only the ``limit`` smallest hashes are kept and the
+    count is a k-minimum-values estimate (about 1/sqrt(limit) relative error).
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit or settings.SCORING_DISTINCT_EXACT_LIMIT
+        self._hashes: Set[int] = set()
+        self._heap: List[int] = []  # Negated, so the largest kept hash is on top
+        self._saturated = False
+
+    @staticmethod
+    def _hash(value) -> int:
+        digest = hashlib.blake2b(str(value).strip().lower().encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def add(self, value) -> None:
+        h = self._hash(value)
+        if h in self._hashes:
+            return
+        if len(self._hashes) < self.limit:
+            self._hashes.add(h)
+            heapq.heappush(self._heap, -h)
+            return
+        self._saturated = True
+        if h < -self._heap[0]:
+            self._hashes.discard(-heapq.heappushpop(self._heap, -h))
+            self._hashes.add(h)
+
+    @property
+    def value(self) -> Optional[int]:
+        if not self._hashes:
+            return None
+        if not self._saturated:
+            return len(self._hashes)
+        kth = -self._heap[0] / float(1 << 64)
+        return int((self.limit - 1) / kth)
+
+
+# How each ScoringInput field is aggregated across findings
+FIELD_AGGREGATORS: Dict[str, type] = {
+    # D1: Domain Footprint
+    "subdomain_count": DistinctCount,
+    "has_spf_dkim": AllOf,
+    "domain_expiry_days": Minimum,
+    "privacy_enabled": AllOf,
+    "whois_email_exposed": AnyOf,
+    # D2: Breach & Credential Exposure
+    "breach_instances": Sum,
+    "password_exposed": AnyOf,
+    "credential_reuse": AnyOf,
+    "leaked_in_code": AnyOf,
+    "unique_emails_exposed": DistinctCount,
+    # D3: Infrastructure & Network
+    "open_ports_count": Sum,
+    "has_waf": AllOf,
+    "infra_outdated": AnyOf,
+    "vulnerable_services_count": Sum,
+    "cdn_bypass_detected": AnyOf,
+    # D4: Application/Website Risk
+    "outdated_cms": AnyOf,
+    "missing_security_headers": AnyOf,
+    "known_cve_count": Sum,
+    "public_repo_leaks_count": Sum,
+    "exploit_tech_count": Sum,
+    # D5: Social & OSINT Intelligence
+    "employee_emails_exposed": AnyOf,
+    "public_org_leaks_count": Sum,
+    "used_in_phishing": AnyOf,
+    "predictable_pattern": AnyOf,
+    # D6: Threat Intelligence / Dark Web
+    "seen_in_marketplaces": AnyOf,
+    "underground_mentions_count": Sum,
+    "ioc_match_count": Sum,
+}
+
+# Value of a field no finding reported on: no evidence of risk, controls assumed present
+FIELD_DEFAULTS: Dict[str, Any] = {
+    name: (True if aggregator is AllOf else False if aggregator is AnyOf else 0)
+    for name, aggregator in FIELD_AGGREGATORS.items()
+}
+FIELD_DEFAULTS["domain_expiry_days"] = 365
+
+
+# Category -> (extractor, ScoringInput fields it can report)
+EXTRACTORS: Dict[str, Tuple[SignalExtractor, Tuple[str, ...]]] = {}
+
+
+def signal_extractor(category: str, fields: Iterable[str]):
+    """Register the signal extractor of a connector category"""
+    fields = tuple(fields)
+    unknown = set(fields) - set(FIELD_AGGREGATORS)
+    if unknown:
+        raise ValueError(f"Unknown scoring fields: {', '.join(sorted(unknown))}")
+
+    def register(func: SignalExtractor) -> SignalExtractor:
+        EXTRACTORS[category] = (func, fields)
+        return func
+    return register
+
+
+def _days_until(value) -> Optional[int]:
+    if isinstance(value, (list, tuple)):
+        days = [d for d in (_days_until(v) for v in value) if d is not None]
+        return min(days) if days else None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return max(0, (value - datetime.now(timezone.utc)).days)
+
+
+@signal_extractor("whois", ("domain_expiry_days", "privacy_enabled", "whois_email_exposed"))
+def _whois_signals(details: Dict[str, Any]) -> Iterator[Signal]:
+    record = details.get("raw", details)
+    if not isinstance(record, dict):
+        return
+    days = _days_until(record.get("expiration_date"))
+    if days is not None:
+        yield "domain_expiry_days", days
+    if "privacy" in record:
+        yield "privacy_enabled", bool(record["privacy"])
+    if "emails" in record:
+        yield "whois_email_exposed", bool(record["emails"])
+
+
+def _generic_signals(details: Dict[str, Any]) -> Iterator[Signal]:
+    """Signals a connector reports directly under details["signals"]"""
+    signals = details.get("signals")
+    if not isinstance(signals, dict):
+        return
+    for name, value in signals.items():
+        if name not in FIELD_AGGREGATORS:
+            continue
+        if FIELD_AGGREGATORS[name] is DistinctCount and not isinstance(value, (str, bytes)):
+            # Distinct fields list the values themselves (hosts, emails)
+            for item in value:
+                yield name, item
+        else:
+            yield name, value
+
+
+class FindingsExtractor:
+    """
+    Streams findings into ScoringInput aggregates
+
+    Each completed finding is reduced to signals by the extractor registered
+    for its category (plus any ``details["signals"]``) and folded into one
+    aggregator per field, so time is linear in the findings and memory is
+    bounded however many subdomains or emails they list. ``score()`` can be
+    called after every finding for a live OES.
+
+    Fields nobody reported on fall back to FIELD_DEFAULTS, so a source that
+    completes with nothing to report never costs more than no source at all.
+    Scores are computed with the given rule table.
+    """
+
+    def __init__(self, rules: Optional[RuleSet] = None):
+        self.rules = rules or RULES
+        self.aggregates = {name: aggregator() for name, aggregator in FIELD_AGGREGATORS.items()}
+        self.findings = 0
+
+    def add(self, finding: ScanFinding) -> None:
+        """Fold one finding in; timed-out findings carry no evidence and are skipped"""
+        self.findings += 1
+        if finding.status != "completed":
+            return
+        extractor, _ = EXTRACTORS.get(finding.category, (None, ()))
+        details = finding.details if isinstance(finding.details, dict) else {}
+        signals = _generic_signals(details)
+        for source in ((extractor(details) if extractor else ()), signals):
+            for name, value in source:
+                self.aggregates[name].add(value)
+
+    def add_all(self, findings: Iterable[ScanFinding]) -> "FindingsExtractor":
+        for finding in findings:
+            self.add(finding)
+        return self
+
+    def scoring_input(self) -> ScoringInput:
+        values = {}
+        for name, aggregate in self.aggregates.items():
+            value = aggregate.value
+            values[name] = FIELD_DEFAULTS[name] if value is None else value
+        return ScoringInput(**values)
+
+    def score(
+        self,
+        previous: Optional[ScoringResult] = None,
+        changed: Optional[Iterable[str]] = None
+    ) -> ScoringResult:
+        """
+        OES of everything folded in so far
+
+        With a ``previous`` result only the ``changed`` dimensions are
+        recomputed (see scoring.rescore); the others keep their deductions.
+        """
+        if previous is None:
+            return calculate_oes(self.scoring_input(), self.rules)
+        return rescore(self.scoring_input(), previous, tuple(changed or ()), self.rules)
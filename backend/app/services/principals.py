@@ -0,0 +1,225 @@
+"""
+Short-TTL cache of authenticated user principals for get_current_user
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.enums import UserRole
+from app.models.user import User
+
+logger = logging.getLogger("app.services.principals")
+
+# Attributes whose change must drop a cached principal immediately
+SECURITY_ATTRIBUTES = ("is_active", "role", "email")
+
+
+def principal_from_user(user: User) -> Dict[str, Any]:
+    """The subset of a user that authorization needs, JSON-safe"""
+    role = user.role.value if isinstance(user.role, UserRole) else user.role
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "role": role,
+        "is_active": bool(user.is_active),
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
+def user_from_principal(principal: Dict[str, Any]) -> User:
+    """Rebuild a detached User carrying the cached fields"""
+    role = principal["role"]
+    return User(
+        id=principal["id"],
+        email=principal["email"],
+        role=UserRole(role) if role in UserRole.__members__ else role,
+        is_active=principal["is_active"],
+        created_at=datetime.fromisoformat(principal["created_at"]) if principal["created_at"] else None,
+    )
+
+
+class PrincipalCache:
+    """
+    Two-tier (in-process, then Redis) cache keyed by user id and token iat.
+
+    Redis holds one hash per user whose fields are token iats, so a single
+    DEL invalidates every cached token of that user; the deletion is also
+    published so other API processes drop their in-process copies. The
+    in-process tier is only used while this process is subscribed to those
+    invalidations.
+    """
+
+    key_prefix = "auth-principal"
+    invalidation_channel = "auth-principal:invalidate"
+
+    def __init__(self, redis=None):
+        self._redis = redis
+        self._local: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._local_live = False
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            from app.db.redis import redis_client
+            self._redis = redis_client
+        return self._redis
+
+    def key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    async def get(self, user_id: str, iat: int) -> Optional[Dict[str, Any]]:
+        self.ensure_invalidation_listener()
+        if self._local_live:
+            item = self._local.get((user_id, iat))
+            if item is not None and item[0] > time.monotonic():
+                return item[1]
+        try:
+            cached = await self.redis.hget(self.key(user_id), str(iat))
+        except Exception:
+            logger.warning("Principal cache read failed", exc_info=True)
+            return None
+        if cached is None:
+            return None
+        principal = json.loads(cached)
+        self._remember(user_id, iat, principal)
+        return principal
+
+    async def set(self, user_id: str, iat: int, principal: Dict[str, Any]) -> None:
+        self._remember(user_id, iat, principal)
+        try:
+            key = self.key(user_id)
+            await self.redis.hset(key, str(iat), json.dumps(principal))
+            await self.redis.expire(key, settings.AUTH_PRINCIPAL_CACHE_TTL)
+        except Exception:
+            logger.warning("Principal cache write failed", exc_info=True)
+
+    def _remember(self, user_id: str, iat: int, principal: Dict[str, Any]) -> None:
+        if self._local_live:
+            if len(self._local) >= settings.AUTH_PRINCIPAL_L1_MAX_ENTRIES:
+                self._local.clear()
+            self._local[(user_id, iat)] = (time.monotonic() + settings.AUTH_PRINCIPAL_L1_TTL, principal)
+
+    def _drop_local(self, user_id: str) -> None:
+        for cache_key in [k for k in self._local if k[0] == user_id]:
+            del self._local[cache_key]
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop every cached principal of a user in all API processes"""
+        user_id = str(user_id)
+        self._drop_local(user_id)
+        await self.redis.delete(self.key(user_id))
+        await self.redis.publish(self.invalidation_channel, user_id)
+
+    def ensure_invalidation_listener(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._local_live = False
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def _listen_for_invalidations(self) -> None:
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.invalidation_channel)
+                self._local.clear()
+                self._local_live = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        data = message["data"]
+                        self._drop_local(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                self._local_live = False
+                raise
+            except Exception:
+                logger.warning("Principal invalidation listener failed", exc_info=True)
+            self._local_live = False
+            self._local.clear()
+            await asyncio.sleep(settings.CONNECTOR_L1_RECONNECT_DELAY)
+
+
+_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Process-wide principal cache"""
+    global _cache
+    if _cache is None:
+        _cache = PrincipalCache()
+    return _cache
+
+
+# Session.info key of the user ids whose principals drop once the session commits
+PENDING_INVALIDATIONS = "principals_to_invalidate"
+
+
+def _pending(session: Session) -> Set[str]:
+    return session.info.setdefault(PENDING_INVALIDATIONS, set())
+
+
+@event.listens_for(User, "after_update")
+def _collect_security_change(mapper, connection, target: User) -> None:
+    """Note a deactivation or role/email change, to be invalidated on commit"""
+    state = inspect(target)
+    if state.session is None:
+        return
+    if any(state.attrs[attr].history.has_changes() for attr in SECURITY_ATTRIBUTES):
+        _pending(state.session).add(str(target.id))
+
+
+@event.listens_for(User, "after_delete")
+def _collect_deletion(mapper, connection, target: User) -> None:
+    session = inspect(target).session
+    if session is not None:
+        _pending(session).add(str(target.id))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_change(orm_execute_state) -> None:
+    """
+    Note the users a bulk update(User) or delete(User) statement touches
+
+    Bulk statements bypass the mapper events, so the affected ids are read
+    with the statement's own criteria before it runs.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, User):
+        return
+    affected = select(User.id)
+    criteria = orm_execute_state.statement.whereclause
+    if criteria is not None:
+        affected = affected.where(criteria)
+    session = orm_execute_state.session
+    _pending(session).update(str(user_id) for user_id in session.execute(affected).scalars())
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    """Drop the cached principals of users changed by the committed transaction"""
+    user_ids = session.info.pop(PENDING_INVALIDATIONS, None)
+    if not user_ids:
+        return
+    cache = get_principal_cache()
+    for user_id in user_ids:
+        cache._drop_local(user_id)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    for user_id in user_ids:
+        task = loop.create_task(cache.invalidate(user_id))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
@@ -2,12 +2,16 @@
 Report service for report generation and management
 """
 from typing import Optional, Dict, Any
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 import os
 
 from app.models.report import Report
-from app.worker import celery_app
+from app.models.scan_job import ScanJob
+from app.services.report_render import ReportContextBuilder
+from app.services.scan import ScanService
+from app.worker import celery_app, PRIORITY_INTERACTIVE
 
 
 class ReportService:
@@ -33,21 +37,90 @@ class ReportService:
             file_path="/app/reports/report_123.pdf"
         )
     
+    async def load_report_context(
+        self,
+        job_id: str,
+        db: AsyncSession
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a scan job and its results as report template context
+        
+        Results are streamed from a server-side cursor and aggregated on the
+        fly, so large scans do not have to fit in memory.
+        
+        Returns:
+            Template context, or None if the job does not exist
+        """
+        job = await db.get(ScanJob, uuid.UUID(str(job_id)))
+        if job is None:
+            return None
+        results = ScanService().stream_scan_results(
+            job.id, db, fields=("domain_or_email", "category", "raw_data", "penalty_score")
+        )
+        builder = ReportContextBuilder({"id": job.id, "target": job.target, "scan_type": job.scan_type})
+        async for row in results:
+            builder.add(row)
+        return builder.context()
+    
+    async def save_report(
+        self,
+        job_id: str,
+        pdf_path: str,
+        html_path: str,
+        overall_score: float,
+        metadata: Dict[str, Any],
+        db: AsyncSession
+    ) -> Report:
+        """
+        Create or update the report row of a scan job
+        """
+        job_uuid = uuid.UUID(str(job_id))
+        report = (
+            await db.execute(select(Report).where(Report.job_id == job_uuid))
+        ).scalar_one_or_none()
+        if report is None:
+            report = Report(job_id=job_uuid)
+            db.add(report)
+        report.pdf_path = pdf_path
+        report.html_path = html_path
+        report.overall_score = overall_score
+        report.report_metadata = metadata
+        await db.commit()
+        await db.refresh(report)
+        return report
+    
     async def get_report_file(
         self, 
         job_id: str, 
+        report_type: str,
         db: AsyncSession
     ) -> Optional[Dict[str, Any]]:
         """
         Get report file information
+        
+        Args:
+            job_id: Scan job ID
+            report_type: "pdf" or "html"
+            db: Database session
+            
+        Returns:
+            Path, download name, type and content hash, or None if no
+            rendered file exists
         """
-        # In a real implementation, you would query the database
-        # For now, return mock data
+        report = (
+            await db.execute(select(Report).where(Report.job_id == uuid.UUID(str(job_id))))
+        ).scalar_one_or_none()
+        if report is None:
+            return None
+        path = report.pdf_path if report_type == "pdf" else report.html_path
+        content_hash = ((report.report_metadata or {}).get("content_hashes") or {}).get(report_type)
+        if not path or not content_hash or not os.path.exists(path):
+            return None
         return {
-            "path": "/app/reports/report_123.pdf",
-            "filename": f"scan_report_{job_id}.pdf",
-            "type": "pdf",
-            "size": 1024000
+            "path": path,
+            "filename": f"scan_report_{job_id}.{report_type}",
+            "type": report_type,
+            "content_hash": content_hash,
         }
     
     async def generate_report(
@@ -55,30 +128,25 @@ class ReportService:
         job_id: str, 
         report_type: str, 
         db: AsyncSession
-    ) -> Report:
-        """
-        Generate report for scan job
+    ) -> str:
         """
-        # Create report record
-        report = Report(
-            title=f"Scan Report for {job_id}",
-            description="Comprehensive security scan report",
-            report_type=report_type,
-            is_generated=False,
-            scan_job_id=1  # In real implementation, get from job_id
-        )
+        Enqueue report generation for a scan job
         
-        db.add(report)
-        await db.commit()
-        await db.refresh(report)
+        The report row is written by the task once both files exist.
+        
+        Returns:
+            UUID identifying this generation run
+        """
+        report_uuid = str(uuid.uuid4())
         
         # Enqueue Celery task for report generation
         celery_app.send_task(
             "app.tasks.report.generate_report",
-            args=[job_id, report.uuid, report_type]
+            args=[job_id, report_uuid, report_type],
+            priority=PRIORITY_INTERACTIVE
         )
         
-        return report
+        return report_uuid
     
     async def save_report_file(
         self, 
@@ -0,0 +1,352 @@
+"""
+Report rendering: HTML from Jinja templates, PDF through WeasyPrint in worker processes
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.core.config import settings
+from app.services.features import FindingsExtractor
+from app.services.scan import finding_from_row
+from app.services.scoring import RULES
+from app.utils.crypto import key_fingerprint
+from app.utils.files import atomic_writer
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "reports")
+REPORT_TEMPLATE = "report.html"
+REPORT_STYLESHEET = "report.css"
+
+# Output formats rendered for every report
+REPORT_FORMATS = ("pdf", "html")
+
+# Detail values longer than this are cut in the rendered report
+MAX_DETAIL_CHARS = 500
+
+DIMENSION_LABELS = {
+    "D1": "Domain Footprint",
+    "D2": "Breach & Credential Exposure",
+    "D3": "Infrastructure & Network",
+    "D4": "Application/Website Risk",
+    "D5": "Social & OSINT Intelligence",
+    "D6": "Threat Intelligence / Dark Web",
+}
+
+RECOMMENDATIONS = {
+    "whois": "Enable WHOIS privacy and monitor domain registration changes.",
+    "dns": "Publish SPF, DKIM and DMARC records and prune stale subdomains.",
+    "breach": "Force password resets for exposed accounts and enable MFA.",
+    "ports": "Close unneeded services and put the rest behind a WAF.",
+    "web": "Patch outdated CMS components and add missing security headers.",
+}
+DEFAULT_RECOMMENDATIONS = [
+    "Schedule regular security audits.",
+    "Re-scan after remediation to confirm the score improves.",
+]
+
+
+def template_dir() -> str:
+    return settings.REPORT_TEMPLATE_DIR or TEMPLATE_DIR
+
+
+@lru_cache(maxsize=None)
+def _environment(directory: str) -> Environment:
+    return Environment(
+        loader=FileSystemLoader(directory),
+        autoescape=select_autoescape(["html"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+@lru_cache(maxsize=None)
+def _stylesheet(directory: str) -> str:
+    with open(os.path.join(directory, REPORT_STYLESHEET), encoding="utf-8") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def template_version(directory: Optional[str] = None) -> str:
+    """Digest of the template and stylesheet, so editing either invalidates cached reports"""
+    directory = directory or template_dir()
+    digest = hashlib.sha256()
+    for name in (REPORT_TEMPLATE, REPORT_STYLESHEET):
+        with open(os.path.join(directory, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:16]
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def rating_for(score: float) -> str:
+    """Exposure rating for an OES (higher scores mean less exposure)"""
+    if score >= 80:
+        return "Low"
+    if score >= 50:
+        return "Medium"
+    return "High"
+
+
+def _detail_items(details: Dict[str, Any]) -> List[tuple]:
+    items = []
+    for key, value in details.items():
+        if key == "scan_status":
+            continue
+        text = value if isinstance(value, str) else json.dumps(value, default=str, sort_keys=True)
+        if len(text) > MAX_DETAIL_CHARS:
+            text = text[:MAX_DETAIL_CHARS] + "…"
+        items.append((key, text))
+    return items
+
+
+class ReportContextBuilder:
+    """
+    Aggregates scan results into the template context one row at a time
+    
+    Each row is folded into a FindingsExtractor, so the report's OES and
+    per-dimension breakdown are the scoring module's. Only the first
+    max_findings rows are kept for the findings section, so results can be
+    fed straight from a server-side cursor. Every row also feeds a running
+    digest from which content_hash derives the report's cache key.
+    """
+
+    def __init__(self, job: Dict[str, Any], max_findings: Optional[int] = None):
+        self.job = job
+        self.max_findings = settings.REPORT_MAX_FINDINGS if max_findings is None else max_findings
+        self.extractor = FindingsExtractor()
+        self.sources: Dict[str, int] = {}
+        self.findings: List[Dict[str, Any]] = []
+        self.total = 0
+        self._digest = hashlib.sha256()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Fold one ScanResult row (category, raw_data, optionally domain_or_email) in"""
+        self.total += 1
+        self._digest.update(_canonical([row["category"], row.get("raw_data"), row.get("penalty_score")]))
+        category = row["category"]
+        self.sources[category] = self.sources.get(category, 0) + 1
+        stored = {"domain_or_email": self.job["target"], **row, "raw_data": row.get("raw_data") or {}}
+        self.extractor.add(finding_from_row(stored, self.job["target"]))
+        if len(self.findings) < self.max_findings:
+            raw = row.get("raw_data") or {}
+            self.findings.append({
+                "category": category,
+                "timed_out": raw.get("scan_status") == "timed_out",
+                "details": _detail_items(raw),
+            })
+
+    def content_hash(self, report_type: str) -> str:
+        """
+        Cache key of the rendered report
+        
+        Covers everything that reaches the output: the findings, the score
+        breakdown, the rendered job fields, the template version and the
+        output format, plus the fingerprint of the key files are encrypted
+        with at rest, so rotating the key re-renders reports. The job id
+        and generation time are left out, so identical scans share one file.
+        """
+        key = {
+            "findings": self._digest.hexdigest(),
+            "rules": RULES.version,
+            "target": self.job["target"],
+            "scan_type": self.job.get("scan_type", "domain"),
+            "max_findings": self.max_findings,
+            "template": template_version(),
+            "type": report_type,
+            "key": key_fingerprint(),
+        }
+        return hashlib.sha256(_canonical(key)).hexdigest()
+
+    def context(self) -> Dict[str, Any]:
+        """Template context including the OES breakdown per dimension and content hashes"""
+        job = self.job
+        result = self.extractor.score()
+        breakdown = [
+            {
+                "dimension": name,
+                "label": DIMENSION_LABELS.get(name, name),
+                "deduction": result.deductions[name],
+                "cap": RULES.caps[name],
+            }
+            for name in RULES.dimensions
+        ]
+        recommendations = [RECOMMENDATIONS[c] for c in sorted(self.sources) if c in RECOMMENDATIONS]
+        return {
+            "title": f"Security Scan Report - {job['target']}",
+            "job_id": str(job["id"]),
+            "target": job["target"],
+            "scan_type": job.get("scan_type", "domain"),
+            "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
+            "overall_score": result.score,
+            "rating": rating_for(result.score),
+            "rules_version": result.rules_version,
+            "breakdown": breakdown,
+            "sources": [{"category": c, "count": n} for c, n in sorted(self.sources.items())],
+            "total_findings": self.total,
+            "total_penalty": result.total_deduction,
+            "findings": self.findings,
+            "omitted_findings": self.total - len(self.findings),
+            "recommendations": recommendations + DEFAULT_RECOMMENDATIONS,
+            "content_hashes": {fmt: self.content_hash(fmt) for fmt in REPORT_FORMATS},
+        }
+
+
+def build_report_context(
+    job: Dict[str, Any],
+    results: Iterable[Dict[str, Any]],
+    max_findings: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Aggregate scan results into the template context
+    
+    Args:
+        job: Scan job fields (id, target, scan_type)
+        results: ScanResult rows with category and raw_data
+        max_findings: Cap on findings listed in the report
+        
+    Returns:
+        Template context including the OES breakdown per dimension
+    """
+    builder = ReportContextBuilder(job, max_findings)
+    for row in results:
+        builder.add(row)
+    return builder.context()
+
+
+def render_html(context: Dict[str, Any], inline_css: bool = True) -> str:
+    """
+    Render the report template
+    
+    Args:
+        context: Output of build_report_context
+        inline_css: Embed the stylesheet so the HTML file stands alone
+        
+    Returns:
+        HTML document
+    """
+    directory = template_dir()
+    template = _environment(directory).get_template(REPORT_TEMPLATE)
+    return template.render(**context, inline_css=_stylesheet(directory) if inline_css else None)
+
+
+def render_html_chunks(context: Dict[str, Any], inline_css: bool = True, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Render the report template incrementally as UTF-8 chunks of about chunk_size bytes"""
+    directory = template_dir()
+    template = _environment(directory).get_template(REPORT_TEMPLATE)
+    pending, size = [], 0
+    for piece in template.generate(**context, inline_css=_stylesheet(directory) if inline_css else None):
+        data = piece.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+# Per-process WeasyPrint state, built once by warm_pdf_renderer
+_pdf_state: Dict[str, Any] = {}
+
+
+def warm_pdf_renderer(directory: Optional[str] = None) -> None:
+    """
+    Load WeasyPrint, fonts and the stylesheet once per process
+    
+    Used as the process pool initializer. Rendering a throwaway document
+    makes fontconfig and Pango load their caches before the first real job.
+    """
+    if _pdf_state:
+        return
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    directory = directory or template_dir()
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=_stylesheet(directory), font_config=font_config)
+    HTML(string="<p>warm-up</p>").write_pdf(stylesheets=[stylesheet], font_config=font_config)
+    _pdf_state.update(HTML=HTML, stylesheet=stylesheet, font_config=font_config)
+
+
+def html_to_pdf(html: str) -> bytes:
+    """Convert a rendered report (without inline CSS) to PDF bytes"""
+    warm_pdf_renderer()
+    document = _pdf_state["HTML"](string=html, base_url=template_dir())
+    return document.write_pdf(
+        stylesheets=[_pdf_state["stylesheet"]],
+        font_config=_pdf_state["font_config"],
+    )
+
+
+def html_to_pdf_file(html: str, path: str, key: Optional[bytes] = None) -> int:
+    """
+    Convert a rendered report to PDF straight into a file
+    
+    The PDF is streamed through atomic_writer (and encrypted on the way
+    when a key is given), so the process never holds the whole output.
+    
+    Returns:
+        PDF size in bytes
+    """
+    warm_pdf_renderer()
+    document = _pdf_state["HTML"](string=html, base_url=template_dir())
+    with atomic_writer(path, key) as f:
+        document.write_pdf(
+            target=f,
+            stylesheets=[_pdf_state["stylesheet"]],
+            font_config=_pdf_state["font_config"],
+        )
+    return f.size
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool of warmed PDF renderers, or None to render inline
+    
+    The pool is created lazily and reused for the life of the worker process.
+    It is skipped when REPORT_PDF_WORKERS is 0 and inside daemonic processes
+    such as Celery prefork children, which may not start children of their
+    own.
+    """
+    global _pool
+    if settings.REPORT_PDF_WORKERS <= 0 or multiprocessing.current_process().daemon:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.REPORT_PDF_WORKERS,
+            initializer=warm_pdf_renderer,
+            initargs=(template_dir(),),
+        )
+    return _pool
+
+
+def submit_pdf(html: str, path: str, key: Optional[bytes] = None) -> Future:
+    """Render a PDF to path in the pool, or inline when there is no pool (see get_pdf_pool)"""
+    pool = get_pdf_pool()
+    if pool is not None:
+        return pool.submit(html_to_pdf_file, html, path, key)
+    future: Future = Future()
+    try:
+        future.set_result(html_to_pdf_file(html, path, key))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def close_pdf_pool() -> None:
+    """Shut the PDF process pool down"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
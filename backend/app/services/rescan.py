@@ -0,0 +1,124 @@
+"""
+Incremental rescans: reuse a target's previous findings while they are still valid
+"""
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.schemas import ScanFinding
+from app.services.scoring import DIMENSIONS
+
+logger = logging.getLogger("app.services.rescan")
+
+# Findings are identified by (category, entity); entity None is the scan target
+FindingKey = Tuple[str, Optional[str]]
+
+
+def finding_key(finding: ScanFinding) -> FindingKey:
+    return finding.category, finding.entity
+
+
+@dataclass
+class PreviousScan:
+    """The last completed scan of a target, as the baseline of a rescan"""
+    job_id: str
+    findings: Dict[FindingKey, ScanFinding] = field(default_factory=dict)
+
+    def get(self, name: str, entity: Optional[str]) -> Optional[ScanFinding]:
+        finding = self.findings.get((name, entity))
+        if finding is None or finding.status != "completed" or finding.fetched_at is None:
+            return None
+        return finding
+
+
+def _positive_int(value: Any) -> int:
+    if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+        return value
+    return 0
+
+
+async def reuse_previous(
+    conn,
+    target: str,
+    previous: ScanFinding,
+    runtime=None,
+    limiter=None,
+    now: Optional[float] = None
+) -> Tuple[Optional[ScanFinding], str]:
+    """
+    Decide whether a previous finding can stand in for a new fetch
+
+    A finding younger than the connector's ``data_ttl`` is reused as is.
+    An older one is revalidated upstream with its stored validators (one
+    rate-limited conditional request) and reused if the source reports no
+    change.
+
+    Returns:
+        (finding to reuse or None, outcome) where outcome is "fresh",
+        "not_modified" or "fetch"
+    """
+    now = time.time() if now is None else now
+    if now - previous.fetched_at < _positive_int(getattr(conn, "data_ttl", 0)):
+        return replace(previous), "fresh"
+    if not previous.validators:
+        return None, "fetch"
+    try:
+        if limiter is not None:
+            await limiter.acquire(conn)
+        changed = await conn.revalidate(target, previous.validators, runtime=runtime)
+    except Exception:
+        logger.warning("Revalidation failed for %s, re-fetching", previous.category, exc_info=True)
+        return None, "fetch"
+    if changed is False:
+        return replace(previous, fetched_at=now), "not_modified"
+    return None, "fetch"
+
+
+def diff_findings(
+    previous: Mapping[FindingKey, ScanFinding],
+    current: Iterable[ScanFinding]
+) -> Dict[str, Any]:
+    """
+    Compare a rescan's findings with the previous scan's
+
+    Findings match on (category, entity) and differ when their status or
+    details do. Timed-out findings are reported as changed because their
+    data is unknown.
+    """
+    current = {finding_key(f): f for f in current}
+    added, changed = [], []
+    unchanged = 0
+    for key, finding in current.items():
+        before = previous.get(key)
+        if before is None:
+            added.append(key)
+        elif before.status != finding.status or before.details != finding.details:
+            changed.append(key)
+        else:
+            unchanged += 1
+    removed = [key for key in previous if key not in current]
+
+    def _keys(keys: List[FindingKey]) -> List[Dict[str, Optional[str]]]:
+        return [{"category": category, "entity": entity} for category, entity in sorted(keys, key=str)]
+
+    return {"added": _keys(added), "removed": _keys(removed), "changed": _keys(changed), "unchanged": unchanged}
+
+
+def changed_dimensions(diff: Dict[str, Any], connectors: Mapping[str, Any]) -> List[str]:
+    """
+    OES dimensions touched by a diff
+
+    Each added, removed or changed finding marks the dimensions its
+    connector declares; a connector that declares none, or is unknown,
+    marks all of them.
+    """
+    touched = set()
+    for key in ("added", "removed", "changed"):
+        for item in diff[key]:
+            declared = getattr(connectors.get(item["category"]), "dimensions", None)
+            if isinstance(declared, (tuple, list)) and declared:
+                touched.update(declared)
+            else:
+                return list(DIMENSIONS)
+    return [name for name in DIMENSIONS if name in touched]
@@ -0,0 +1,302 @@
+"""
+Retention service: expires old scans and reports without long locks or WAL bursts
+"""
+import asyncio
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Sequence, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.utils.files import PRECOMPRESSED_SUFFIXES
+
+logger = logging.getLogger("app.services.retention")
+
+PARTITION_NAME = re.compile(r"^scan_results_(\d{4})_(\d{2})$")
+
+LIST_PARTITIONS = text("""
+    SELECT c.relname AS name,
+           pg_total_relation_size(c.oid) AS bytes,
+           GREATEST(c.reltuples, 0)::bigint AS rows,
+           i.inhdetachpending AS detach_pending
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass('scan_results')
+""")
+
+EXPIRED_JOBS = text("""
+    SELECT id FROM scan_jobs
+    WHERE created_at < :cutoff
+    ORDER BY created_at
+    LIMIT :batch
+""")
+
+# One bounded batch of a set of jobs' results, located through the job_id index
+DELETE_RESULTS_BATCH = text("""
+    WITH doomed AS (
+        SELECT id, created_at FROM scan_results
+        WHERE job_id = ANY(:job_ids)
+        LIMIT :batch
+    )
+    DELETE FROM scan_results r
+    USING doomed d
+    WHERE r.id = d.id AND r.created_at = d.created_at
+    RETURNING pg_column_size(r.*) AS bytes
+""")
+
+DELETE_JOBS = text("""
+    DELETE FROM scan_jobs WHERE id = ANY(:job_ids)
+    RETURNING pg_column_size(scan_jobs.*) AS bytes
+""")
+
+EXPIRED_REPORTS = text("""
+    DELETE FROM reports
+    WHERE id IN (
+        SELECT id FROM reports WHERE created_at < :cutoff ORDER BY created_at LIMIT :batch
+    )
+    RETURNING pdf_path, html_path, pg_column_size(reports.*) AS bytes
+""")
+
+REPORTS_OF_JOBS = text("""
+    DELETE FROM reports WHERE job_id = ANY(:job_ids)
+    RETURNING pdf_path, html_path, pg_column_size(reports.*) AS bytes
+""")
+
+PATHS_STILL_REFERENCED = text("""
+    SELECT pdf_path AS path FROM reports WHERE pdf_path = ANY(:paths)
+    UNION
+    SELECT html_path FROM reports WHERE html_path = ANY(:paths)
+""")
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"rows": 0, "bytes": 0, "files": 0, "file_bytes": 0, "batches": 0}
+
+
+def _merge(stats: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in other.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            stats[key] = stats.get(key, 0) + value
+    return stats
+
+
+def _unlink(path: str) -> int:
+    try:
+        size = os.stat(path).st_size
+        os.unlink(path)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def unlink_files(paths: Iterable[str], workers: int = None) -> Dict[str, int]:
+    """
+    Delete report files and their precompressed variants in parallel
+    
+    Paths outside REPORT_OUTPUT_DIR are ignored.
+    
+    Returns:
+        Number of files removed and bytes freed
+    """
+    root = os.path.realpath(settings.REPORT_OUTPUT_DIR) + os.sep
+    targets = []
+    for path in paths:
+        if not path or not os.path.realpath(path).startswith(root):
+            continue
+        targets.append(path)
+        targets.extend(path + suffix for suffix in PRECOMPRESSED_SUFFIXES.values())
+    if not targets:
+        return {"files": 0, "file_bytes": 0}
+    with ThreadPoolExecutor(max_workers=workers or settings.RETENTION_UNLINK_WORKERS) as pool:
+        sizes = list(pool.map(_unlink, targets))
+    return {"files": sum(1 for size in sizes if size), "file_bytes": sum(sizes)}
+
+
+class RetentionService:
+    """
+    Deletes expired scan data in small, throttled transactions
+    
+    Whole monthly partitions of scan_results are detached CONCURRENTLY and
+    dropped when they lie entirely before the cutoff; everything else is deleted in batches of
+    RETENTION_BATCH_SIZE rows, each in its own short transaction with a
+    lock_timeout, sleeping RETENTION_BATCH_SLEEP between batches so API
+    queries never queue behind retention.
+    """
+
+    def __init__(self, batch_size: int = None, batch_sleep: float = None):
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.batch_sleep = settings.RETENTION_BATCH_SLEEP if batch_sleep is None else batch_sleep
+
+    async def _begin_batch(self, db: AsyncSession) -> None:
+        await db.execute(text(f"SET LOCAL lock_timeout = {int(settings.RETENTION_LOCK_TIMEOUT_MS)}"))
+        await db.execute(text(f"SET LOCAL statement_timeout = {int(settings.RETENTION_STATEMENT_TIMEOUT_MS)}"))
+
+    async def _run_batch(self, db: AsyncSession, work):
+        """Run one batch transaction, retrying when it loses a lock race"""
+        for attempt in range(settings.RETENTION_LOCK_RETRIES + 1):
+            try:
+                await self._begin_batch(db)
+                result = await work()
+                await db.commit()
+                return result
+            except DBAPIError:
+                await db.rollback()
+                if attempt == settings.RETENTION_LOCK_RETRIES:
+                    raise
+                logger.info("Retention batch hit a lock or statement timeout, retrying")
+                await asyncio.sleep(self.batch_sleep * (attempt + 2))
+
+    async def _throttle(self) -> None:
+        if self.batch_sleep:
+            await asyncio.sleep(self.batch_sleep)
+
+    async def _detach_partition(self, db: AsyncSession, name: str, pending: bool) -> None:
+        """
+        Detach a partition without an ACCESS EXCLUSIVE lock on scan_results
+
+        DETACH ... CONCURRENTLY (and FINALIZE, which completes an interrupted
+        one) cannot run inside a transaction block, so use an autocommit
+        connection.
+        """
+        mode = "FINALIZE" if pending else "CONCURRENTLY"
+        conn = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        await conn.execute(text(f'ALTER TABLE scan_results DETACH PARTITION "{name}" {mode}'))
+        await db.commit()
+
+    async def drop_expired_partitions(self, db: AsyncSession, cutoff: datetime) -> Dict[str, Any]:
+        """
+        Detach and drop scan_results month partitions that end before the cutoff
+
+        Only the detached table is dropped, so the parent is never locked
+        against API reads or result inserts.
+        
+        Also pre-creates the next RETENTION_PARTITIONS_AHEAD months so
+        inserts always have a partition to land in. Does nothing on an
+        unpartitioned schema.
+        
+        Returns:
+            Partitions dropped with their estimated rows and bytes
+        """
+        stats = {"partitions": [], "rows": 0, "bytes": 0}
+        partitions = (await db.execute(LIST_PARTITIONS)).mappings().all()
+        await db.commit()
+        if not partitions:
+            return stats
+
+        cutoff_month = date(cutoff.year, cutoff.month, 1)
+        for partition in partitions:
+            match = PARTITION_NAME.match(partition["name"])
+            if not match:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            # A partition holds [month, next month); drop it only if that ends by the cutoff
+            if month >= cutoff_month:
+                continue
+            await self._detach_partition(db, partition["name"], partition["detach_pending"])
+            await self._run_batch(db, lambda name=partition["name"]: db.execute(text(f'DROP TABLE "{name}"')))
+            stats["partitions"].append(partition["name"])
+            stats["rows"] += int(partition["rows"])
+            stats["bytes"] += int(partition["bytes"])
+            await self._throttle()
+
+        this_month = date.today().replace(day=1)
+        for ahead in range(settings.RETENTION_PARTITIONS_AHEAD + 1):
+            month = date(this_month.year + (this_month.month - 1 + ahead) // 12, (this_month.month - 1 + ahead) % 12 + 1, 1)
+            await db.execute(text("SELECT ensure_scan_results_partition(:month)"), {"month": month})
+        await db.commit()
+        return stats
+
+    async def _delete_results(self, db: AsyncSession, job_ids: Sequence) -> Dict[str, Any]:
+        stats = _empty_stats()
+        while True:
+            async def work():
+                return (await db.execute(
+                    DELETE_RESULTS_BATCH, {"job_ids": list(job_ids), "batch": self.batch_size}
+                )).scalars().all()
+
+            deleted = await self._run_batch(db, work)
+            stats["rows"] += len(deleted)
+            stats["bytes"] += sum(deleted)
+            stats["batches"] += 1
+            if len(deleted) < self.batch_size:
+                return stats
+            await self._throttle()
+
+    async def _release_files(self, db: AsyncSession, paths: Set[str]) -> Dict[str, int]:
+        """Unlink report files no remaining report points at (files are content-addressed and shared)"""
+        if not paths:
+            return {"files": 0, "file_bytes": 0}
+        shared = set((await db.execute(PATHS_STILL_REFERENCED, {"paths": list(paths)})).scalars().all())
+        await db.commit()
+        orphaned = paths - shared
+        return await asyncio.get_running_loop().run_in_executor(None, unlink_files, orphaned)
+
+    async def purge_scans(self, db: AsyncSession, cutoff: datetime) -> Dict[str, Any]:
+        """
+        Delete scan jobs created before the cutoff with their results and reports
+        
+        Returns:
+            jobs, rows and bytes deleted, partitions dropped and report files unlinked
+        """
+        stats = _empty_stats()
+        stats["jobs"] = 0
+        partitions = await self.drop_expired_partitions(db, cutoff)
+        stats["partitions"] = partitions["partitions"]
+        stats["rows"] += partitions["rows"]
+        stats["bytes"] += partitions["bytes"]
+
+        while True:
+            job_ids = (await db.execute(EXPIRED_JOBS, {"cutoff": cutoff, "batch": self.batch_size})).scalars().all()
+            await db.commit()
+            if not job_ids:
+                return stats
+            _merge(stats, await self._delete_results(db, job_ids))
+
+            async def work():
+                reports = (await db.execute(REPORTS_OF_JOBS, {"job_ids": list(job_ids)})).all()
+                jobs = (await db.execute(DELETE_JOBS, {"job_ids": list(job_ids)})).scalars().all()
+                return reports, jobs
+
+            reports, jobs = await self._run_batch(db, work)
+            stats["jobs"] += len(jobs)
+            stats["rows"] += len(jobs) + len(reports)
+            stats["bytes"] += sum(jobs) + sum(r.bytes for r in reports)
+            _merge(stats, await self._release_files(db, {p for r in reports for p in (r.pdf_path, r.html_path)}))
+            stats["batches"] += 1
+            if len(job_ids) < self.batch_size:
+                return stats
+            await self._throttle()
+
+    async def purge_reports(self, db: AsyncSession, cutoff: datetime) -> Dict[str, Any]:
+        """
+        Delete reports generated before the cutoff and unlink their files
+        
+        Returns:
+            Report rows and bytes deleted, files and file bytes unlinked
+        """
+        stats = _empty_stats()
+        stats["reports"] = 0
+        while True:
+            async def work():
+                return (await db.execute(EXPIRED_REPORTS, {"cutoff": cutoff, "batch": self.batch_size})).all()
+
+            reports = await self._run_batch(db, work)
+            stats["reports"] += len(reports)
+            stats["rows"] += len(reports)
+            stats["bytes"] += sum(r.bytes for r in reports)
+            stats["batches"] += 1
+            _merge(stats, await self._release_files(db, {p for r in reports for p in (r.pdf_path, r.html_path)}))
+            if len(reports) < self.batch_size:
+                return stats
+            await self._throttle()
+
+
+def retention_cutoff(days: int) -> datetime:
+    """Start of the retention window"""
+    return datetime.now(timezone.utc) - timedelta(days=days)
@@ -1,19 +1,114 @@
 """
 Scan service for managing scan operations
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, update
+import base64
+import json
 import uuid
 import time
 import asyncio
 import logging
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass, field as dataclass_field
 
+from app.core.config import settings
 from app.models.scan_job import ScanJob, ScanStatus
 from app.models.scan_result import ScanResult
-from app.worker import celery_app
+from app.models.enums import UserRole
+from app.models.user import User
+from app.db.bulk import copy_rows, new_ids
+from app.worker import celery_app, PRIORITY_INTERACTIVE
 from app.schemas import ScanFinding
-from app.services.scoring import compute_overall_score
+from app.connectors.runtime import (
+    ConnectorRuntime,
+    get_connector_runtime,
+    close_connector_runtime,
+)
+from app.connectors.cache import ConnectorCache, get_connector_cache, close_connector_cache, normalize_target
+from app.services.features import FindingsExtractor
+from app.services.rescan import PreviousScan, reuse_previous, diff_findings, changed_dimensions
+
+
+# Columns written by bulk persistence; created_at keeps its server default
+SCAN_RESULT_COLUMNS = ("id", "job_id", "domain_or_email", "category", "raw_data", "penalty_score")
+
+
+# Scan metadata kept in raw_data next to the connector's details
+SCAN_METADATA_KEYS = ("scan_status", "entities", "validators", "fetched_at")
+
+
+# Columns callers may project from scan results; id and created_at are always
+# returned because they form the pagination cursor
+RESULT_FIELDS = ("id", "job_id", "domain_or_email", "category", "raw_data", "penalty_score", "created_at")
+
+
+def encode_cursor(created_at: datetime, result_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for the row after which the next page starts"""
+    payload = json.dumps([created_at.isoformat(), str(result_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, result_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(result_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated field projection; raises ValueError on unknown fields"""
+    if not fields:
+        return RESULT_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(requested) - set(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(f for f in RESULT_FIELDS if f in requested or f in ("id", "created_at"))
+
+
+def finding_raw_data(finding: ScanFinding) -> Dict[str, Any]:
+    """The raw_data column of a finding, with the scan metadata rescans need"""
+    data = dict(finding.details)
+    if finding.status != "completed":
+        data["scan_status"] = finding.status
+    for key in SCAN_METADATA_KEYS[1:]:
+        value = getattr(finding, key)
+        if value:
+            data[key] = value
+    return data
+
+
+def finding_from_row(row: Mapping[str, Any], target: str) -> ScanFinding:
+    """Rebuild a ScanFinding from a stored scan result (inverse of finding_raw_data)"""
+    details = dict(row["raw_data"])
+    meta = {key: details.pop(key, None) for key in SCAN_METADATA_KEYS}
+    entity = row["domain_or_email"]
+    return ScanFinding(
+        category=row["category"],
+        details=details,
+        status=meta["scan_status"] or "completed",
+        entity=None if normalize_target(entity) == normalize_target(target) else entity,
+        entities=meta["entities"] or {},
+        validators=meta["validators"] or {},
+        fetched_at=meta["fetched_at"],
+    )
+
+
+def _results_query(job_id: uuid.UUID, fields: Sequence[str]):
+    columns = [getattr(ScanResult, f) for f in fields]
+    return (
+        select(*columns)
+        .where(ScanResult.job_id == job_id)
+        .order_by(ScanResult.created_at, ScanResult.id)
+    )
 
 
 class ScanService:
@@ -24,19 +119,23 @@ class ScanService:
         target: str, 
         scan_type: str, 
         user_id: str, 
-        db: AsyncSession
+        db: AsyncSession,
+        incremental: bool = False
     ) -> ScanJob:
         """
         Start a new scan job
+        
+        Incremental scans only re-fetch sources whose previous findings for
+        the target have expired or changed upstream.
         """
-        # Create scan job record
-        job_id = str(uuid.uuid4())
+        # Create scan job record; the task reports back under the row's own id
+        job_id = uuid.uuid4()
         scan_job = ScanJob(
-            job_id=job_id,
+            id=job_id,
             target=target,
             scan_type=scan_type,
             status=ScanStatus.pending,
-            user_id=user_id
+            user_id=uuid.UUID(str(user_id))
         )
         
         db.add(scan_job)
@@ -46,7 +145,9 @@ class ScanService:
         # Enqueue Celery task
         celery_app.send_task(
             "app.tasks.scan.run_scan",
-            args=[target, job_id, scan_type]
+            args=[target, str(job_id), scan_type],
+            kwargs={"incremental": incremental},
+            priority=PRIORITY_INTERACTIVE
         )
         
         return scan_job
@@ -59,18 +160,23 @@ class ScanService:
         """
         Get scan job status
         """
-        # In a real implementation, you would query the database
-        # For now, return mock data
-        return ScanJob(
-            id=str(uuid.uuid4()),
-            job_id=job_id,
-            target="example.com",
-            scan_type="domain",
-            status=ScanStatus.done,
-            progress="100",
-            user_id=str(uuid.uuid4())
-        )
+        try:
+            return await db.get(ScanJob, uuid.UUID(str(job_id)))
+        except ValueError:
+            return None
     
+    async def get_owned_job(self, job_id: uuid.UUID, user: User, db: AsyncSession) -> Optional[ScanJob]:
+        """
+        The scan job if ``user`` may see it: its owner, or any admin
+
+        Returns None both for unknown jobs and for other users' jobs, so
+        callers cannot tell them apart.
+        """
+        stmt = select(ScanJob).where(ScanJob.id == job_id)
+        if user.role != UserRole.admin:
+            stmt = stmt.where(ScanJob.user_id == uuid.UUID(str(user.id)))
+        return (await db.execute(stmt)).scalar_one_or_none()
+
     async def get_scan_results(
         self, 
         job_id: str, 
@@ -100,6 +206,125 @@ class ScanService:
             )
         ]
     
+    async def save_scan_results(
+        self,
+        job_id: str,
+        target: str,
+        findings: Iterable[ScanFinding],
+        db: AsyncSession,
+        penalty_scores: Optional[Dict[str, float]] = None
+    ) -> List[uuid.UUID]:
+        """
+        Persist scan findings as ScanResult rows in bulk
+
+        Rows are written in SCAN_RESULTS_BATCH_SIZE batches with one round
+        trip each (COPY on asyncpg) instead of one ORM object per finding.
+        Primary keys are generated here so the written ids can be returned.
+        """
+        findings = list(findings)
+        ids = new_ids(len(findings))
+        penalty_scores = penalty_scores or {}
+        rows = (
+            {
+                "id": result_id,
+                "job_id": uuid.UUID(str(job_id)),
+                "domain_or_email": finding.entity or target,
+                "category": finding.category,
+                "raw_data": finding_raw_data(finding),
+                "penalty_score": float(penalty_scores.get(finding.category, 0.0)),
+            }
+            for result_id, finding in zip(ids, findings)
+        )
+        await copy_rows(
+            db,
+            ScanResult.__table__,
+            rows,
+            columns=SCAN_RESULT_COLUMNS,
+            batch_size=settings.SCAN_RESULTS_BATCH_SIZE,
+            json_columns=("raw_data",)
+        )
+        await db.commit()
+        return ids
+
+    async def load_previous_scan(
+        self,
+        target: str,
+        scan_type: str,
+        db: AsyncSession,
+        exclude_job_id: Optional[str] = None
+    ) -> Optional[PreviousScan]:
+        """
+        Findings of the target's most recent completed scan
+
+        Returns None when the target has never been scanned to completion.
+        """
+        stmt = (
+            select(ScanJob.id)
+            .where(
+                ScanJob.target == target,
+                ScanJob.scan_type == scan_type,
+                ScanJob.status == ScanStatus.done,
+            )
+            .order_by(ScanJob.created_at.desc())
+            .limit(1)
+        )
+        if exclude_job_id is not None:
+            stmt = stmt.where(ScanJob.id != uuid.UUID(str(exclude_job_id)))
+        job_id = (await db.execute(stmt)).scalar_one_or_none()
+        if job_id is None:
+            return None
+        previous = PreviousScan(job_id=str(job_id))
+        rows = self.stream_scan_results(job_id, db, fields=("domain_or_email", "category", "raw_data"))
+        async for row in rows:
+            finding = finding_from_row(row, target)
+            previous.findings[(finding.category, finding.entity)] = finding
+        return previous
+
+    async def get_scan_results_page(
+        self,
+        job_id: uuid.UUID,
+        db: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Sequence[str] = RESULT_FIELDS
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One keyset page of scan results ordered by (created_at, id)
+
+        Returns the rows and the cursor for the next page (None on the last page).
+        """
+        stmt = _results_query(job_id, fields)
+        if cursor:
+            created_at, result_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(ScanResult.created_at, ScanResult.id) > (created_at, result_id))
+        # Fetch one extra row to learn whether another page exists
+        rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+        page = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        return page, next_cursor
+
+    async def stream_scan_results(
+        self,
+        job_id: uuid.UUID,
+        db: AsyncSession,
+        fields: Sequence[str] = RESULT_FIELDS
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every result of a scan from a server-side cursor
+
+        Rows arrive in SCAN_RESULTS_STREAM_CHUNK chunks, so memory stays flat
+        regardless of how many results the scan produced.
+        """
+        stmt = _results_query(job_id, fields).execution_options(
+            yield_per=settings.SCAN_RESULTS_STREAM_CHUNK
+        )
+        result = await db.stream(stmt)
+        async for row in result.mappings():
+            yield dict(row)
+
     async def update_scan_status(
         self, 
         job_id: str, 
@@ -111,26 +336,383 @@ class ScanService:
     ) -> None:
         """
         Update scan job status
+
+        ScanJob only stores status and progress; an error message is logged.
         """
-        # In a real implementation, you would update the database
-        pass 
+        await db.execute(
+            update(ScanJob)
+            .where(ScanJob.id == uuid.UUID(str(job_id)))
+            .values(status=status, progress=str(progress))
+        )
+        await db.commit()
+        if error_message:
+            logger().warning("Scan %s %s: %s", job_id, status.value, error_message)
 
 def logger():
     return logging.getLogger("scan")
 
-async def scan_target(target: str, connectors: dict):
-    findings: list[ScanFinding] = []
-    async def _run(conn):
-        raw = await conn.fetch(target)
-        return conn.normalize(raw)
-    coros = [_run(c) for c in connectors.values()]
-    for coro in asyncio.as_completed(coros):
+def _connector_timeout(conn) -> float:
+    """Per-connector deadline, falling back to the configured default"""
+    timeout = getattr(conn, "timeout", None)
+    if isinstance(timeout, (int, float)) and not isinstance(timeout, bool):
+        return float(timeout)
+    return settings.SCAN_CONNECTOR_TIMEOUT
+
+async def _run_connector(
+    name: str,
+    conn,
+    target: str,
+    semaphore: asyncio.Semaphore,
+    runtime: ConnectorRuntime,
+    cache: ConnectorCache,
+    timing: Optional[Dict[str, float]] = None,
+    previous: Optional[ScanFinding] = None,
+    outcomes: Optional[Counter] = None
+) -> Optional[ScanFinding]:
+    """
+    Run one connector under the shared semaphore and its own deadline.
+
+    Returns a "timed_out" finding when the deadline passes and None when the
+    connector fails, so one bad source never sinks the whole scan. When
+    given, ``timing`` receives the loop times the connector started (after
+    its semaphore slot) and finished. With a ``previous`` finding the
+    connector only fetches if that finding can no longer be reused; how each
+    run was served is counted in ``outcomes``.
+    """
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        if timing is not None:
+            timing["started"] = loop.time()
         try:
-            findings.append(await coro)
-        except Exception as exc:
-            logger().exception("Error in connector %s", getattr(exc, "name", "unknown"))
-    overall = compute_overall_score(findings)
-    return {"status": "completed", "overall_score": overall, "results": findings}
+            return await asyncio.wait_for(
+                _fetch_finding(conn, target, runtime, cache, previous, outcomes),
+                _connector_timeout(conn)
+            )
+        except asyncio.TimeoutError:
+            logger().warning("Connector %s timed out for %s", name, target)
+            return ScanFinding(category=name, details={}, status="timed_out")
+        except Exception:
+            logger().exception("Error in connector %s", name)
+            return None
+        finally:
+            if timing is not None:
+                timing["finished"] = loop.time()
+
+
+async def _fetch_finding(
+    conn,
+    target: str,
+    runtime: ConnectorRuntime,
+    cache: ConnectorCache,
+    previous: Optional[ScanFinding],
+    outcomes: Optional[Counter]
+) -> ScanFinding:
+    outcome = "fetch"
+    if previous is not None:
+        finding, outcome = await reuse_previous(conn, target, previous, runtime=runtime, limiter=cache.limiter)
+        if finding is not None:
+            if outcomes is not None:
+                outcomes[outcome] += 1
+            return finding
+    finding = await cache.fetch_normalized(conn, target, runtime=runtime)
+    if outcomes is not None:
+        outcomes[outcome] += 1
+    # Cache hits already carry the time their response was fetched upstream
+    if isinstance(finding, ScanFinding) and finding.fetched_at is None:
+        finding.fetched_at = time.time()
+    return finding
+
+
+def _declared(value) -> Optional[Tuple[str, ...]]:
+    """A connector's inputs/outputs declaration, or None if it has none"""
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return tuple(value)
+    return None
+
+
+@dataclass
+class _Step:
+    """One connector run on one entity in the scan graph"""
+    name: str
+    entity: str
+    kind: str
+    parent: Optional["_Step"]
+    depth: int
+    queued: float
+    timing: Dict[str, float] = dataclass_field(default_factory=dict)
+
+
+def _critical_path(steps: List[_Step], started: float) -> Dict[str, Any]:
+    """
+    The chain of dependent steps that finished last
+
+    Each hop records when it ran relative to the scan start, how long it
+    took and how long it waited for a connector slot after its input was
+    discovered. Speeding up anything off this path cannot shorten the scan.
+    """
+    finished = [s for s in steps if "finished" in s.timing]
+    if not finished:
+        return {"seconds": 0.0, "path": []}
+    step: Optional[_Step] = max(finished, key=lambda s: s.timing["finished"])
+    total = step.timing["finished"] - started
+    path = []
+    while step is not None:
+        run_started = step.timing.get("started", step.queued)
+        path.append({
+            "connector": step.name,
+            "entity": step.entity,
+            "kind": step.kind,
+            "start": round(run_started - started, 6),
+            "seconds": round(step.timing["finished"] - run_started, 6),
+            "waited": round(run_started - step.queued, 6),
+        })
+        step = step.parent
+    path.reverse()
+    return {"seconds": round(total, 6), "path": path}
+
+
+async def scan_target(
+    target: str,
+    connectors: dict,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    scan_timeout: Optional[float] = None,
+    runtime: Optional[ConnectorRuntime] = None,
+    cache: Optional[ConnectorCache] = None,
+    on_finding: Optional[Callable[[ScanFinding, int, int], Awaitable[None]]] = None,
+    target_type: str = "domain",
+    previous: Optional[PreviousScan] = None,
+    extractor: Optional[FindingsExtractor] = None
+):
+    """
+    Run a target's connector graph with bounded concurrency.
+
+    Connectors without declared ``inputs`` run once on the target. A
+    connector declaring ``inputs`` runs on the target when its kind matches
+    and again on every entity of those kinds that an upstream connector
+    discovers (see BaseConnector.discover). Each downstream run starts as
+    soon as its entity is found, so fan-out overlaps with the rest of the
+    scan rather than waiting for whole stages.
+
+    Args:
+        target: Domain or email to scan
+        connectors: Mapping of connector name to connector instance
+        semaphore: Shared concurrency budget (defaults to SCAN_MAX_CONCURRENCY per scan)
+        scan_timeout: Whole-scan deadline; connectors still running when it
+            passes are cancelled and reported as timed out
+        runtime: Shared connector transport (defaults to this loop's runtime)
+        cache: Connector response cache (defaults to the process-wide cache)
+        on_finding: Awaited with (finding, connector runs done, runs scheduled
+            so far) as each run finishes, e.g. to stream progress to clients
+        target_type: Entity kind of the target ("domain" or "email")
+        previous: The target's last scan; makes this an incremental rescan
+            that reuses findings still within their connector's data_ttl or
+            confirmed unchanged upstream (see app.services.rescan)
+        extractor: Receives every finding before on_finding is awaited, so
+            the callback can read the live OES from it
+
+    Returns:
+        Scan summary with the (possibly partial) findings, overall score with
+        its per-dimension deductions and critical-path timing; incremental rescans add how each connector run
+        was served, the diff against the previous scan and the OES
+        dimensions it touched
+    """
+    semaphore = semaphore or asyncio.Semaphore(settings.SCAN_MAX_CONCURRENCY)
+    scan_timeout = scan_timeout if scan_timeout is not None else settings.SCAN_TIMEOUT
+    runtime = runtime or get_connector_runtime()
+    cache = cache or get_connector_cache()
+    extractor = extractor if extractor is not None else FindingsExtractor()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + scan_timeout
+
+    consumers: Dict[str, List[str]] = {}
+    for name, conn in connectors.items():
+        for kind in _declared(getattr(conn, "inputs", None)) or ():
+            consumers.setdefault(kind, []).append(name)
+
+    tasks: Dict[asyncio.Task, _Step] = {}
+    steps: List[_Step] = []
+    outcomes: Counter = Counter()
+    seen = set()
+    discovered: Dict[str, set] = {}
+
+    def schedule(name: str, entity: str, kind: str, parent: Optional[_Step]) -> None:
+        if (name, entity) in seen:
+            return
+        seen.add((name, entity))
+        step = _Step(name, entity, kind, parent, parent.depth + 1 if parent else 0, loop.time())
+        steps.append(step)
+        before = previous.get(name, entity if parent else None) if previous is not None else None
+        task = asyncio.create_task(_run_connector(
+            name, connectors[name], entity, semaphore, runtime, cache, step.timing, before, outcomes
+        ))
+        tasks[task] = step
+
+    for name, conn in connectors.items():
+        inputs = _declared(getattr(conn, "inputs", None))
+        if inputs is None or target_type in inputs:
+            schedule(name, target, target_type, None)
+    discovered[target_type] = {target}
+
+    findings: list[ScanFinding] = []
+    completed = 0
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(
+            pending,
+            timeout=max(0.0, deadline - loop.time()),
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            break
+        for task in done:
+            completed += 1
+            step = tasks[task]
+            finding = task.result()
+            if finding is None:
+                continue
+            if step.parent is not None:
+                finding.entity = step.entity
+            findings.append(finding)
+            extractor.add(finding)
+            # Fan out over newly discovered entities
+            if finding.status == "completed" and step.depth < settings.SCAN_GRAPH_MAX_DEPTH:
+                conn = connectors[step.name]
+                found = conn.discover(finding) if _declared(getattr(conn, "outputs", None)) else {}
+                for kind, values in found.items():
+                    known = discovered.setdefault(kind, set())
+                    for value in values:
+                        if value in known or len(known) >= settings.SCAN_GRAPH_MAX_ENTITIES:
+                            continue
+                        known.add(value)
+                        for consumer in consumers.get(kind, ()):
+                            schedule(consumer, value, kind, step)
+                pending |= {t for t in tasks if not t.done() and t not in pending}
+            if on_finding is not None:
+                await on_finding(finding, completed, len(tasks))
+
+    # Scan deadline passed: cancel stragglers and return what we have
+    for task in pending:
+        task.cancel()
+        step = tasks[task]
+        logger().warning("Connector %s cancelled at scan deadline for %s", step.name, step.entity)
+        finding = ScanFinding(
+            category=step.name, details={}, status="timed_out",
+            entity=step.entity if step.parent is not None else None
+        )
+        findings.append(finding)
+        extractor.add(finding)
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    overall = extractor.score()
+    summary = {
+        "status": "partial" if pending else "completed",
+        "overall_score": overall.score,
+        "deductions": overall.deductions,
+        "results": findings,
+        "timing": {
+            "seconds": round(loop.time() - started, 6),
+            "connector_runs": len(steps),
+            "critical_path": _critical_path(steps, started),
+        }
+    }
+    if previous is not None:
+        diff = diff_findings(previous.findings, findings)
+        changed = changed_dimensions(diff, connectors)
+        previous_score = FindingsExtractor().add_all(previous.findings.values()).score()
+        overall = extractor.score(previous_score, changed)
+        summary["overall_score"], summary["deductions"] = overall.score, overall.deductions
+        summary["incremental"] = {
+            "previous_job_id": previous.job_id,
+            "previous_score": previous_score.score,
+            "reused": outcomes["fresh"],
+            "not_modified": outcomes["not_modified"],
+            "fetched": outcomes["fetch"],
+            "diff": diff,
+            "changed_dimensions": changed,
+        }
+    return summary
+
+async def scan_targets(
+    targets: Iterable[str],
+    connectors: dict,
+    scan_timeout: Optional[float] = None,
+    target_type: str = "domain"
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Scan many targets on the current loop, yielding each result as it finishes.
+
+    At most SCAN_BATCH_CONCURRENCY targets are in flight at once, and all of
+    them draw connector slots from one shared semaphore, so a single worker can
+    keep the network busy without opening unbounded connections.
+    """
+    target_slots = asyncio.Semaphore(settings.SCAN_BATCH_CONCURRENCY)
+    connector_slots = asyncio.Semaphore(settings.SCAN_BATCH_CONNECTOR_CONCURRENCY)
+
+    async def _scan_one(target: str) -> Tuple[str, dict]:
+        async with target_slots:
+            try:
+                return target, await scan_target(
+                    target, connectors, semaphore=connector_slots,
+                    scan_timeout=scan_timeout, target_type=target_type
+                )
+            except Exception as exc:
+                logger().exception("Batch scan failed for %s", target)
+                return target, {"status": "failed", "error": str(exc), "results": []}
+
+    tasks = [asyncio.create_task(_scan_one(t)) for t in targets]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# One long-lived event loop per worker process, reused across tasks. It runs
+# in a background thread so every task thread of a "threads" pool can
+# submit coroutines to it and all their connector I/O is multiplexed.
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_thread: Optional[threading.Thread] = None
+_worker_pid: Optional[int] = None
+_worker_lock = threading.Lock()
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's scan event loop, starting it on first use"""
+    global _worker_loop, _worker_thread, _worker_pid
+    with _worker_lock:
+        # A loop inherited through fork has no thread driving it
+        if _worker_loop is None or _worker_loop.is_closed() or _worker_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="scan-loop", daemon=True)
+            thread.start()
+            _worker_loop, _worker_thread, _worker_pid = loop, thread, os.getpid()
+        return _worker_loop
+
+def run_in_worker_loop(coro):
+    """Run a coroutine on the shared worker loop and wait for its result (thread-safe)"""
+    loop = get_worker_loop()
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+def close_worker_loop() -> None:
+    """Shut down the worker loop, connector cache and runtime (called at worker process shutdown)"""
+    global _worker_loop, _worker_thread, _worker_pid
+    with _worker_lock:
+        loop, thread = _worker_loop, _worker_thread
+        _worker_loop = _worker_thread = _worker_pid = None
+    if loop is None or loop.is_closed():
+        return
+    if thread is not None and thread.is_alive():
+        for closer in (close_connector_cache(), close_connector_runtime(), loop.shutdown_asyncgens()):
+            asyncio.run_coroutine_threadsafe(closer, loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+    loop.close()
 
 def scan_target_sync(*args, **kw):
-    return asyncio.run(scan_target(*args, **kw)) 
\ No newline at end of file
+    return run_in_worker_loop(scan_target(*args, **kw))
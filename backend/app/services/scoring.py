@@ -1,6 +1,11 @@
-from typing import Dict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+import numpy as np
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+from app.services.scoring_rules import RuleSet, compile_rules, load_rule_spec
+
 # Input model according to PRD weights and flags
 class ScoringInput(BaseModel):
     # D1: Domain Footprint (max 10)
@@ -46,69 +51,144 @@ class ScoringResult(BaseModel):
     deductions: Dict[str, float]
     total_deduction: float
     score: float
+    rules_version: Optional[str] = None  # Rule spec version that produced the deductions
+
+# Column groups for the batch engine, derived from ScoringInput
+BOOL_FIELDS = tuple(
+    name for name, field in ScoringInput.model_fields.items() if field.annotation is bool
+)
+COUNT_FIELDS = tuple(
+    name for name, field in ScoringInput.model_fields.items() if field.annotation is int
+)
+
+# PRD rule table (or SCORING_RULES_FILE) compiled once at startup
+RULES: RuleSet = compile_rules(load_rule_spec(settings.SCORING_RULES_FILE), BOOL_FIELDS, COUNT_FIELDS)
+DIMENSIONS = RULES.dimensions
+DIMENSION_CAPS = RULES.caps
+
+# Fields feeding each dimension (and back), derived from the compiled table
+DIMENSION_FIELDS = RULES.dimension_fields
+FIELD_DIMENSIONS = RULES.field_dimensions
+
+def result_from_deductions(deductions: Dict[str, float], rules_version: Optional[str] = None) -> ScoringResult:
+    """ScoringResult with the total and score of per-dimension deductions"""
+    total = sum(deductions.values())
+    return ScoringResult(
+      deductions=deductions,
+      total_deduction=total,
+      score=max(0, 100 - total),
+      rules_version=rules_version
+    )
 
-def calculate_oes(input: ScoringInput) -> ScoringResult:
+def calculate_oes(input: ScoringInput, rules: Optional[RuleSet] = None) -> ScoringResult:
     """
     Compute OES = 100 - (D1 + D2 + D3 + D4 + D5 + D6)
     Penalty breakdown and caps per PRD:
       D1 (10), D2 (25), D3 (20), D4 (20), D5 (15), D6 (10)
+    Weights, thresholds and caps come from the compiled rule table.
     """
-    # D1: Domain Footprint (max 10 points)
-    d1 = 0
-    if input.subdomain_count > 50: d1 += 2
-    if not input.has_spf_dkim:      d1 += 3
-    if input.domain_expiry_days < 30: d1 += 2
-    if not input.privacy_enabled:   d1 += 2
-    if input.whois_email_exposed:   d1 += 1
-    d1 = min(d1, 10)
-
-    # D2: Breach & Credential Exposure (max 25 points)
-    d2 = input.breach_instances * 2
-    if input.password_exposed:      d2 += 5
-    if input.credential_reuse:       d2 += 3
-    if input.leaked_in_code:         d2 += 5
-    if input.unique_emails_exposed > 10:
-        d2 += 10
-    d2 = min(d2, 25)
-
-    # D3: Infrastructure & Network (max 20 points)
-    d3 = 0
-    d3 += min(input.open_ports_count, 1) * 5
-    if not input.has_waf:           d3 += 2
-    if input.infra_outdated:        d3 += 3
-    d3 += min(input.vulnerable_services_count, 1) * 5
-    if input.cdn_bypass_detected:    d3 += 5
-    d3 = min(d3, 20)
-
-    # D4: Application/Website Risk (max 20 points)
-    d4 = 0
-    if input.outdated_cms:          d4 += 5
-    if input.missing_security_headers: d4 += 3
-    d4 += min(input.known_cve_count, 1) * 5
-    d4 += min(input.public_repo_leaks_count, 1) * 4
-    d4 += min(input.exploit_tech_count, 1) * 3
-    d4 = min(d4, 20)
-
-    # D5: Social & OSINT Intelligence (max 15 points)
-    d5 = 0
-    if input.employee_emails_exposed: d5 += 5
-    d5 += min(input.public_org_leaks_count, 1) * 4
-    if input.used_in_phishing:       d5 += 3
-    if input.predictable_pattern:    d5 += 3
-    d5 = min(d5, 15)
-
-    # D6: Threat Intelligence / Dark Web (max 10 points)
-    d6 = 0
-    if input.seen_in_marketplaces:   d6 += 5
-    d6 += min(input.underground_mentions_count, 1) * 3
-    d6 += min(input.ioc_match_count, 1) * 2
-    d6 = min(d6, 10)
-
-    total = d1 + d2 + d3 + d4 + d5 + d6
-    score = max(0, 100 - total)
+    rules = rules or RULES
+    return result_from_deductions(rules.evaluate(input), rules.version)
 
-    return ScoringResult(
-      deductions={'D1': d1,'D2': d2,'D3': d3,'D4': d4,'D5': d5,'D6': d6},
-      total_deduction=total,
-      score=score
-    ) 
\ No newline at end of file
+def rescore(
+    input: ScoringInput,
+    previous: ScoringResult,
+    changed: Iterable[str],
+    rules: Optional[RuleSet] = None
+) -> ScoringResult:
+    """
+    Recompute only the ``changed`` dimensions of a previous result.
+
+    Used by incremental rescans: dimensions whose findings did not change
+    keep their previous deduction, the rest are evaluated against ``input``.
+    """
+    rules = rules or RULES
+    changed = set(changed)
+    unknown = changed - set(rules.dimensions)
+    if unknown:
+        raise ValueError(f"Unknown scoring dimensions: {', '.join(sorted(unknown))}")
+    deductions = dict(previous.deductions)
+    for name in changed:
+        deductions[name] = rules.evaluate_dimension(name, input)
+    return result_from_deductions(deductions, rules.version)
+
+@dataclass
+class BatchScoringResult:
+    """Columnar OES results, one entry per scored target."""
+    deductions: Dict[str, np.ndarray]
+    total_deduction: np.ndarray
+    score: np.ndarray
+    rules_version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def result(self, i: int) -> ScoringResult:
+        """Materialize row ``i`` as a ScoringResult"""
+        return ScoringResult(
+            deductions={k: float(v[i]) for k, v in self.deductions.items()},
+            total_deduction=float(self.total_deduction[i]),
+            score=float(self.score[i]),
+            rules_version=self.rules_version
+        )
+
+def columns_from_inputs(inputs: Iterable[ScoringInput]) -> Dict[str, np.ndarray]:
+    """Convert a sequence of ScoringInput rows into struct-of-arrays columns"""
+    rows = list(inputs)
+    columns: Dict[str, np.ndarray] = {}
+    for name in BOOL_FIELDS:
+        columns[name] = np.fromiter((getattr(r, name) for r in rows), dtype=bool, count=len(rows))
+    for name in COUNT_FIELDS:
+        columns[name] = np.fromiter((getattr(r, name) for r in rows), dtype=np.int64, count=len(rows))
+    return columns
+
+def _as_columns(columns: Mapping[str, Sequence]) -> Dict[str, np.ndarray]:
+    """Coerce and validate the batch columns (same rules as ScoringInput)"""
+    missing = [name for name in ScoringInput.model_fields if name not in columns]
+    if missing:
+        raise ValueError(f"Missing scoring columns: {', '.join(missing)}")
+
+    cols: Dict[str, np.ndarray] = {}
+    for name in BOOL_FIELDS:
+        cols[name] = np.asarray(columns[name], dtype=bool)
+    for name in COUNT_FIELDS:
+        col = np.asarray(columns[name], dtype=np.int64)
+        if (col < 0).any():
+            raise ValueError(f"Column {name} must be >= 0")
+        cols[name] = col
+
+    lengths = {col.shape for col in cols.values()}
+    if len(lengths) != 1 or len(next(iter(lengths))) != 1:
+        raise ValueError("Scoring columns must be 1-D arrays of equal length")
+    return cols
+
+def calculate_oes_batch(columns: Mapping[str, Sequence], rules: Optional[RuleSet] = None) -> BatchScoringResult:
+    """
+    Vectorized calculate_oes over struct-of-arrays input.
+
+    ``columns`` maps every ScoringInput field name to an array-like with one
+    entry per target. Deductions are computed from the same compiled rules
+    as the scalar path, in integer arithmetic for integer weights, so every
+    row matches calculate_oes bit for bit.
+    """
+    rules = rules or RULES
+    deductions = rules.evaluate_batch(_as_columns(columns))
+    total = sum(deductions.values())
+    score = np.maximum(0, 100 - total)
+
+    return BatchScoringResult(
+        deductions={k: v.astype(np.float64) for k, v in deductions.items()},
+        total_deduction=total.astype(np.float64),
+        score=score.astype(np.float64),
+        rules_version=rules.version
+    )
+
+def compute_overall_score(findings) -> float:
+    """OES of a set of ScanFindings (see app.services.features)"""
+    # features builds on this module, so import it on use
+    from app.services.features import FindingsExtractor
+
+    extractor = FindingsExtractor()
+    for finding in findings:
+        extractor.add(finding)
+    return extractor.score().score
@@ -0,0 +1,283 @@
+"""
+Declarative OES rule table and its compiler
+
+The PRD weights live in RULE_SPEC as data. compile_rules() turns a spec into
+a RuleSet: a flat plan of (dimension, field, test, weight) rows plus Python
+and numpy evaluators generated from that plan, so the scalar and batch
+engines score from the same table. Compiled sets are cached by spec version.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# How a rule tests its field; "per_unit" charges weight for every unit of a count
+RULE_OPS = {
+    "true": "{x}",
+    "false": "not {x}",
+    "gt": "{x} > {value}",
+    "ge": "{x} >= {value}",
+    "lt": "{x} < {value}",
+    "le": "{x} <= {value}",
+    "eq": "{x} == {value}",
+}
+BATCH_OPS = {
+    "true": "{x}",
+    "false": "~{x}",
+    "gt": "({x} > {value})",
+    "ge": "({x} >= {value})",
+    "lt": "({x} < {value})",
+    "le": "({x} <= {value})",
+    "eq": "({x} == {value})",
+}
+BOOL_OPS = ("true", "false")
+COUNT_OPS = ("gt", "ge", "lt", "le", "eq", "per_unit")
+
+# Deductions per PRD: OES = 100 - (D1 + ... + D6), each dimension capped
+RULE_SPEC: Dict[str, Any] = {
+    "version": "prd-2024.1",
+    "dimensions": {
+        "D1": {  # Domain Footprint
+            "cap": 10,
+            "rules": [
+                {"field": "subdomain_count", "op": "gt", "value": 50, "weight": 2},
+                {"field": "has_spf_dkim", "op": "false", "weight": 3},
+                {"field": "domain_expiry_days", "op": "lt", "value": 30, "weight": 2},
+                {"field": "privacy_enabled", "op": "false", "weight": 2},
+                {"field": "whois_email_exposed", "op": "true", "weight": 1},
+            ],
+        },
+        "D2": {  # Breach & Credential Exposure
+            "cap": 25,
+            "rules": [
+                {"field": "breach_instances", "op": "per_unit", "weight": 2},
+                {"field": "password_exposed", "op": "true", "weight": 5},
+                {"field": "credential_reuse", "op": "true", "weight": 3},
+                {"field": "leaked_in_code", "op": "true", "weight": 5},
+                {"field": "unique_emails_exposed", "op": "gt", "value": 10, "weight": 10},
+            ],
+        },
+        "D3": {  # Infrastructure & Network
+            "cap": 20,
+            "rules": [
+                {"field": "open_ports_count", "op": "gt", "value": 0, "weight": 5},
+                {"field": "has_waf", "op": "false", "weight": 2},
+                {"field": "infra_outdated", "op": "true", "weight": 3},
+                {"field": "vulnerable_services_count", "op": "gt", "value": 0, "weight": 5},
+                {"field": "cdn_bypass_detected", "op": "true", "weight": 5},
+            ],
+        },
+        "D4": {  # Application/Website Risk
+            "cap": 20,
+            "rules": [
+                {"field": "outdated_cms", "op": "true", "weight": 5},
+                {"field": "missing_security_headers", "op": "true", "weight": 3},
+                {"field": "known_cve_count", "op": "gt", "value": 0, "weight": 5},
+                {"field": "public_repo_leaks_count", "op": "gt", "value": 0, "weight": 4},
+                {"field": "exploit_tech_count", "op": "gt", "value": 0, "weight": 3},
+            ],
+        },
+        "D5": {  # Social & OSINT Intelligence
+            "cap": 15,
+            "rules": [
+                {"field": "employee_emails_exposed", "op": "true", "weight": 5},
+                {"field": "public_org_leaks_count", "op": "gt", "value": 0, "weight": 4},
+                {"field": "used_in_phishing", "op": "true", "weight": 3},
+                {"field": "predictable_pattern", "op": "true", "weight": 3},
+            ],
+        },
+        "D6": {  # Threat Intelligence / Dark Web
+            "cap": 10,
+            "rules": [
+                {"field": "seen_in_marketplaces", "op": "true", "weight": 5},
+                {"field": "underground_mentions_count", "op": "gt", "value": 0, "weight": 3},
+                {"field": "ioc_match_count", "op": "gt", "value": 0, "weight": 2},
+            ],
+        },
+    },
+}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One row of the compiled plan"""
+    dimension: str
+    field: str
+    op: str
+    value: Optional[float]
+    weight: float
+
+
+class RuleSet:
+    """
+    A compiled rule spec
+
+    ``evaluate`` and ``evaluate_dimension`` score one input object (anything
+    with the rule fields as attributes); ``evaluate_batch`` scores columns
+    of numpy arrays. All three run code generated once from ``rules``.
+    """
+
+    def __init__(self, version: str, digest: str, caps: Dict[str, float], rules: Tuple[Rule, ...]):
+        self.version = version
+        self.digest = digest
+        self.caps = caps
+        self.rules = rules
+        self.dimensions = tuple(caps)
+        self.fields = tuple(dict.fromkeys(rule.field for rule in rules))
+        # Which fields feed which dimensions, as this table defines it
+        self.dimension_fields: Dict[str, Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(rule.field for rule in rules if rule.dimension == name))
+            for name in self.dimensions
+        }
+        self.field_dimensions: Dict[str, Tuple[str, ...]] = {
+            field: tuple(name for name in self.dimensions if field in self.dimension_fields[name])
+            for field in self.fields
+        }
+        self._scalar = {name: _generate(self, (name,), batch=False) for name in self.dimensions}
+        self.evaluate: Callable[[Any], Dict[str, float]] = _generate(self, self.dimensions, batch=False)
+        self.evaluate_batch: Callable[[Mapping[str, np.ndarray]], Dict[str, np.ndarray]] = (
+            _generate(self, self.dimensions, batch=True)
+        )
+
+    def evaluate_dimension(self, name: str, input: Any) -> float:
+        """Deduction of a single dimension"""
+        return self._scalar[name](input)[name]
+
+
+def _literal(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _threshold(rule: Rule) -> str:
+    return "" if rule.value is None else _literal(rule.value)
+
+
+def _generate(rules: RuleSet, dimensions: Iterable[str], batch: bool) -> Callable:
+    """
+    Generate the evaluator of ``dimensions`` as Python source and compile it
+
+    Only validated field names and numeric literals reach the source, so
+    the generated code is the same if-chain (or numpy expression) that
+    would be written by hand.
+    """
+    lines = ["def evaluate(c):" if batch else "def evaluate(input):"]
+    names = []
+    for name in dimensions:
+        var = f"d_{name.lower()}"
+        names.append((name, var))
+        dimension_rules = [r for r in rules.rules if r.dimension == name]
+        cap = _literal(rules.caps[name])
+        if not batch:
+            lines.append(f"    {var} = 0")
+            for rule in dimension_rules:
+                x, weight = f"input.{rule.field}", _literal(rule.weight)
+                if rule.op == "per_unit":
+                    lines.append(f"    {var} += {x} * {weight}")
+                else:
+                    test = RULE_OPS[rule.op].format(x=x, value=_threshold(rule))
+                    lines.append(f"    if {test}: {var} += {weight}")
+            lines.append(f"    {var} = min({var}, {cap})")
+            continue
+
+        # Batch: the first term allocates the column, the rest add in place
+        if not dimension_rules:
+            lines.append(f"    {var} = np.zeros(len(next(iter(c.values()))), dtype=np.int64)")
+        fractional = any(not float(r.weight).is_integer() for r in dimension_rules)
+        for i, rule in enumerate(dimension_rules):
+            x, weight = f"c[{rule.field!r}]", _literal(rule.weight)
+            if rule.op == "per_unit":
+                term = f"{x} * {weight}"
+            else:
+                term = f"{BATCH_OPS[rule.op].format(x=x, value=_threshold(rule))} * {weight}"
+            if i:
+                lines.append(f"    {var} += {term}")
+            elif fractional:
+                lines.append(f"    {var} = ({term}).astype(np.float64)")
+            else:
+                lines.append(f"    {var} = {term}")
+        lines.append(f"    {var} = np.minimum({var}, {cap})")
+    lines.append("    return {" + ", ".join(f"{name!r}: {var}" for name, var in names) + "}")
+    namespace: Dict[str, Any] = {"np": np}
+    exec(compile("\n".join(lines), f"<scoring rules {rules.version}>", "exec"), namespace)
+    return namespace["evaluate"]
+
+
+def _spec_digest(spec: Mapping[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _number(value: Any, what: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{what} must be a number, got {value!r}")
+    return float(value)
+
+
+def _parse(spec: Mapping[str, Any], bool_fields: Iterable[str], count_fields: Iterable[str]):
+    version = spec.get("version")
+    if not isinstance(version, str) or not version:
+        raise ValueError("Rule spec needs a version string")
+    bool_fields, count_fields = set(bool_fields), set(count_fields)
+    caps: Dict[str, float] = {}
+    rules: List[Rule] = []
+    variables: Dict[str, str] = {}
+    for dimension, body in spec.get("dimensions", {}).items():
+        # Dimension names become variables of the generated evaluators
+        if not isinstance(dimension, str) or not dimension.isidentifier():
+            raise ValueError(f"Dimension name {dimension!r} must be an identifier")
+        clash = variables.setdefault(dimension.lower(), dimension)
+        if clash != dimension:
+            raise ValueError(f"Dimension names {clash!r} and {dimension!r} differ only by case")
+        caps[dimension] = _number(body.get("cap"), f"{dimension} cap")
+        for entry in body.get("rules", []):
+            field, op = entry.get("field"), entry.get("op")
+            if field in bool_fields:
+                allowed = BOOL_OPS
+            elif field in count_fields:
+                allowed = COUNT_OPS
+            else:
+                raise ValueError(f"{dimension}: unknown scoring field {field!r}")
+            if op not in allowed:
+                raise ValueError(f"{dimension}: {field} does not support op {op!r}")
+            value = None
+            if op not in BOOL_OPS and op != "per_unit":
+                value = _number(entry.get("value"), f"{dimension} {field} value")
+            rules.append(Rule(dimension, field, op, value, _number(entry.get("weight"), f"{dimension} {field} weight")))
+    if not caps:
+        raise ValueError("Rule spec defines no dimensions")
+    return version, caps, tuple(rules)
+
+
+_compiled: Dict[str, RuleSet] = {}
+
+
+def compile_rules(
+    spec: Mapping[str, Any],
+    bool_fields: Iterable[str],
+    count_fields: Iterable[str]
+) -> RuleSet:
+    """
+    Validate and compile a rule spec, reusing the cached set for its version
+
+    A version identifies exactly one table: compiling different rules under
+    a version that is already cached raises, so a score's rules_version
+    always says which weights produced it.
+    """
+    digest = _spec_digest(spec)
+    cached = _compiled.get(spec.get("version"))
+    if cached is not None:
+        if cached.digest != digest:
+            raise ValueError(f"Rule spec version {cached.version} is already compiled with different rules")
+        return cached
+    version, caps, rules = _parse(spec, bool_fields, count_fields)
+    compiled = _compiled[version] = RuleSet(version, digest, caps, rules)
+    return compiled
+
+
+def load_rule_spec(path: Optional[str] = None) -> Mapping[str, Any]:
+    """The rule spec in a JSON file, or the built-in PRD table"""
+    if not path:
+        return RULE_SPEC
+    with open(path) as f:
+        return json.load(f)
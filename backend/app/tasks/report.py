@@ -1,82 +1,144 @@
 """
 Report tasks for Celery background processing
 """
+import os
 import time
-import uuid
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_engine
 from app.worker import celery_app
 from app.services.report import ReportService
+from app.services.report_render import render_html, render_html_chunks, submit_pdf, close_pdf_pool
+from app.services.retention import RetentionService, retention_cutoff
+from app.services.scan import run_in_worker_loop
+from app.utils.crypto import report_key, stored_size
+from app.utils.files import write_precompressed
+
+
+async def _load_context(job_id: str):
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        return await ReportService().load_report_context(job_id, db)
+
+
+async def _save_report(job_id: str, pdf_path: str, html_path: str, overall_score: float, metadata: dict):
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        return await ReportService().save_report(job_id, pdf_path, html_path, overall_score, metadata, db)
+
+
+def report_path(content_hash: str, report_type: str) -> str:
+    """Content-addressed location of a rendered report under REPORT_OUTPUT_DIR"""
+    return os.path.join(settings.REPORT_OUTPUT_DIR, content_hash[:2], f"{content_hash}.{report_type}")
 
 
 @celery_app.task(bind=True)
 def generate_report(self, job_id: str, report_uuid: str, report_type: str):
     """
-    Generate report task using scoring results
+    Generate the HTML and PDF report of a scan job
+    
+    Results and the OES breakdown are loaded from the database and hashed
+    together with the template version. Files live at hash-named paths, so
+    a format whose file already exists is reused instead of re-rendered;
+    otherwise HTML is rendered from templates and converted to PDF in the
+    warmed WeasyPrint pool. HTML also gets gzip/brotli variants for
+    downloads. Output is streamed to disk atomically, encrypted when
+    REPORT_ENCRYPTION_KEY is set, and the report row is upserted.
     """
+    timings = {}
     try:
-        # Update status to generating
-        # In a real implementation, you would update the database
-        
-        # Simulate report generation progress
-        for i in range(0, 101, 20):
-            self.update_state(
-                state="PROGRESS",
-                meta={"progress": i, "status": "Generating report..."}
-            )
-            time.sleep(0.5)  # Simulate work
-        
-        # In a real implementation, you would:
-        # 1. Get scan results and overall score from database
-        # 2. Generate PDF/HTML report using ReportService
-        # 3. Save to file system
-        # 4. Update database with file path
-        # 5. Encrypt if required
-        
-        # For now, simulate with mock data
-        report_data = {
-            "title": f"Security Scan Report - {job_id}",
-            "summary": "Comprehensive security assessment report",
-            "overall_score": 85.0,  # This would come from scoring engine
-            "findings": [
-                {
-                    "title": "WHOIS Information Retrieved",
-                    "severity": "info",
-                    "description": "Domain registration details obtained"
-                }
-            ],
-            "recommendations": [
-                "Monitor domain registration changes",
-                "Implement security headers",
-                "Regular security audits"
-            ]
+        def progress(value: int, message: str) -> None:
+            self.update_state(state="PROGRESS", meta={"progress": value, "status": message})
+
+        progress(5, "Loading scan results...")
+        started = time.perf_counter()
+        context = run_in_worker_loop(_load_context(job_id))
+        if context is None:
+            raise ValueError(f"Scan job {job_id} not found")
+        timings["load"] = time.perf_counter() - started
+
+        hashes = context["content_hashes"]
+        paths = {fmt: report_path(digest, fmt) for fmt, digest in hashes.items()}
+        cached = {fmt: os.path.exists(path) for fmt, path in paths.items()}
+
+        if not all(cached.values()):
+            key = report_key()
+            progress(30, "Rendering HTML...")
+            started = time.perf_counter()
+            pdf_future = None
+            if not cached["pdf"]:
+                pdf_future = submit_pdf(render_html(context, inline_css=False), paths["pdf"], key)
+            if not cached["html"]:
+                write_precompressed(paths["html"], render_html_chunks(context), key)
+            timings["html"] = time.perf_counter() - started
+
+            if pdf_future is not None:
+                progress(50, "Rendering PDF...")
+                started = time.perf_counter()
+                pdf_future.result(timeout=settings.REPORT_RENDER_TIMEOUT)
+                timings["pdf"] = time.perf_counter() - started
+
+        progress(85, "Saving report...")
+        sizes = {fmt: stored_size(path)[0] for fmt, path in paths.items()}
+        encrypted = bool(settings.REPORT_ENCRYPTION_KEY)
+        metadata = {
+            "report_uuid": report_uuid,
+            "content_hashes": hashes,
+            "cached": all(cached.values()),
+            "encrypted": encrypted,
+            "total_findings": context["total_findings"],
+            "breakdown": context["breakdown"],
+            "sizes": sizes,
+            "render_seconds": timings,
         }
-        
+        run_in_worker_loop(_save_report(job_id, paths["pdf"], paths["html"], context["overall_score"], metadata))
+
+        primary = "html" if report_type == "html" else "pdf"
         return {
             "status": "completed",
             "progress": 100,
             "report_uuid": report_uuid,
-            "file_path": f"/app/reports/report_{report_uuid}.{report_type}",
-            "file_size": 1024000,  # 1MB
-            "overall_score": report_data["overall_score"]
+            "file_path": paths[primary],
+            "file_size": sizes[primary],
+            "content_hash": hashes[primary],
+            "cached": cached[primary],
+            "overall_score": context["overall_score"],
+            "render_seconds": timings,
         }
         
     except Exception as e:
-        # Update status to failed
-        # In a real implementation, you would update the database
-        
         return {
             "status": "failed",
             "error": str(e)
         }
 
 
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _close_pdf_pool(**kwargs):
+    """Stop the WeasyPrint processes when the worker (or prefork child) exits"""
+    close_pdf_pool()
+
+
+async def _purge_reports() -> dict:
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        return await RetentionService().purge_reports(db, retention_cutoff(settings.REPORT_RETENTION_DAYS))
+
+
 @celery_app.task
 def cleanup_old_reports():
     """
-    Cleanup old reports
-    """
-    # In a real implementation, you would:
-    # 1. Query old reports
-    # 2. Delete old files
-    # 3. Update database
+    Delete reports older than REPORT_RETENTION_DAYS
     
-    return {"status": "completed", "cleaned_reports": 0} 
\ No newline at end of file
+    Rows go in throttled batches; files no other report shares are unlinked
+    in parallel. Returns the rows and bytes reclaimed.
+    """
+    started = time.perf_counter()
+    stats = run_in_worker_loop(_purge_reports())
+    return {
+        "status": "completed",
+        "cleaned_reports": stats["reports"],
+        **stats,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
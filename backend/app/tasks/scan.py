@@ -7,30 +7,169 @@ from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 import os
+from dataclasses import asdict
+from celery.signals import worker_process_shutdown, worker_shutdown
 
 from app.worker import celery_app
 from app.models.scan_job import ScanStatus
 from app.models.scan_result import ScanResult
 from app.services.scoring import compute_overall_score
 from app.db.session import async_engine
-from app.services.scan import scan_target_sync
-from app.connectors import connectors as CONNECTORS
+from app.services.scan import (
+    ScanService,
+    scan_target,
+    scan_targets,
+    run_in_worker_loop,
+    close_worker_loop,
+)
+from app.services.events import ScanEventPublisher
+from app.services.features import FindingsExtractor
+from app.services.retention import RetentionService, retention_cutoff
+from app.core.config import settings
+from app.connectors import connector_registry
+
+
+async def _load_previous_scan(target: str, target_type: str, job_id: str):
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        return await ScanService().load_previous_scan(target, target_type, db, exclude_job_id=job_id)
+
+
+async def _update_status(job_id: str, status: ScanStatus, progress: int = 0, error_message=None) -> None:
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        await ScanService().update_scan_status(job_id, status, progress, error_message=error_message, db=db)
+
+
+async def _save_scan(job_id: str, target: str, findings) -> None:
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        service = ScanService()
+        await service.save_scan_results(job_id, target, findings, db)
+        await service.update_scan_status(job_id, ScanStatus.done, 100, db=db)
+
+
+async def _scan_with_events(
+    target: str,
+    job_id: str,
+    connectors: dict,
+    target_type: str = "domain",
+    incremental: bool = False
+) -> dict:
+    """
+    Run a scan, relaying findings and progress to the job's event stream
+
+    Every scan stores its findings and is marked done, so it is the baseline
+    an incremental rescan of the target starts from.
+    """
+    publisher = ScanEventPublisher(job_id)
+    extractor = FindingsExtractor()
+
+    async def on_finding(finding, completed: int, total: int) -> None:
+        await publisher.finding(finding, completed, total, score=extractor.score().score)
+
+    await publisher.publish("progress", {"completed": 0, "total": len(connectors), "progress": 0})
+    try:
+        await _update_status(job_id, ScanStatus.running)
+        previous = await _load_previous_scan(target, target_type, job_id) if incremental else None
+        result = await scan_target(
+            target, connectors, on_finding=on_finding, target_type=target_type,
+            previous=previous, extractor=extractor
+        )
+        await _save_scan(job_id, target, result["results"])
+    except Exception as exc:
+        await publisher.publish("failed", {"error": str(exc)})
+        await _update_status(job_id, ScanStatus.failed, error_message=str(exc))
+        raise
+    await publisher.publish("completed", {
+        "status": result["status"],
+        "overall_score": result["overall_score"],
+        "total_findings": len(result["results"]),
+    })
+    return result
 
 
 @celery_app.task(bind=True)
-def run_scan(self, target, job_id, target_type, connectors_override=None):
-    connectors_to_use = connectors_override or CONNECTORS
-    return scan_target_sync(target, connectors_to_use)
+def run_scan(self, target, job_id, target_type, connectors_override=None, incremental=False):
+    connectors_to_use = connectors_override or connector_registry.for_scan_graph(target_type)
+    return run_in_worker_loop(
+        _scan_with_events(target, job_id, connectors_to_use, target_type, incremental)
+    )
+
+
+def _serialize_result(result: dict) -> dict:
+    """Make a scan_target result JSON-safe for the result backend"""
+    return {
+        **result,
+        "results": [asdict(f) for f in result.get("results", [])]
+    }
+
+
+async def _next_result(stream):
+    return await stream.__anext__()
+
+
+@celery_app.task(bind=True)
+def run_scan_batch(self, targets: List[str], target_type: str = "domain", connectors_override=None):
+    """
+    Scan many targets in one task on the worker's long-lived event loop.
+
+    Each finished target is streamed back through update_state as a PROGRESS
+    event carrying that target's result; the final return value maps every
+    target to its result.
+    """
+    connectors_to_use = connectors_override or connector_registry.for_scan_graph(target_type)
+    stream = scan_targets(targets, connectors_to_use, target_type=target_type)
+    results = {}
+    try:
+        while True:
+            try:
+                target, result = run_in_worker_loop(_next_result(stream))
+            except StopAsyncIteration:
+                break
+            results[target] = _serialize_result(result)
+            self.update_state(
+                state="PROGRESS",
+                meta={
+                    "completed": len(results),
+                    "total": len(targets),
+                    "target": target,
+                    "result": results[target],
+                }
+            )
+    finally:
+        run_in_worker_loop(stream.aclose())
+
+    return {"status": "completed", "total": len(targets), "results": results}
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _close_scan_loop(**kwargs):
+    """
+    Close the per-process scan loop when the worker exits
+
+    Prefork children only get worker_process_shutdown, while thread and solo
+    pools (the scan profile runs threads) only get worker_shutdown.
+    """
+    close_worker_loop()
+
+
+async def _purge_scans() -> dict:
+    async with AsyncSession(bind=async_engine, expire_on_commit=False) as db:
+        return await RetentionService().purge_scans(db, retention_cutoff(settings.SCAN_RETENTION_DAYS))
 
 
 @celery_app.task
 def cleanup_old_scans():
     """
-    Cleanup old scan jobs
-    """
-    # In a real implementation, you would:
-    # 1. Query old scan jobs
-    # 2. Delete old scan results
-    # 3. Clean up old files
+    Delete scan jobs older than SCAN_RETENTION_DAYS
     
-    return {"status": "completed", "cleaned_jobs": 0} 
\ No newline at end of file
+    Expired scan_results partitions are dropped whole; remaining rows go in
+    throttled batches. Returns the rows and bytes reclaimed.
+    """
+    started = time.perf_counter()
+    stats = run_in_worker_loop(_purge_scans())
+    return {
+        "status": "completed",
+        "cleaned_jobs": stats["jobs"],
+        **stats,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,197 @@
+"""
+Segmented AES-GCM encryption of files at rest
+
+File layout::
+
+    header  = MAGIC | segment_size (u32 BE) | nonce_prefix (7 bytes)
+    segment = AES-GCM(plaintext[i*S:(i+1)*S]) | 16-byte tag
+
+Each segment's nonce is ``nonce_prefix | counter (u32 BE) | final flag``
+and the header is authenticated as associated data, so segments cannot
+be reordered, truncated away or moved between files. Any plaintext byte
+range can be decrypted by reading only the segments that cover it.
+"""
+import base64
+import binascii
+import hashlib
+import os
+import struct
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.core.config import settings
+
+MAGIC = b"RME1"
+NONCE_PREFIX_SIZE = 7
+HEADER_SIZE = len(MAGIC) + 4 + NONCE_PREFIX_SIZE
+TAG_SIZE = 16
+DEFAULT_SEGMENT_SIZE = 64 * 1024
+
+
+def load_key(value: str) -> Optional[bytes]:
+    """
+    Decode an AES key from hex or base64 (hex wins when both parse)
+    
+    Returns:
+        16/24/32 key bytes, or None when the value is empty (encryption off)
+        
+    Raises:
+        ValueError: If the value is not a valid AES key
+    """
+    if not value:
+        return None
+    for decode in (bytes.fromhex, base64.b64decode, base64.urlsafe_b64decode):
+        try:
+            key = decode(value)
+        except (binascii.Error, ValueError):
+            continue
+        if len(key) in (16, 24, 32):
+            return key
+    raise ValueError("REPORT_ENCRYPTION_KEY must be a base64 or hex encoded 128/192/256-bit key")
+
+
+def report_key() -> Optional[bytes]:
+    """The configured report encryption key, or None if reports are stored in plaintext"""
+    return load_key(settings.REPORT_ENCRYPTION_KEY)
+
+
+def key_fingerprint() -> Optional[str]:
+    """Truncated SHA-256 of the report key (None when encryption is off), safe to put in cache keys"""
+    key = report_key()
+    return hashlib.sha256(key).hexdigest()[:16] if key else None
+
+
+def _nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    return prefix + struct.pack(">I", counter) + (b"\x01" if final else b"\x00")
+
+
+class SegmentEncryptor:
+    """
+    Write-only file wrapper that encrypts in fixed-size segments
+    
+    Plaintext is buffered until a full segment is available, so memory use
+    is bounded by the segment size. The segment in progress is only sealed
+    as final on close().
+    """
+
+    def __init__(self, fileobj: BinaryIO, key: bytes, segment_size: Optional[int] = None):
+        self.fileobj = fileobj
+        self.segment_size = segment_size or settings.REPORT_ENCRYPTION_SEGMENT_SIZE
+        self._aead = AESGCM(key)
+        self._prefix = os.urandom(NONCE_PREFIX_SIZE)
+        self._header = MAGIC + struct.pack(">I", self.segment_size) + self._prefix
+        self._buffer = bytearray()
+        self._counter = 0
+        self.closed = False
+        fileobj.write(self._header)
+
+    def _seal(self, data: bytes, final: bool) -> None:
+        nonce = _nonce(self._prefix, self._counter, final)
+        self.fileobj.write(self._aead.encrypt(nonce, data, self._header))
+        self._counter += 1
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        # Keep at least one byte back so the last segment can be sealed as final
+        while len(self._buffer) > self.segment_size:
+            self._seal(bytes(self._buffer[:self.segment_size]), final=False)
+            del self._buffer[:self.segment_size]
+        return len(data)
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._seal(bytes(self._buffer), final=True)
+            self._buffer.clear()
+            self.closed = True
+
+
+def read_header(fd: int) -> Tuple[int, bytes, bytes]:
+    """
+    Read an encrypted file's header
+    
+    Returns:
+        (segment_size, nonce_prefix, raw header)
+        
+    Raises:
+        ValueError: If the file is not in this format
+    """
+    header = os.pread(fd, HEADER_SIZE, 0)
+    if len(header) != HEADER_SIZE or not header.startswith(MAGIC):
+        raise ValueError("Not an encrypted report file")
+    (segment_size,) = struct.unpack(">I", header[len(MAGIC):len(MAGIC) + 4])
+    return segment_size, header[len(MAGIC) + 4:], header
+
+
+def is_encrypted(path: str) -> bool:
+    """Whether a file starts with the encrypted-file header"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def plaintext_size(file_size: int, segment_size: int) -> int:
+    """Plaintext length of an encrypted file of file_size bytes"""
+    body = file_size - HEADER_SIZE
+    segments = -(-body // (segment_size + TAG_SIZE))
+    return body - segments * TAG_SIZE
+
+
+def stored_size(path: str) -> Tuple[int, bool]:
+    """
+    Plaintext size of a stored file and whether it is encrypted
+    
+    Returns:
+        (size, encrypted)
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        file_size = os.fstat(fd).st_size
+        try:
+            segment_size, _, _ = read_header(fd)
+        except ValueError:
+            return file_size, False
+        return plaintext_size(file_size, segment_size), True
+    finally:
+        os.close(fd)
+
+
+def decrypt_range(fd: int, key: bytes, start: int, count: int) -> Iterator[bytes]:
+    """
+    Yield the plaintext bytes [start, start + count) of an encrypted file
+    
+    Only the covering segments are read and authenticated, one at a time.
+    
+    Raises:
+        cryptography.exceptions.InvalidTag: If any read segment was tampered with
+    """
+    segment_size, prefix, header = read_header(fd)
+    aead = AESGCM(key)
+    file_size = os.fstat(fd).st_size
+    last_segment = max(-(-(file_size - HEADER_SIZE) // (segment_size + TAG_SIZE)) - 1, 0)
+    end = start + count
+    index = start // segment_size
+    while start < end:
+        offset = HEADER_SIZE + index * (segment_size + TAG_SIZE)
+        sealed = os.pread(fd, segment_size + TAG_SIZE, offset)
+        plain = aead.decrypt(_nonce(prefix, index, index == last_segment), sealed, header)
+        segment_start = index * segment_size
+        chunk = plain[max(start - segment_start, 0):end - segment_start]
+        if not chunk:
+            break
+        yield chunk
+        start = segment_start + len(plain)
+        index += 1
+
+
+def encrypt_file(source: BinaryIO, target: BinaryIO, key: bytes, segment_size: Optional[int] = None) -> None:
+    """Encrypt a readable stream into target segment by segment"""
+    encryptor = SegmentEncryptor(target, key, segment_size)
+    while True:
+        chunk = source.read(encryptor.segment_size)
+        if not chunk:
+            break
+        encryptor.write(chunk)
+    encryptor.close()
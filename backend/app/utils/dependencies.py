@@ -1,12 +1,18 @@
 """
 Dependencies for authentication and authorization
 """
+import uuid
+from typing import Union
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.auth import verify_token, get_user_by_id
+from app.services.scan import ScanService
+from app.services.principals import get_principal_cache, principal_from_user, user_from_principal
 from app.db.session import get_db
+from app.models.scan_job import ScanJob
 from app.models.user import User
 from app.core.config import settings
 
@@ -21,6 +27,9 @@ async def get_current_user(
     """
     Get current authenticated user from JWT token
     
+    The user is looked up through a short-TTL principal cache keyed by user
+    id and token iat, so repeat requests skip the database entirely.
+    
     Args:
         token: JWT access token from Authorization header
         db: Database session
@@ -50,8 +59,16 @@ async def get_current_user(
                 detail="Invalid token payload"
             )
         
-        # Get user from database using UUID
-        user = await get_user_by_id(db, str(user_id))
+        # Get user from the principal cache, falling back to the database
+        cache = get_principal_cache()
+        iat = int(payload.get("iat", 0))
+        principal = await cache.get(str(user_id), iat)
+        if principal is not None:
+            user = user_from_principal(principal)
+        else:
+            user = await get_user_by_id(db, str(user_id))
+            if user is not None:
+                await cache.set(str(user_id), iat, principal_from_user(user))
         
         if user is None:
             raise HTTPException(
@@ -112,4 +129,24 @@ def require_role(required_role: str):
 # Convenience dependencies for common roles
 require_admin = require_role("admin")
 require_user = require_role("user")
-require_viewer = require_role("viewer") 
\ No newline at end of file
+require_viewer = require_role("viewer") 
+
+
+async def get_owned_scan_job(job_id: Union[str, uuid.UUID], user: User, db: AsyncSession) -> ScanJob:
+    """
+    The user's scan job (any job for admins)
+    
+    Raises:
+        HTTPException: 404 for malformed, unknown or other users' job ids
+    """
+    try:
+        job_uuid = job_id if isinstance(job_id, uuid.UUID) else uuid.UUID(str(job_id))
+    except ValueError:
+        job_uuid = None
+    job = await ScanService().get_owned_job(job_uuid, user, db) if job_uuid else None
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scan job not found"
+        )
+    return job
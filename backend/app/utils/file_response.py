@@ -0,0 +1,247 @@
+"""
+Conditional, ranged file responses with zero-copy transfer where the server supports it
+"""
+import os
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.utils.crypto import decrypt_range, report_key, stored_size
+from app.utils.files import PRECOMPRESSED_SUFFIXES
+
+# ASGI extension under which servers offer os.sendfile-backed transfers
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+# Read size for servers without the zero-copy extension
+CHUNK_SIZE = 256 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header does not overlap the file"""
+
+
+def strong_etag(content_hash: str, encoding: Optional[str] = None) -> str:
+    """Strong ETag of one representation of a content-addressed file"""
+    return f'"{content_hash}-{encoding}"' if encoding else f'"{content_hash}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires)"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Content codings the client accepts (q=0 and malformed q entries excluded)"""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                quality = float(q[2:])
+            except ValueError:
+                continue
+            if not quality > 0:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def select_variant(path: str, accept_encoding: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Pick the precompressed variant of a file the client accepts
+    
+    Returns:
+        (path to serve, Content-Encoding or None for the identity file)
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+        if (encoding in accepted or "*" in accepted) and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into an inclusive (start, end)
+    
+    Returns None when the whole file should be sent (no header, another
+    unit, or several ranges, which we answer with the full body).
+    
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the file
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+    start_text, sep, end_text = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(Response):
+    """
+    Streams a byte span of a file
+    
+    Plaintext files use the server's zero-copy (os.sendfile) extension when
+    the ASGI server advertises it and fall back to os.pread chunks in a
+    worker thread otherwise. Encrypted files (key given) are decrypted one
+    AES-GCM segment at a time, so memory stays bounded by the segment size.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        send_body: bool = True,
+        key: Optional[bytes] = None,
+    ):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.send_body = send_body
+        self.key = key
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            if self.key is not None:
+                await self._send_decrypted(fd, send)
+                return
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": fd,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+                return
+            offset, remaining = self.offset, self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(CHUNK_SIZE, remaining), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
+
+    async def _send_decrypted(self, fd: int, send: Send) -> None:
+        segments = decrypt_range(fd, self.key, self.offset, self.count)
+        sentinel = object()
+        sent = 0
+        while True:
+            chunk = await anyio.to_thread.run_sync(next, segments, sentinel)
+            if chunk is sentinel:
+                break
+            sent += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": sent < self.count})
+        if sent < self.count:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def conditional_file_response(
+    request: Request,
+    path: str,
+    content_hash: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    precompressed: bool = False,
+) -> Response:
+    """
+    Serve a content-addressed file with ETag, If-None-Match and Range support
+    
+    Args:
+        request: Incoming request (conditional, range and encoding headers)
+        path: File to serve
+        content_hash: Hash the file is named after, used for the ETag
+        media_type: Content-Type of the identity representation
+        filename: Download name for Content-Disposition
+        precompressed: Whether .gz/.br variants may be served
+        
+    Returns:
+        304, 206, 416 or 200 response
+    """
+    encoding = None
+    if precompressed:
+        path, encoding = select_variant(path, request.headers.get("accept-encoding"))
+    etag = strong_etag(content_hash, encoding)
+    headers = {
+        "etag": etag,
+        "accept-ranges": "bytes",
+        "cache-control": "private, no-cache",
+    }
+    if precompressed:
+        headers["vary"] = "Accept-Encoding"
+    if encoding:
+        headers["content-encoding"] = encoding
+    if filename:
+        headers["content-disposition"] = f'attachment; filename="{filename}"'
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    size, encrypted = stored_size(path)
+    key = None
+    if encrypted:
+        key = report_key()
+        if key is None:
+            raise RuntimeError(f"{path} is encrypted but REPORT_ENCRYPTION_KEY is not set")
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+    try:
+        span = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+
+    send_body = request.method != "HEAD"
+    if span is None:
+        return RangeFileResponse(path, 0, size, headers=headers, media_type=media_type, send_body=send_body, key=key)
+    start, end = span
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return RangeFileResponse(
+        path, start, end - start + 1, status_code=206, headers=headers,
+        media_type=media_type, send_body=send_body, key=key
+    )
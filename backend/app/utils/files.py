@@ -0,0 +1,148 @@
+"""
+File system helpers
+"""
+import contextlib
+import os
+import tempfile
+import zlib
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from app.utils.crypto import SegmentEncryptor
+
+try:
+    import brotli
+except ImportError:  # brotli variants are skipped without it
+    brotli = None
+
+# Precompressed variant suffix per Content-Encoding, in server preference order
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class _CountingWriter:
+    """Counts bytes passed through to the underlying file"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+
+@contextlib.contextmanager
+def atomic_writer(path: str, key: Optional[bytes] = None) -> Iterator[_CountingWriter]:
+    """
+    Open a file so readers see either the old content or the new, never a partial one
+    
+    Writes go to a temporary file in the same directory that is fsynced and
+    renamed over the target when the block exits cleanly. With a key, the
+    content is encrypted segment by segment on the way to disk.
+    
+    Args:
+        path: Destination file path
+        key: Optional AES key for encryption at rest
+        
+    Yields:
+        Writer whose size attribute is the number of plaintext bytes written
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            sink = SegmentEncryptor(f, key) if key else f
+            writer = _CountingWriter(sink)
+            yield writer
+            if key:
+                sink.close()
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write(path: str, data: bytes, key: Optional[bytes] = None) -> int:
+    """
+    Write a whole file atomically (see atomic_writer)
+    
+    Args:
+        path: Destination file path
+        data: File content
+        key: Optional AES key for encryption at rest
+        
+    Returns:
+        Number of plaintext bytes written
+    """
+    with atomic_writer(path, key) as f:
+        f.write(data)
+    return len(data)
+
+
+class PrecompressedWriter:
+    """
+    Fans one stream out to a file and its gzip/brotli variants
+    
+    Compression runs incrementally at maximum level so downloads can serve
+    the smaller variant without compressing per request.
+    """
+
+    def __init__(self, stack: contextlib.ExitStack, path: str, key: Optional[bytes] = None):
+        self.identity = stack.enter_context(atomic_writer(path, key))
+        self.variants = {
+            "gzip": (
+                stack.enter_context(atomic_writer(path + PRECOMPRESSED_SUFFIXES["gzip"], key)),
+                zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS),
+            )
+        }
+        if brotli is not None:
+            self.variants["br"] = (
+                stack.enter_context(atomic_writer(path + PRECOMPRESSED_SUFFIXES["br"], key)),
+                brotli.Compressor(quality=11),
+            )
+
+    def write(self, data: bytes) -> int:
+        self.identity.write(data)
+        for encoding, (writer, compressor) in self.variants.items():
+            writer.write(compressor.process(data) if encoding == "br" else compressor.compress(data))
+        return len(data)
+
+    def finish(self) -> Dict[str, int]:
+        """Flush the compressors; returns the size of every file by encoding"""
+        sizes = {"identity": self.identity.size}
+        for encoding, (writer, compressor) in self.variants.items():
+            writer.write(compressor.finish() if encoding == "br" else compressor.flush())
+            sizes[encoding] = writer.size
+        return sizes
+
+
+def write_precompressed(path: str, chunks, key: Optional[bytes] = None) -> Dict[str, int]:
+    """
+    Stream chunks to a file plus its precompressed variants, all atomically
+    
+    The variants are renamed into place before the identity file, so an
+    existing file always has its variants.
+    
+    Args:
+        path: Path of the uncompressed file
+        chunks: Bytes, or an iterable of byte chunks
+        key: Optional AES key for encryption at rest
+        
+    Returns:
+        Size of each written file by Content-Encoding ("identity" for the file itself)
+    """
+    if isinstance(chunks, (bytes, bytearray)):
+        chunks = [chunks]
+    with contextlib.ExitStack() as stack:
+        writer = PrecompressedWriter(stack, path, key)
+        for chunk in chunks:
+            writer.write(chunk)
+        return writer.finish()
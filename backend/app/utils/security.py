@@ -1,10 +1,24 @@
 """
 Security utilities for password hashing and verification
 """
+import asyncio
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
 from passlib.context import CryptContext
 
-# Configure password hashing with bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# Configure password hashing with bcrypt; hashes below the configured cost
+# count as deprecated so verify_and_update can upgrade them
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 
 def hash_password(plain: str) -> str:
@@ -31,4 +45,108 @@ def verify_password(plain: str, hashed: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(plain, hashed) 
\ No newline at end of file
+    return pwd_context.verify(plain, hashed)
+
+
+def verify_and_update_password(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its cost parameters are outdated
+    
+    Returns:
+        (matches, new_hash); new_hash is None unless a rehash is due
+    """
+    return pwd_context.verify_and_update(plain, hashed)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a bounded executor.
+
+    At most ``max_concurrency`` hashes run at once per event loop; further
+    calls wait on a semaphore and are counted in ``metrics["queued"]`` so a
+    login burst shows up as queue depth instead of a frozen API.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        kind: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self._executor = executor
+        self.kind = kind or settings.PASSWORD_HASH_EXECUTOR
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_concurrency = max_concurrency or settings.PASSWORD_HASH_MAX_CONCURRENCY
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.metrics: Dict[str, float] = {
+            "queued": 0,
+            "max_queued": 0,
+            "in_flight": 0,
+            "completed": 0,
+            "rehashed": 0,
+            "wait_seconds": 0.0,
+        }
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            elif self.kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            else:
+                raise ValueError(f"Unknown password hash executor: {self.kind}")
+        return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _run(self, fn, *args):
+        semaphore = self._semaphore()
+        self.metrics["queued"] += 1
+        self.metrics["max_queued"] = max(self.metrics["max_queued"], self.metrics["queued"])
+        started = time.monotonic()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.metrics["queued"] -= 1
+        self.metrics["wait_seconds"] += time.monotonic() - started
+        self.metrics["in_flight"] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.metrics["in_flight"] -= 1
+            self.metrics["completed"] += 1
+            semaphore.release()
+
+    async def hash(self, plain: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run(hash_password, plain)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await self._run(verify_password, plain, hashed)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return a replacement hash when rehashing is due"""
+        if not settings.PASSWORD_REHASH_ON_LOGIN:
+            return await self.verify(plain, hashed), None
+        matches, new_hash = await self._run(verify_and_update_password, plain, hashed)
+        if new_hash is not None:
+            self.metrics["rehashed"] += 1
+        return matches, new_hash
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -2,7 +2,10 @@
 Celery worker configuration for background tasks
 """
 import os
+import sys
 from celery import Celery
+from celery.schedules import crontab
+from kombu import Queue
 
 from app.core.config import settings
 
@@ -13,6 +16,62 @@ celery_app = Celery(
     backend=settings.CELERY_RESULT_BACKEND,
 )
 
+# Task priorities (Redis transport: 0 is served first)
+PRIORITY_INTERACTIVE = 0  # A user is waiting on the result
+PRIORITY_BULK = 6  # Batch scans and scheduled jobs
+
+# Queues: I/O-bound scans, CPU-bound report renders and maintenance never share workers
+SCAN_QUEUE = "scan"
+REPORT_QUEUE = "report"
+MAINTENANCE_QUEUE = "maintenance"
+
+TASK_ROUTES = {
+    "app.tasks.scan.run_scan": {"queue": SCAN_QUEUE, "priority": PRIORITY_INTERACTIVE},
+    "app.tasks.scan.run_scan_batch": {"queue": SCAN_QUEUE, "priority": PRIORITY_BULK},
+    "app.tasks.report.generate_report": {"queue": REPORT_QUEUE, "priority": PRIORITY_INTERACTIVE},
+    "app.tasks.scan.cleanup_old_scans": {"queue": MAINTENANCE_QUEUE, "priority": PRIORITY_BULK},
+    "app.tasks.report.cleanup_old_reports": {"queue": MAINTENANCE_QUEUE, "priority": PRIORITY_BULK},
+}
+
+# Worker profiles, one per queue. Scan workers run many threads that all
+# feed the process's shared asyncio scan loop; report workers are prefork
+# so each render gets its own core.
+WORKER_PROFILES = {
+    "scan": {
+        "queues": [SCAN_QUEUE],
+        "pool": "threads",
+        "concurrency": settings.CELERY_SCAN_CONCURRENCY,
+    },
+    "report": {
+        "queues": [REPORT_QUEUE],
+        "pool": "prefork",
+        "concurrency": settings.CELERY_REPORT_CONCURRENCY,
+        "max_tasks_per_child": 100,
+    },
+    "maintenance": {
+        "queues": [MAINTENANCE_QUEUE],
+        "pool": "solo",
+        "concurrency": 1,
+    },
+}
+
+
+def worker_argv(profile: str) -> list:
+    """Celery worker command line for a profile"""
+    options = WORKER_PROFILES[profile]
+    argv = [
+        "worker",
+        "--loglevel=info",
+        f"--queues={','.join(options['queues'])}",
+        f"--pool={options['pool']}",
+        f"--concurrency={options['concurrency']}",
+        f"--hostname={profile}@%h",
+    ]
+    if "max_tasks_per_child" in options:
+        argv.append(f"--max-tasks-per-child={options['max_tasks_per_child']}")
+    return argv
+
+
 # Celery configuration
 celery_app.conf.update(
     task_serializer="json",
@@ -26,8 +85,29 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
     result_expires=3600,  # 1 hour
+    task_queues=[Queue(SCAN_QUEUE), Queue(REPORT_QUEUE), Queue(MAINTENANCE_QUEUE)],
+    task_default_queue=MAINTENANCE_QUEUE,
+    task_routes=TASK_ROUTES,
+    task_default_priority=PRIORITY_BULK,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
 
+# Nightly retention, staggered so the two jobs never overlap
+celery_app.conf.beat_schedule = {
+    "cleanup-old-scans": {
+        "task": "app.tasks.scan.cleanup_old_scans",
+        "schedule": crontab(hour=settings.RETENTION_SCHEDULE_HOUR, minute=0),
+    },
+    "cleanup-old-reports": {
+        "task": "app.tasks.report.cleanup_old_reports",
+        "schedule": crontab(hour=(settings.RETENTION_SCHEDULE_HOUR + 1) % 24, minute=0),
+    },
+}
+
 # Enable eager mode for tests
 if os.getenv("PYTEST_CURRENT_TEST") or settings.ENVIRONMENT == "test":
     celery_app.conf.update(
@@ -41,4 +121,8 @@ if os.getenv("PYTEST_CURRENT_TEST") or settings.ENVIRONMENT == "test":
 celery_app.autodiscover_tasks(["app.tasks"])
 
 if __name__ == "__main__":
-    celery_app.start() 
\ No newline at end of file
+    # python -m app.worker <profile> starts a worker with that profile
+    if len(sys.argv) > 1 and sys.argv[1] in WORKER_PROFILES:
+        celery_app.worker_main(worker_argv(sys.argv[1]))
+    else:
+        celery_app.start() 
\ No newline at end of file
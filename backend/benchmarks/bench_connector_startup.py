@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Connector Registry Cold-Start Benchmark
+
+Times `import app.connectors` in fresh interpreters with the lazy registry
+against the previous eager behaviour (pkgutil-import every module in the
+package and instantiate every connector), and shows what the first scan
+then pays to load the connectors it actually uses.
+
+Usage: python benchmarks/bench_connector_startup.py [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+SNIPPETS = {
+    "lazy registry (import only)": "import app.connectors",
+    "eager (old pkgutil loader)": (
+        "import importlib, pkgutil, app.connectors as c\n"
+        "for _, m, _ in pkgutil.iter_modules(c.__path__): importlib.import_module(f'app.connectors.{m}')\n"
+        "c.connector_registry.load_all()"
+    ),
+    "lazy + first domain scan selection": (
+        "import app.connectors as c\n"
+        "c.connector_registry.for_scan_type('domain')"
+    ),
+}
+
+TIMER = """
+import time
+started = time.perf_counter()
+exec(compile({snippet!r}, "<bench>", "exec"))
+print(time.perf_counter() - started)
+"""
+
+
+def cold_start(snippet: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", TIMER.format(snippet=snippet)],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    print(f"🚀 Connector cold start (median of {runs} fresh interpreters)")
+    results = {}
+    for label, snippet in SNIPPETS.items():
+        results[label] = statistics.median(cold_start(snippet) for _ in range(runs))
+        print(f"   {label:<36} {results[label] * 1000:8.1f} ms")
+    saved = results["eager (old pkgutil loader)"] - results["lazy registry (import only)"]
+    print(f"   Saved at startup: {saved * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
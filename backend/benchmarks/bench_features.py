@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Findings -> ScoringInput Extraction Benchmark
+
+Folds a synthetic scan (one subdomain finding listing N hosts plus one
+breach finding per leaked email) through FindingsExtractor, scoring after
+every finding as live progress does, and reports throughput and peak
+memory. Memory should stay flat as N grows.
+
+Usage: python benchmarks/bench_features.py [subdomains] [emails]
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.schemas import ScanFinding
+from app.services.features import FindingsExtractor
+
+
+def synthetic_findings(subdomains: int, emails: int):
+    yield ScanFinding(category="subdomains", details={
+        "signals": {"subdomain_count": (f"host{i}.example.com" for i in range(subdomains))}
+    })
+    for i in range(emails):
+        yield ScanFinding(
+            category="breach",
+            details={"signals": {"breach_instances": 1, "unique_emails_exposed": [f"user{i}@example.com"]}},
+            entity=f"user{i}@example.com",
+        )
+
+
+def run(subdomains: int, emails: int):
+    tracemalloc.start()
+    started = time.perf_counter()
+    extractor = FindingsExtractor()
+    for finding in synthetic_findings(subdomains, emails):
+        extractor.add(finding)
+        extractor.score()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return extractor, elapsed, peak
+
+
+def main():
+    emails = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [10_000, 100_000, 1_000_000]
+    print(f"🧮 Findings extraction ({emails:,} breach findings, live score after each)")
+    for subdomains in sizes:
+        extractor, elapsed, peak = run(subdomains, emails)
+        scoring_input = extractor.scoring_input()
+        signals = subdomains + 2 * emails
+        print(
+            f"   {subdomains:>9,} subdomains: {elapsed:6.2f}s "
+            f"({signals / elapsed:>10,.0f} signals/s), peak {peak / 1024 / 1024:5.1f} MiB, "
+            f"subdomain_count≈{scoring_input.subdomain_count:,}, OES {extractor.score().score}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Report Rendering Throughput Benchmark
+
+Renders synthetic scans through the same path as
+app.tasks.report.generate_report (Jinja HTML, then PDF in the warmed
+WeasyPrint pool) and reports reports/minute for one worker, plus the
+cold-start cost the pool warm-up removes from the first job.
+
+Requires WeasyPrint with its system libraries (Pango).
+
+Usage: python benchmarks/bench_reports.py [reports] [findings_per_report]
+"""
+
+import sys
+import os
+import time
+import uuid
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.services.report_render import (
+    build_report_context,
+    close_pdf_pool,
+    get_pdf_pool,
+    html_to_pdf,
+    render_html,
+    submit_pdf,
+)
+
+CATEGORIES = ["whois", "dns", "breach", "ports", "web"]
+
+
+def make_context(findings: int) -> dict:
+    job = {"id": uuid.uuid4(), "target": "example.com", "scan_type": "domain"}
+    rows = (
+        {
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "raw_data": {"host": f"host{i}.example.com", "ports": [80, 443], "banner": "nginx"},
+            "penalty_score": 0.5,
+        }
+        for i in range(findings)
+    )
+    return build_report_context(job, rows)
+
+
+def main():
+    reports = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    findings = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print(f"📄 Report throughput: {reports} reports x {findings} findings, "
+          f"{settings.REPORT_PDF_WORKERS} PDF processes")
+
+    context = make_context(findings)
+    html = render_html(context, inline_css=False)
+
+    started = time.perf_counter()
+    html_to_pdf(html)
+    print(f"   Cold render (fonts + CSS load): {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    html_to_pdf(html)
+    print(f"   Warm render:                    {time.perf_counter() - started:.2f}s")
+
+    get_pdf_pool()
+    # Let every pool process finish its warm-up before timing
+    for future in [submit_pdf(html) for _ in range(max(settings.REPORT_PDF_WORKERS, 1))]:
+        future.result()
+
+    started = time.perf_counter()
+    futures = []
+    for _ in range(reports):
+        context = make_context(findings)
+        render_html(context)
+        futures.append(submit_pdf(render_html(context, inline_css=False)))
+    total_bytes = sum(len(f.result()) for f in futures)
+    elapsed = time.perf_counter() - started
+    close_pdf_pool()
+
+    print(f"   {reports} reports in {elapsed:.2f}s "
+          f"({reports / elapsed * 60:.1f} reports/min per worker, "
+          f"{total_bytes / reports / 1024:.0f} KiB/PDF)")
+
+
+if __name__ == "__main__":
+    main()
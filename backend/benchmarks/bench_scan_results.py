@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+ScanResult Persistence Benchmark
+
+Compares rows/sec for writing scan findings through the ORM
+(AsyncSession.add per row), a multi-row INSERT and the COPY path used by
+ScanService.save_scan_results.
+
+Requires a PostgreSQL database with the schema created (DATABASE_URL).
+Rows are written inside a transaction that is rolled back afterwards.
+
+Usage: python benchmarks/bench_scan_results.py [rows]
+"""
+
+import asyncio
+import sys
+import os
+import time
+import uuid
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.bulk import copy_rows, new_ids
+from app.db.session import async_engine
+from app.models import ScanJob, ScanResult, User
+from app.services.scan import SCAN_RESULT_COLUMNS
+
+def make_rows(job_id, n: int) -> list:
+    """Synthetic subdomain findings"""
+    return [
+        {
+            "id": result_id,
+            "job_id": job_id,
+            "domain_or_email": "example.com",
+            "category": "subdomain",
+            "raw_data": {"host": f"host{i}.example.com", "ports": [80, 443]},
+            "penalty_score": 0.0,
+        }
+        for i, result_id in enumerate(new_ids(n))
+    ]
+
+async def timed(label: str, n: int, write) -> None:
+    """Run one write strategy in a rolled-back transaction and print rows/sec"""
+    async with async_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(bind=conn)
+        user_id = (await session.execute(select(User.id).limit(1))).scalar_one()
+        job_id = uuid.uuid4()
+        await session.execute(insert(ScanJob).values(
+            id=job_id, user_id=user_id, target="example.com", scan_type="domain", status="pending"
+        ))
+        rows = make_rows(job_id, n)
+
+        start = time.perf_counter()
+        await write(session, rows)
+        elapsed = time.perf_counter() - start
+        await trans.rollback()
+    print(f"{label:<22}{elapsed:8.3f}s {n / elapsed:12,.0f} rows/s")
+
+async def orm_add(session, rows):
+    for row in rows:
+        session.add(ScanResult(**row))
+    await session.flush()
+
+async def multi_row_insert(session, rows):
+    for i in range(0, len(rows), settings.SCAN_RESULTS_BATCH_SIZE):
+        await session.execute(
+            insert(ScanResult).values(rows[i:i + settings.SCAN_RESULTS_BATCH_SIZE]).returning(ScanResult.id)
+        )
+
+async def copy(session, rows):
+    await copy_rows(
+        session, ScanResult.__table__, rows, SCAN_RESULT_COLUMNS,
+        settings.SCAN_RESULTS_BATCH_SIZE, json_columns=("raw_data",)
+    )
+
+async def main():
+    """Run all three write strategies"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"Rows: {n}")
+    await timed("ORM add + flush", n, orm_add)
+    await timed("INSERT ... RETURNING", n, multi_row_insert)
+    await timed("COPY", n, copy)
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
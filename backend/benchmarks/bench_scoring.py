@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+OES Batch Scoring Benchmark
+
+Compares calculate_oes_batch against looping over calculate_oes for a
+synthetic portfolio of targets.
+
+Usage: python benchmarks/bench_scoring.py [targets]
+"""
+
+import random
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.scoring import (
+    ScoringInput,
+    calculate_oes,
+    calculate_oes_batch,
+    BOOL_FIELDS,
+    COUNT_FIELDS,
+)
+
+def make_columns(n: int, seed: int = 42) -> dict:
+    """Build random struct-of-arrays scoring columns"""
+    rng = random.Random(seed)
+    columns = {name: [rng.random() < 0.5 for _ in range(n)] for name in BOOL_FIELDS}
+    columns.update({name: [rng.randint(0, 120) for _ in range(n)] for name in COUNT_FIELDS})
+    return columns
+
+def main():
+    """Run the scalar vs batch comparison"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    columns = make_columns(n)
+
+    start = time.perf_counter()
+    scalar = [
+        calculate_oes(ScoringInput(**{name: columns[name][i] for name in columns}))
+        for i in range(n)
+    ]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = calculate_oes_batch(columns)
+    batch_s = time.perf_counter() - start
+
+    assert all(batch.result(i) == scalar[i] for i in range(0, n, max(1, n // 1000)))
+
+    print(f"Targets:              {n}")
+    print(f"calculate_oes:        {scalar_s:.3f}s ({n / scalar_s:,.0f} targets/s)")
+    print(f"calculate_oes_batch:  {batch_s:.3f}s ({n / batch_s:,.0f} targets/s)")
+    print(f"Speedup:              {scalar_s / batch_s:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Compiled Rule Table Microbenchmark
+
+Times the rule-table evaluators against the hand-written if-chains they
+replaced (kept below as a reference), for both the scalar path on
+prebuilt ScoringInput objects and the numpy batch path, and checks that
+every row scores identically.
+
+Usage: python benchmarks/bench_scoring_rules.py [targets] [repeats]
+"""
+
+import random
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from app.services.scoring import (
+    RULES,
+    ScoringInput,
+    calculate_oes,
+    calculate_oes_batch,
+    columns_from_inputs,
+    BOOL_FIELDS,
+    COUNT_FIELDS,
+)
+
+
+def handwritten_deductions(input):
+    """The pre-rule-table calculate_oes body"""
+    d1 = 0
+    if input.subdomain_count > 50: d1 += 2
+    if not input.has_spf_dkim:      d1 += 3
+    if input.domain_expiry_days < 30: d1 += 2
+    if not input.privacy_enabled:   d1 += 2
+    if input.whois_email_exposed:   d1 += 1
+    d1 = min(d1, 10)
+    d2 = input.breach_instances * 2
+    if input.password_exposed:      d2 += 5
+    if input.credential_reuse:       d2 += 3
+    if input.leaked_in_code:         d2 += 5
+    if input.unique_emails_exposed > 10: d2 += 10
+    d2 = min(d2, 25)
+    d3 = min(input.open_ports_count, 1) * 5
+    if not input.has_waf:           d3 += 2
+    if input.infra_outdated:        d3 += 3
+    d3 += min(input.vulnerable_services_count, 1) * 5
+    if input.cdn_bypass_detected:    d3 += 5
+    d3 = min(d3, 20)
+    d4 = 0
+    if input.outdated_cms:          d4 += 5
+    if input.missing_security_headers: d4 += 3
+    d4 += min(input.known_cve_count, 1) * 5
+    d4 += min(input.public_repo_leaks_count, 1) * 4
+    d4 += min(input.exploit_tech_count, 1) * 3
+    d4 = min(d4, 20)
+    d5 = 0
+    if input.employee_emails_exposed: d5 += 5
+    d5 += min(input.public_org_leaks_count, 1) * 4
+    if input.used_in_phishing:       d5 += 3
+    if input.predictable_pattern:    d5 += 3
+    d5 = min(d5, 15)
+    d6 = 0
+    if input.seen_in_marketplaces:   d6 += 5
+    d6 += min(input.underground_mentions_count, 1) * 3
+    d6 += min(input.ioc_match_count, 1) * 2
+    d6 = min(d6, 10)
+    return {'D1': d1, 'D2': d2, 'D3': d3, 'D4': d4, 'D5': d5, 'D6': d6}
+
+
+def handwritten_batch(c):
+    """The pre-rule-table calculate_oes_batch body"""
+    d1 = (c["subdomain_count"] > 50) * 2
+    d1 += ~c["has_spf_dkim"] * 3
+    d1 += (c["domain_expiry_days"] < 30) * 2
+    d1 += ~c["privacy_enabled"] * 2
+    d1 += c["whois_email_exposed"] * 1
+    d1 = np.minimum(d1, 10)
+    d2 = c["breach_instances"] * 2
+    d2 += c["password_exposed"] * 5
+    d2 += c["credential_reuse"] * 3
+    d2 += c["leaked_in_code"] * 5
+    d2 += (c["unique_emails_exposed"] > 10) * 10
+    d2 = np.minimum(d2, 25)
+    d3 = np.minimum(c["open_ports_count"], 1) * 5
+    d3 += ~c["has_waf"] * 2
+    d3 += c["infra_outdated"] * 3
+    d3 += np.minimum(c["vulnerable_services_count"], 1) * 5
+    d3 += c["cdn_bypass_detected"] * 5
+    d3 = np.minimum(d3, 20)
+    d4 = c["outdated_cms"] * 5
+    d4 += c["missing_security_headers"] * 3
+    d4 += np.minimum(c["known_cve_count"], 1) * 5
+    d4 += np.minimum(c["public_repo_leaks_count"], 1) * 4
+    d4 += np.minimum(c["exploit_tech_count"], 1) * 3
+    d4 = np.minimum(d4, 20)
+    d5 = c["employee_emails_exposed"] * 5
+    d5 += np.minimum(c["public_org_leaks_count"], 1) * 4
+    d5 += c["used_in_phishing"] * 3
+    d5 += c["predictable_pattern"] * 3
+    d5 = np.minimum(d5, 15)
+    d6 = c["seen_in_marketplaces"] * 5
+    d6 += np.minimum(c["underground_mentions_count"], 1) * 3
+    d6 += np.minimum(c["ioc_match_count"], 1) * 2
+    d6 = np.minimum(d6, 10)
+    return {'D1': d1, 'D2': d2, 'D3': d3, 'D4': d4, 'D5': d5, 'D6': d6}
+
+
+def make_inputs(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(n):
+        row = {name: rng.random() < 0.5 for name in BOOL_FIELDS}
+        row.update({name: rng.choice([0, 1, 5, 11, 29, 30, 51, 400]) for name in COUNT_FIELDS})
+        inputs.append(ScoringInput(**row))
+    return inputs
+
+
+def best_of(repeats: int, func) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    inputs = make_inputs(n)
+    columns = columns_from_inputs(inputs)
+
+    for input_data in inputs[:2000]:
+        assert RULES.evaluate(input_data) == handwritten_deductions(input_data)
+    batch = calculate_oes_batch(columns)
+    reference = handwritten_batch(columns)
+    assert all((batch.deductions[k] == reference[k]).all() for k in reference)
+    assert batch.result(0) == calculate_oes(inputs[0])
+
+    print(f"⚖️  Rule table vs hand-written scoring ({n:,} targets, rules {RULES.version}, best of {repeats})")
+    timings = {
+        "scalar  hand-written": best_of(repeats, lambda: [handwritten_deductions(i) for i in inputs]),
+        "scalar  compiled rules": best_of(repeats, lambda: [RULES.evaluate(i) for i in inputs]),
+        "batch   hand-written": best_of(repeats, lambda: handwritten_batch(columns)),
+        "batch   compiled rules": best_of(repeats, lambda: RULES.evaluate_batch(columns)),
+    }
+    for label, seconds in timings.items():
+        print(f"   {label:<24} {seconds * 1000:9.2f} ms ({n / seconds:>14,.0f} targets/s)")
+    print(f"   Full calculate_oes (with ScoringResult): "
+          f"{n / best_of(repeats, lambda: [calculate_oes(i) for i in inputs]):,.0f} targets/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Queue Isolation Load Test
+
+Shows that the scan, report and maintenance worker profiles isolate each
+other and that interactive tasks overtake bulk backlogs. Synthetic tasks
+stand in for the real ones: a CPU burner on the report queue and an
+asyncio sleep on the scan queue (run on the shared scan loop, like real
+connector I/O). Each probe records when it started; queue latency is
+start time minus enqueue time.
+
+Needs Redis (CELERY_BROKER_URL) and one worker per profile started from
+this module so the synthetic tasks are registered:
+
+    python benchmarks/load_queues.py worker scan
+    python benchmarks/load_queues.py worker report
+    python benchmarks/load_queues.py worker maintenance
+
+Then, in another shell:
+
+    python benchmarks/load_queues.py run [flood_size]
+"""
+
+import asyncio
+import statistics
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from celery import group
+
+from app.worker import (
+    MAINTENANCE_QUEUE,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    REPORT_QUEUE,
+    SCAN_QUEUE,
+    celery_app,
+    worker_argv,
+)
+from app.services.scan import run_in_worker_loop
+
+
+@celery_app.task(name="loadtest.cpu")
+def cpu_task(enqueued: float, seconds: float) -> float:
+    started = time.time()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(1000))
+    return started - enqueued
+
+
+@celery_app.task(name="loadtest.io")
+def io_task(enqueued: float, seconds: float) -> float:
+    started = time.time()
+    run_in_worker_loop(asyncio.sleep(seconds))
+    return started - enqueued
+
+
+def _send(task, queue: str, priority: int, seconds: float):
+    return task.signature((time.time(), seconds), queue=queue, priority=priority)
+
+
+def _latencies(signatures) -> list:
+    return group(signatures).apply_async().get(timeout=600)
+
+
+def _summary(label: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    print(f"   {label:<44} p50 {statistics.median(latencies) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def scenario(label: str, flood, probes) -> None:
+    """Enqueue a flood, then probes; report the probes' queue latency"""
+    flood_result = group(flood).apply_async() if flood else None
+    time.sleep(0.5)  # let the flood reach the workers first
+    _summary(label, _latencies(probes))
+    if flood_result is not None:
+        flood_result.revoke()
+
+
+def run(flood_size: int) -> None:
+    print(f"🚦 Queue isolation load test (flood of {flood_size} tasks)")
+    scan_probes = lambda: [_send(io_task, SCAN_QUEUE, PRIORITY_INTERACTIVE, 0.05) for _ in range(50)]
+    report_probes = lambda: [_send(cpu_task, REPORT_QUEUE, PRIORITY_INTERACTIVE, 0.05) for _ in range(10)]
+
+    scenario("scan probes, idle", [], scan_probes())
+    scenario(
+        "scan probes, report queue flooded",
+        [_send(cpu_task, REPORT_QUEUE, PRIORITY_BULK, 1.0) for _ in range(flood_size)],
+        scan_probes(),
+    )
+    scenario("report probes, idle", [], report_probes())
+    scenario(
+        "report probes, scan queue flooded",
+        [_send(io_task, SCAN_QUEUE, PRIORITY_BULK, 2.0) for _ in range(flood_size * 5)],
+        report_probes(),
+    )
+    scenario(
+        "interactive scans behind a bulk scan backlog",
+        [_send(io_task, SCAN_QUEUE, PRIORITY_BULK, 0.5) for _ in range(flood_size * 5)],
+        scan_probes(),
+    )
+    scenario(
+        "report probes, maintenance queue flooded",
+        [_send(cpu_task, MAINTENANCE_QUEUE, PRIORITY_BULK, 1.0) for _ in range(flood_size)],
+        report_probes(),
+    )
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "worker":
+        celery_app.worker_main(worker_argv(sys.argv[2]))
+    else:
+        run(int(sys.argv[2]) if len(sys.argv) > 2 else 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,116 @@
 import os
 os.environ["ENVIRONMENT"] = "test"
-os.environ["PYTEST_CURRENT_TEST"] = "1" 
\ No newline at end of file
+os.environ["PYTEST_CURRENT_TEST"] = "1"
+
+import asyncio
+import time
+import pytest
+
+
+class FakePubSub:
+    """In-memory pub/sub subscription"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def unsubscribe(self, *channels):
+        for channel in channels:
+            queues = self.redis.subscribers.get(channel, [])
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+    async def close(self):
+        pass
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the async Redis client"""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+        self.subscribers = {}
+
+    def _alive(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.store
+
+    async def get(self, key):
+        return self.store.get(key) if self._alive(key) else None
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.store[key] = value
+        if ex:
+            self.expiry[key] = time.time() + ex
+        return True
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += int(self._alive(key))
+            self.store.pop(key, None)
+            self.expiry.pop(key, None)
+        return removed
+
+    async def rpush(self, key, *values):
+        self.store.setdefault(key, []).extend(values)
+        return len(self.store[key])
+
+    async def lrange(self, key, start, end):
+        items = self.store.get(key, []) if self._alive(key) else []
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def hget(self, key, field):
+        return self.store.get(key, {}).get(field) if self._alive(key) else None
+
+    async def hset(self, key, field, value):
+        if not self._alive(key):
+            self.store[key] = {}
+        self.store[key][field] = value
+        return 1
+
+    async def expire(self, key, seconds):
+        if not self._alive(key):
+            return False
+        self.expiry[key] = time.time() + seconds
+        return True
+
+    def register_script(self, script):
+        """Scripts with an in-memory equivalent; others fail like an unreachable server"""
+        from app.connectors.cache import RELEASE_LOCK_LUA
+
+        if script != RELEASE_LOCK_LUA:
+            raise NotImplementedError("FakeRedis cannot run this Lua script")
+
+        async def release_lock(keys, args):
+            if await self.get(keys[0]) == args[0]:
+                return await self.delete(keys[0])
+            return 0
+        return release_lock
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def publish(self, channel, message):
+        queues = self.subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(queues)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
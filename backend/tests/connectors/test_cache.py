@@ -0,0 +1,223 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+
+from app.connectors.cache import ConnectorCache, LRUCache, normalize_target
+from app.connectors.singleflight import SingleFlight
+from app.schemas import ScanFinding
+
+
+class CachedConnector:
+    name = "cached"
+    cache_ttl = 60
+    cache_stale_ttl = 60
+
+    def __init__(self):
+        self.fetch = AsyncMock(side_effect=lambda target, runtime=None: {"domain": target})
+
+
+def test_normalize_target():
+    """Test that cache keys ignore case, whitespace and the trailing root dot"""
+    assert normalize_target(" Example.COM. ") == "example.com"
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeat_fetches(fake_redis):
+    """Test that a second fetch for the same target is served from Redis"""
+    cache = ConnectorCache(redis=fake_redis)
+    conn = CachedConnector()
+
+    first = await cache.fetch(conn, "example.com")
+    second = await cache.fetch(conn, "EXAMPLE.com")
+
+    assert first == second == {"domain": "example.com"}
+    assert conn.fetch.await_count == 1
+    assert cache.stats["cached:miss"] == 1
+    assert cache.stats["cached:hit"] + cache.stats["cached:l1_hit"] == 1
+    assert isinstance(fake_redis.store["connector-cache:cached:example.com"], bytes)
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_stale_and_refreshes(fake_redis):
+    """Test stale-while-revalidate: stale data is returned and refreshed in the background"""
+    cache = ConnectorCache(redis=fake_redis)
+    conn = CachedConnector()
+    key = cache.key("cached", "example.com")
+    fake_redis.store[key] = cache.encode({"domain": "old"}, stored_at=time.time() - 90)
+
+    raw = await cache.fetch(conn, "example.com")
+    assert raw == {"domain": "old"}
+    await asyncio.gather(*cache._refreshes)
+
+    assert conn.fetch.await_count == 1
+    assert cache.decode(fake_redis.store[key])["raw"] == {"domain": "example.com"}
+
+
+@pytest.mark.asyncio
+async def test_cache_falls_back_when_redis_fails():
+    """Test that Redis errors never fail the scan"""
+    broken = AsyncMock()
+    broken.get.side_effect = ConnectionError("redis down")
+    broken.set.side_effect = ConnectionError("redis down")
+    cache = ConnectorCache(redis=broken)
+    conn = CachedConnector()
+
+    assert await cache.fetch(conn, "example.com") == {"domain": "example.com"}
+    assert cache.stats["errors"] == 2
+
+
+def test_lru_evicts_by_bytes_and_ttl():
+    """Test that L1 respects its byte budget and expires entries"""
+    lru = LRUCache(max_entries=10, max_bytes=100)
+    lru.set("a", 1, ttl=60, size=60)
+    lru.set("b", 2, ttl=60, size=30)
+    lru.get("a")
+    lru.set("c", 3, ttl=60, size=30)  # over budget: evicts least recently used "b"
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.current_bytes == 90
+
+    lru.set("d", 4, ttl=-1, size=1)
+    assert lru.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_l1_serves_normalized_and_honours_invalidation(fake_redis):
+    """Test that L1 skips Redis on repeat lookups and drops purged keys on every worker"""
+    conn = CachedConnector()
+    conn.normalize = lambda raw: ScanFinding(category="cached", details=raw)
+    worker_a = ConnectorCache(redis=fake_redis)
+    worker_b = ConnectorCache(redis=fake_redis)
+    worker_a.ensure_invalidation_listener()
+    worker_b.ensure_invalidation_listener()
+    await asyncio.sleep(0)
+
+    await worker_b.fetch_normalized(conn, "example.com")
+    fake_redis.get = AsyncMock(side_effect=AssertionError("L1 should answer"))
+    finding = await worker_b.fetch_normalized(conn, "example.com")
+    assert finding.details == {"domain": "example.com"}
+    assert worker_b.stats["cached:l1_hit"] == 1
+
+    await worker_a.invalidate("cached", "example.com")
+    await asyncio.sleep(0)
+    assert len(worker_b.l1) == 0
+
+    await worker_a.aclose()
+    await worker_b.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cached_findings_keep_their_upstream_fetch_time(fake_redis):
+    """Test that Redis and L1 hits report when the response was fetched, not when it was served"""
+    conn = CachedConnector()
+    conn.normalize = lambda raw: ScanFinding(category="cached", details=raw)
+    cache = ConnectorCache(redis=fake_redis)
+    cache.ensure_invalidation_listener()
+    await asyncio.sleep(0)
+    stored_at = time.time() - 30
+    fake_redis.store[cache.key("cached", "example.com")] = cache.encode({"domain": "old"}, stored_at=stored_at)
+
+    from_redis = await cache.fetch_normalized(conn, "example.com")
+    from_l1 = await cache.fetch_normalized(conn, "example.com")
+
+    assert from_redis.fetched_at == from_l1.fetched_at == stored_at
+    assert cache.stats["cached:hit"] == cache.stats["cached:l1_hit"] == 1
+    assert conn.fetch.await_count == 0
+
+    before = time.time()
+    fresh = await cache.fetch_normalized(conn, "other.example.com")
+    assert fresh.fetched_at >= before
+    assert cache.decode(fake_redis.store[cache.key("cached", "other.example.com")])["stored_at"] == fresh.fetched_at
+    await cache.aclose()
+
+
+class SlowConnector(CachedConnector):
+    """Connector whose upstream takes a while, counting upstream calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+        async def fetch(target, runtime=None):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            return {"domain": target}
+
+        self.fetch = fetch
+
+
+@pytest.mark.asyncio
+async def test_singleflight_shares_one_call_and_survives_cancelled_waiter():
+    """Test that duplicate callers share one call and a cancelled caller doesn't abort it"""
+    flights = SingleFlight()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    impatient = asyncio.ensure_future(flights.do("k", fn))
+    patient = [asyncio.ensure_future(flights.do("k", fn)) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    impatient.cancel()
+
+    assert await asyncio.gather(*patient) == ["result"] * 4
+    assert calls == 1
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_fetches_coalesce_across_workers(fake_redis):
+    """Test that one upstream query serves duplicate lookups in and across workers"""
+    conn = SlowConnector()
+    workers = [ConnectorCache(redis=fake_redis) for _ in range(2)]
+    for worker in workers:
+        worker.ensure_invalidation_listener()
+    await asyncio.sleep(0)
+
+    results = await asyncio.gather(*(
+        workers[i % 2].fetch(conn, "example.com") for i in range(6)
+    ))
+
+    assert results == [{"domain": "example.com"}] * 6
+    assert conn.calls == 1
+    assert "connector-cache:cached:example.com:inflight" not in fake_redis.store
+    for worker in workers:
+        await worker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_flight_lock_is_released_once_the_fill_is_written(fake_redis):
+    """Test that the lock holder releases right after caching, not when its task ends"""
+    cache = ConnectorCache(redis=fake_redis)
+    cache.ensure_invalidation_listener()
+    await asyncio.sleep(0)
+    lock_key = "connector-cache:cached:example.com:inflight"
+
+    await cache.fetch(SlowConnector(), "example.com")
+    assert lock_key not in fake_redis.store
+    await cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_flight_lock_release_keeps_a_newer_holders_lock(fake_redis):
+    """Test that a holder whose lock expired mid-fetch leaves the new holder's lock alone"""
+    cache = ConnectorCache(redis=fake_redis)
+    cache.ensure_invalidation_listener()
+    await asyncio.sleep(0)
+    lock_key = "connector-cache:cached:example.com:inflight"
+    conn = CachedConnector()
+
+    async def fetch(target, runtime=None):
+        # Our lock expired and another worker took it while we were fetching
+        fake_redis.store[lock_key] = "other-worker"
+        return {"domain": target}
+
+    conn.fetch = fetch
+    await cache.fetch(conn, "example.com")
+
+    assert fake_redis.store[lock_key] == "other-worker"
+    await cache.aclose()
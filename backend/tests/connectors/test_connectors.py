@@ -17,4 +17,48 @@ async def test_whois_fetch_and_normalize():
     inst = connectors["whois"]
     raw = await inst.fetch("example.com")
     norm = inst.normalize(raw)
-    assert norm.details["raw"]["domain"] == "example.com" 
\ No newline at end of file
+    assert norm.details["raw"]["domain"] == "example.com" 
+
+@pytest.mark.asyncio
+async def test_runtime_pools_one_client_and_caps_per_host():
+    """Test that the runtime reuses one client and enforces the per-host limit"""
+    import asyncio
+    from app.connectors.runtime import ConnectorRuntime
+
+    runtime = ConnectorRuntime(max_connections_per_host=2)
+    assert runtime.client is runtime.client
+
+    active = 0
+    peak = 0
+
+    async def call(url):
+        nonlocal active, peak
+        async with runtime.host_slot(url):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(call("https://api.example.com/q") for _ in range(6)))
+    assert peak == 2
+
+    client = runtime.client
+    await runtime.aclose()
+    assert client.is_closed
+
+def test_runtime_is_closed_when_its_loop_shuts_down():
+    """Test that a loop change does not leak the previous loop's client"""
+    import asyncio
+    from app.connectors.runtime import get_connector_runtime
+
+    async def use():
+        runtime = get_connector_runtime()
+        assert get_connector_runtime() is runtime
+        return runtime, runtime.client
+
+    first, first_client = asyncio.run(use())
+    assert first_client.is_closed
+
+    second, second_client = asyncio.run(use())
+    assert second is not first
+    assert second_client.is_closed
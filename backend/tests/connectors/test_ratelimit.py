@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.connectors.ratelimit import LocalTokenBucket, RateLimiter, connector_rate
+
+
+class LimitedConnector:
+    name = "limited"
+    rate_limit = 100.0
+    rate_burst = 2
+
+
+def test_connector_rate_defaults():
+    """Test rate declarations: unlimited by default, burst defaults to one second of rate"""
+    assert connector_rate(MagicMock()) is None
+    assert connector_rate(LimitedConnector()) == (100.0, 2.0)
+
+    class NoBurst:
+        rate_limit = 0.5
+    assert connector_rate(NoBurst()) == (0.5, 1.0)
+
+
+def test_local_bucket_queues_callers_past_burst():
+    """Test that reservations beyond the burst are told how long to wait"""
+    bucket = LocalTokenBucket(rate=10.0, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_limiter_waits_for_redis_reservation_and_records_metrics():
+    """Test that acquire sleeps for the wait the Lua script returns and tracks it"""
+    redis = MagicMock()
+    script = AsyncMock(side_effect=["0", "0.02"])
+    redis.register_script.return_value = script
+    limiter = RateLimiter(redis=redis)
+
+    assert await limiter.acquire(LimitedConnector()) == 0.0
+    assert await limiter.acquire(LimitedConnector()) == pytest.approx(0.02)
+
+    assert script.await_args.kwargs == {"keys": ["connector-ratelimit:limited"], "args": [100.0, 2.0, 1]}
+    stats = limiter.metrics["limited"]
+    assert stats["acquired"] == 2
+    assert stats["waited"] == 1
+    assert stats["max_wait_seconds"] == pytest.approx(0.02)
+
+
+@pytest.mark.asyncio
+async def test_limiter_falls_back_to_local_bucket():
+    """Test that an unreachable Redis degrades to per-process limiting"""
+    redis = MagicMock()
+    redis.register_script.side_effect = ConnectionError("redis down")
+    limiter = RateLimiter(redis=redis)
+
+    for _ in range(2):
+        assert await limiter.acquire(LimitedConnector()) == 0.0
+    assert await limiter.acquire(LimitedConnector()) > 0
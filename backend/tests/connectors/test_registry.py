@@ -0,0 +1,107 @@
+import sys
+import textwrap
+
+import pytest
+
+from app.connectors import registry as registry_module
+from app.connectors.registry import ConnectorRegistry, ConnectorSpec
+from app.core.config import settings
+
+PLUGIN = textwrap.dedent('''
+    from app.connectors.base import BaseConnector
+    from app.schemas import ScanFinding
+
+    class {cls}(BaseConnector):
+        name = "{name}"
+        scan_types = {scan_types!r}
+        description = "{name} plugin"
+
+        async def fetch(self, target, runtime=None):
+            return {{"target": target}}
+
+        def normalize(self, raw):
+            return ScanFinding(category="{name}", details=raw)
+''')
+
+
+@pytest.fixture
+def plugins(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    created = []
+
+    def make(name, scan_types=("domain",), body=None):
+        module = f"plugin_{name}"
+        source = body if body is not None else PLUGIN.format(cls=f"{name.title()}Connector", name=name, scan_types=tuple(scan_types))
+        (tmp_path / f"{module}.py").write_text(source)
+        created.append(module)
+        return ConnectorSpec(name=name, target=f"{module}:{name.title()}Connector", scan_types=tuple(scan_types))
+
+    yield make
+    for module in created:
+        sys.modules.pop(module, None)
+
+
+def test_modules_are_imported_on_first_use(plugins):
+    registry = ConnectorRegistry([plugins("dns")], discover=False)
+
+    assert "plugin_dns" not in sys.modules
+    assert registry.metadata()[0]["loaded"] is False
+    assert "plugin_dns" not in sys.modules
+
+    connector = registry.get("dns")
+    assert "plugin_dns" in sys.modules and registry.get("dns") is connector
+    assert registry.metadata()[0]["loaded"] is True
+
+
+def test_selection_by_scan_type_and_flags(plugins, monkeypatch):
+    registry = ConnectorRegistry(
+        [plugins("dns"), plugins("breach", ("email", "domain")), plugins("mailbox", ("email",))],
+        discover=False,
+    )
+
+    assert set(registry.for_scan_type("email")) == {"breach", "mailbox"}
+    assert "plugin_dns" not in sys.modules
+
+    monkeypatch.setattr(settings, "CONNECTORS_DISABLED", ["breach"])
+    assert set(registry.for_scan_type("email")) == {"mailbox"}
+
+    monkeypatch.setattr(settings, "CONNECTORS_DISABLED", [])
+    monkeypatch.setattr(settings, "CONNECTORS_ENABLED", ["dns"])
+    assert set(registry.for_scan_type("domain")) == {"dns"}
+    assert list(registry.connectors()) == ["dns"]
+
+
+def test_broken_connector_is_skipped_and_reported(plugins):
+    registry = ConnectorRegistry([plugins("dns"), plugins("broken", body="raise ImportError('missing sdk')")], discover=False)
+
+    assert set(registry.for_scan_type("domain")) == {"dns"}
+    broken = next(item for item in registry.metadata() if item["id"] == "broken")
+    assert "missing sdk" in broken["error"]
+
+
+def test_entry_point_plugins_declare_scan_types_on_the_class(plugins, monkeypatch):
+    spec = plugins("leaks", ("email",))
+
+    class EntryPoint:
+        name, value = "leaks", spec.target
+
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: [EntryPoint()])
+    registry = ConnectorRegistry([], discover=True)
+
+    assert registry.spec("leaks").source == "entry_point"
+    assert set(registry.for_scan_type("email")) == {"leaks"}
+    assert registry.spec("leaks").scan_types == ("email",)
+    assert registry.for_scan_type("domain") == {}
+
+
+def test_scan_graph_pulls_in_consumers_of_discovered_entities(plugins):
+    producer = PLUGIN.format(cls="DnsConnector", name="dns", scan_types=("domain",)) + "    outputs = ('email',)\n"
+    consumer = PLUGIN.format(cls="BreachConnector", name="breach", scan_types=("email",)) + "    inputs = ('email',)\n"
+    registry = ConnectorRegistry(
+        [plugins("dns", body=producer), plugins("breach", ("email",), body=consumer), plugins("mailbox", ("email",))],
+        discover=False,
+    )
+
+    assert set(registry.for_scan_type("domain")) == {"dns"}
+    assert set(registry.for_scan_graph("domain")) == {"dns", "breach"}
+    assert set(registry.for_scan_graph("email")) == {"breach", "mailbox"}
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+
+from app.schemas import ScanFinding
+from app.services.events import ScanEventPublisher, scan_events, format_sse
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_gets_backlog_then_live_events(fake_redis):
+    """Test that a late subscriber replays missed events and then follows live ones"""
+    publisher = ScanEventPublisher("job-1", redis=fake_redis)
+    await publisher.finding(ScanFinding(category="whois", details={"domain": "example.com"}), 1, 2)
+
+    consumer = asyncio.ensure_future(_collect(scan_events("job-1", redis=fake_redis)))
+    await asyncio.sleep(0.01)
+    await publisher.publish("completed", {"overall_score": 90.0})
+    events = await asyncio.wait_for(consumer, 1)
+
+    assert [e["event"] for e in events] == ["finding", "progress", "completed"]
+    assert events[0]["data"]["category"] == "whois"
+    assert events[1]["data"] == {"completed": 1, "total": 2, "progress": 50}
+    assert [e["id"] for e in events] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_seen_events_and_emits_heartbeats(fake_redis):
+    """Test Last-Event-ID resume and keep-alives while the scan is quiet"""
+    publisher = ScanEventPublisher("job-2", redis=fake_redis)
+    await publisher.publish("progress", {"progress": 0})
+
+    stream = scan_events("job-2", redis=fake_redis, last_event_id=1, heartbeat=0.01)
+    assert await stream.__anext__() is None
+    await publisher.publish("failed", {"error": "boom"})
+    event = await stream.__anext__()
+    while event is None:
+        event = await stream.__anext__()
+    assert event["event"] == "failed"
+    await stream.aclose()
+
+
+def test_format_sse():
+    """Test Server-Sent Events framing"""
+    assert format_sse(None) == ": keep-alive\n\n"
+    assert format_sse({"id": 3, "event": "progress", "data": {"progress": 50}}) == (
+        'id: 3\nevent: progress\ndata: {"progress": 50}\n\n'
+    )
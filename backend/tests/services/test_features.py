@@ -0,0 +1,113 @@
+import tracemalloc
+
+import pytest
+
+from app.schemas import ScanFinding
+from app.services.features import AllOf, AnyOf, DistinctCount, FindingsExtractor, Minimum, Sum
+from app.services.scoring import calculate_oes, compute_overall_score
+
+
+def test_aggregators_fold_observations():
+    total, lowest, risky, control = Sum(), Minimum(), AnyOf(), AllOf()
+    assert total.value is lowest.value is risky.value is control.value is None
+
+    for value in (3, 1, 4):
+        total.add(value)
+        lowest.add(value)
+    for value in (False, True, False):
+        risky.add(value)
+        control.add(not value)
+
+    assert (total.value, lowest.value, risky.value, control.value) == (8, 1, True, False)
+
+
+def test_distinct_count_is_exact_below_limit():
+    distinct = DistinctCount(limit=64)
+    for email in ["a@example.com", "A@example.com ", "b@example.com", "a@example.com"]:
+        distinct.add(email)
+    assert distinct.value == 2
+
+
+def test_distinct_count_estimates_in_bounded_memory():
+    distinct = DistinctCount(limit=1024)
+    tracemalloc.start()
+    for i in range(100_000):
+        distinct.add(f"host{i}.example.com")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert abs(distinct.value - 100_000) / 100_000 < 0.1
+    assert len(distinct._hashes) == 1024
+    assert peak < 1024 * 1024
+
+
+def test_whois_signals_feed_domain_footprint():
+    extractor = FindingsExtractor()
+    extractor.add(ScanFinding(category="whois", details={"raw": {
+        "domain": "example.com",
+        "expiration_date": "2999-01-01T00:00:00Z",
+        "privacy": False,
+        "emails": ["admin@example.com"],
+    }}))
+
+    scoring_input = extractor.scoring_input()
+    assert scoring_input.domain_expiry_days > 30
+    assert scoring_input.privacy_enabled is False
+    assert scoring_input.whois_email_exposed is True
+    assert extractor.score().deductions["D1"] == 3  # no privacy (2) + exposed email (1)
+    assert extractor.score() == calculate_oes(scoring_input)
+
+
+def test_source_without_signals_does_not_lower_the_score():
+    """Test that a completed finding with nothing to report costs no more than no finding"""
+    empty = ScanFinding(category="whois", details={"domain": "example.com"})
+    breach = ScanFinding(category="breach", details={"signals": {"breach_instances": 2}})
+
+    assert compute_overall_score([]) == compute_overall_score([empty]) == 100.0
+    assert compute_overall_score([breach, empty]) == compute_overall_score([breach]) == 96.0
+    assert FindingsExtractor().add_all([empty]).scoring_input() == FindingsExtractor().scoring_input()
+
+
+def test_generic_signals_and_live_score():
+    extractor = FindingsExtractor()
+    scores = []
+    findings = [
+        ScanFinding(category="breach", details={"signals": {"breach_instances": 2, "unique_emails_exposed": ["a@x.io", "b@x.io"]}}),
+        ScanFinding(category="breach", details={"signals": {"breach_instances": 3, "password_exposed": True}}, entity="b@x.io"),
+        ScanFinding(category="ports", details={"signals": {"open_ports_count": 4, "has_waf": True, "bogus": 1}}),
+    ]
+    for finding in findings:
+        extractor.add(finding)
+        scores.append(extractor.score().score)
+
+    scoring_input = extractor.scoring_input()
+    assert (scoring_input.breach_instances, scoring_input.unique_emails_exposed) == (5, 2)
+    assert scores == [96.0, 85.0, 80.0]
+
+
+def test_incremental_score_only_recomputes_changed_dimensions():
+    previous = FindingsExtractor().add_all([
+        ScanFinding(category="ports", details={"signals": {"open_ports_count": 1}}),
+    ]).score()
+    current = FindingsExtractor().add_all([
+        ScanFinding(category="ports", details={"signals": {"open_ports_count": 0}}),
+        ScanFinding(category="breach", details={"signals": {"password_exposed": True}}),
+    ])
+
+    assert current.score(previous, ["D2"]).deductions == {**previous.deductions, "D2": 5}
+    assert current.score(previous, ["D2", "D3"]) == current.score()
+
+
+@pytest.mark.asyncio
+async def test_scan_reports_deductions():
+    from unittest.mock import AsyncMock, MagicMock
+    from app.services.scan import scan_target
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value={"signals": {"known_cve_count": 2}})
+    conn.normalize = lambda raw: ScanFinding(category="cves", details=raw)
+    conn.timeout = 5
+
+    result = await scan_target("example.com", {"cves": conn})
+    assert result["overall_score"] == 95.0
+    assert result["deductions"]["D4"] == 5
@@ -0,0 +1,103 @@
+import os
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.services.report_render import build_report_context, rating_for, render_html
+from app.services.scan import finding_from_row
+from app.services.scoring import RULES, compute_overall_score
+from app.utils.files import atomic_write
+
+
+def _rows():
+    return [
+        {"category": "whois", "raw_data": {"registrar": "<Evil & Co>", "privacy": False}, "penalty_score": 0.0},
+        {"category": "breach", "raw_data": {"signals": {"breach_instances": 3}}, "penalty_score": 0.0},
+        {"category": "breach", "raw_data": {"scan_status": "timed_out"}, "penalty_score": 0.0},
+    ]
+
+
+def test_context_scores_with_the_scoring_module():
+    job = {"id": uuid.uuid4(), "target": "example.com", "scan_type": "domain"}
+
+    context = build_report_context(job, iter(_rows()), max_findings=2)
+
+    findings = [finding_from_row({"domain_or_email": "example.com", **row}, "example.com") for row in _rows()]
+    assert context["overall_score"] == compute_overall_score(findings) == 92.0
+    assert context["rating"] == "Low"
+    assert context["rules_version"] == RULES.version
+    deductions = {r["dimension"]: r["deduction"] for r in context["breakdown"]}
+    assert deductions == {"D1": 2, "D2": 6, "D3": 0, "D4": 0, "D5": 0, "D6": 0}
+    assert context["total_penalty"] == 8
+    assert [(r["category"], r["count"]) for r in context["sources"]] == [("breach", 2), ("whois", 1)]
+    assert context["total_findings"] == 3
+    assert len(context["findings"]) == 2 and context["omitted_findings"] == 1
+
+
+def test_sources_without_signals_do_not_lower_the_score():
+    job = {"id": uuid.uuid4(), "target": "example.com"}
+
+    context = build_report_context(job, [{"category": "whois", "raw_data": {"registrar": "a"}}])
+
+    assert context["overall_score"] == build_report_context(job, [])["overall_score"] == 100.0
+    assert all(row["deduction"] == 0 for row in context["breakdown"])
+
+
+def test_rendered_html_escapes_findings():
+    job = {"id": uuid.uuid4(), "target": "example.com"}
+    context = build_report_context(job, _rows())
+
+    html = render_html(context)
+
+    assert "&lt;Evil &amp; Co&gt;" in html and "<Evil" not in html
+    assert "92.0" in html and "timed out" in html and "Breach &amp; Credential Exposure" in html
+    assert "<style>" in html
+    assert "<style>" not in render_html(context, inline_css=False)
+
+
+def test_rating_thresholds():
+    assert [rating_for(s) for s in (95, 80, 79.9, 50, 10)] == ["Low", "Low", "Medium", "Medium", "High"]
+
+
+def test_atomic_write_replaces_without_leftovers(tmp_path):
+    path = os.path.join(tmp_path, "reports", "report.pdf")
+
+    assert atomic_write(path, b"first") == 5
+    atomic_write(path, b"second")
+
+    with open(path, "rb") as f:
+        assert f.read() == b"second"
+    assert os.listdir(os.path.dirname(path)) == ["report.pdf"]
+
+
+def test_pdf_rendering():
+    pytest.importorskip("weasyprint", exc_type=OSError)
+    from app.services.report_render import html_to_pdf
+
+    context = build_report_context({"id": uuid.uuid4(), "target": "example.com"}, _rows())
+    assert html_to_pdf(render_html(context, inline_css=False)).startswith(b"%PDF")
+
+
+def test_content_hash_ignores_job_id_and_tracks_findings():
+    first = build_report_context({"id": uuid.uuid4(), "target": "example.com"}, _rows())
+    same = build_report_context({"id": uuid.uuid4(), "target": "example.com"}, _rows())
+    changed = build_report_context(
+        {"id": uuid.uuid4(), "target": "example.com"},
+        _rows() + [{"category": "dns", "raw_data": {}, "penalty_score": 0.0}]
+    )
+
+    assert first["content_hashes"] == same["content_hashes"]
+    assert first["content_hashes"]["pdf"] != changed["content_hashes"]["pdf"]
+    assert first["content_hashes"]["pdf"] != first["content_hashes"]["html"]
+
+
+def test_content_hash_changes_when_the_encryption_key_rotates(monkeypatch):
+    job = {"id": uuid.uuid4(), "target": "example.com"}
+    plain = build_report_context(job, _rows())["content_hashes"]
+    monkeypatch.setattr(settings, "REPORT_ENCRYPTION_KEY", "00" * 32)
+    first_key = build_report_context(job, _rows())["content_hashes"]
+    monkeypatch.setattr(settings, "REPORT_ENCRYPTION_KEY", "11" * 32)
+    second_key = build_report_context(job, _rows())["content_hashes"]
+
+    assert len({plain["pdf"], first_key["pdf"], second_key["pdf"]}) == 3
@@ -0,0 +1,123 @@
+import time
+
+import pytest
+
+from app.connectors.base import BaseConnector
+from app.schemas import ScanFinding
+from app.services.rescan import PreviousScan, changed_dimensions, diff_findings, reuse_previous
+from app.services.scan import finding_from_row, finding_raw_data, scan_target
+
+
+class RescanConnector(BaseConnector):
+    """Test connector with a data TTL and an optional upstream change signal"""
+
+    def __init__(self, name, details, data_ttl=0, changed=None, dimensions=("D1",)):
+        self.name = name
+        self.details = details
+        self.data_ttl = data_ttl
+        self.changed = changed
+        self.dimensions = dimensions
+        self.fetches = 0
+        self.revalidations = []
+
+    async def fetch(self, target, runtime=None):
+        self.fetches += 1
+        return dict(self.details)
+
+    def normalize(self, raw):
+        return ScanFinding(category=self.name, details=raw, validators={"etag": '"v2"'})
+
+    async def revalidate(self, target, validators, runtime=None):
+        self.revalidations.append(validators)
+        return self.changed
+
+
+def _previous(name, details, age, validators=None, entity=None):
+    return ScanFinding(
+        category=name, details=details, entity=entity,
+        validators=validators or {}, fetched_at=time.time() - age
+    )
+
+
+@pytest.mark.asyncio
+async def test_reuse_within_data_ttl_skips_upstream():
+    conn = RescanConnector("whois", {"registrar": "b"}, data_ttl=3600)
+    previous = _previous("whois", {"registrar": "a"}, age=60, validators={"etag": '"v1"'})
+
+    finding, outcome = await reuse_previous(conn, "example.com", previous)
+
+    assert outcome == "fresh" and finding.details == {"registrar": "a"}
+    assert finding is not previous and conn.revalidations == []
+
+
+@pytest.mark.asyncio
+async def test_expired_finding_is_revalidated_with_stored_validators():
+    conn = RescanConnector("headers", {}, changed=False)
+    previous = _previous("headers", {"hsts": True}, age=86400, validators={"etag": '"v1"'})
+
+    finding, outcome = await reuse_previous(conn, "example.com", previous)
+
+    assert outcome == "not_modified" and finding.details == {"hsts": True}
+    assert finding.fetched_at > previous.fetched_at
+    assert conn.revalidations == [{"etag": '"v1"'}]
+
+    conn.changed = None
+    assert await reuse_previous(conn, "example.com", previous) == (None, "fetch")
+    assert await reuse_previous(conn, "example.com", _previous("headers", {}, age=86400)) == (None, "fetch")
+
+
+@pytest.mark.asyncio
+async def test_incremental_scan_only_fetches_stale_sources():
+    connectors = {
+        "whois": RescanConnector("whois", {"registrar": "new"}, data_ttl=3600, dimensions=("D1",)),
+        "headers": RescanConnector("headers", {"hsts": False}, dimensions=("D4",)),
+        "ports": RescanConnector("ports", {"open": []}, changed=False, dimensions=("D3",)),
+    }
+    previous = PreviousScan(job_id="prev", findings={
+        ("whois", None): _previous("whois", {"registrar": "old"}, age=60),
+        ("headers", None): _previous("headers", {"hsts": True}, age=86400),
+        ("ports", None): _previous("ports", {"open": []}, age=86400, validators={"serial": 7}),
+        ("dns", None): _previous("dns", {"mx": []}, age=60),
+    })
+
+    result = await scan_target("example.com", connectors, previous=previous)
+
+    assert [c.fetches for c in connectors.values()] == [0, 1, 0]
+    incremental = result["incremental"]
+    assert (incremental["reused"], incremental["not_modified"], incremental["fetched"]) == (1, 1, 1)
+    assert incremental["diff"]["changed"] == [{"category": "headers", "entity": None}]
+    assert incremental["diff"]["removed"] == [{"category": "dns", "entity": None}]
+    assert incremental["diff"]["unchanged"] == 2
+    # dns no longer has a connector, so every dimension is rescored
+    assert incremental["changed_dimensions"] == ["D1", "D2", "D3", "D4", "D5", "D6"]
+
+
+def test_changed_dimensions_follow_connector_declarations():
+    previous = {("headers", None): ScanFinding(category="headers", details={"hsts": True})}
+    current = [
+        ScanFinding(category="headers", details={"hsts": False}),
+        ScanFinding(category="breach", details={}, entity="a@example.com"),
+    ]
+    diff = diff_findings(previous, current)
+    connectors = {
+        "headers": RescanConnector("headers", {}, dimensions=("D4",)),
+        "breach": RescanConnector("breach", {}, dimensions=("D2", "D5")),
+    }
+
+    assert diff["added"] == [{"category": "breach", "entity": "a@example.com"}]
+    assert changed_dimensions(diff, connectors) == ["D2", "D4", "D5"]
+    assert changed_dimensions(diff_findings(previous, previous.values()), connectors) == []
+
+
+def test_stored_results_round_trip_rescan_metadata():
+    finding = ScanFinding(
+        category="whois", details={"registrar": "a"}, entity="a@example.com",
+        entities={"email": ["a@example.com"]}, validators={"etag": '"v1"'}, fetched_at=1700000000.0
+    )
+    row = {"domain_or_email": "a@example.com", "category": "whois", "raw_data": finding_raw_data(finding)}
+
+    assert finding_from_row(row, "Example.com") == finding
+
+    target_row = {**row, "domain_or_email": "example.com", "raw_data": {"scan_status": "timed_out"}}
+    restored = finding_from_row(target_row, "Example.com")
+    assert restored.entity is None and restored.status == "timed_out" and restored.details == {}
@@ -0,0 +1,144 @@
+import os
+from collections import namedtuple
+
+import pytest
+
+from app.core.config import settings
+from app.services import retention
+from app.services.retention import RetentionService, unlink_files
+
+
+def test_unlink_files_removes_variants_and_counts_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_OUTPUT_DIR", str(tmp_path))
+    report = tmp_path / "ab" / "abcd.html"
+    report.parent.mkdir()
+    report.write_bytes(b"x" * 100)
+    (tmp_path / "ab" / "abcd.html.gz").write_bytes(b"x" * 30)
+    other = tmp_path / "ab" / "ef.pdf"
+    other.write_bytes(b"y" * 50)
+
+    stats = unlink_files([str(report), str(other), str(tmp_path / "missing.pdf")], workers=4)
+
+    assert stats == {"files": 3, "file_bytes": 180}
+    assert os.listdir(tmp_path / "ab") == []
+
+
+def test_unlink_files_ignores_paths_outside_output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_OUTPUT_DIR", str(tmp_path / "reports"))
+    outside = tmp_path / "keep.pdf"
+    outside.write_bytes(b"keep")
+
+    assert unlink_files([str(outside), str(tmp_path / "reports" / ".." / "keep.pdf")]) == {"files": 0, "file_bytes": 0}
+    assert outside.exists()
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return _Result([row[0] if isinstance(row, tuple) else row for row in self.rows])
+
+
+class _FakeSession:
+    """Answers the retention statements from canned batches"""
+
+    def __init__(self, batches, shared=()):
+        self.batches = list(batches)
+        self.shared = list(shared)
+        self.commits = 0
+
+    async def execute(self, stmt, params=None):
+        if stmt is retention.EXPIRED_REPORTS:
+            return _Result(self.batches.pop(0) if self.batches else [])
+        if stmt is retention.PATHS_STILL_REFERENCED:
+            return _Result([(p,) for p in self.shared])
+        return _Result([])
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+Row = namedtuple("Row", "pdf_path html_path bytes")
+
+
+@pytest.mark.asyncio
+async def test_purge_reports_batches_and_keeps_shared_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_OUTPUT_DIR", str(tmp_path))
+    paths = {}
+    for name in ("a.pdf", "a.html", "b.pdf", "b.html", "shared.pdf"):
+        paths[name] = tmp_path / name
+        paths[name].write_bytes(b"z" * 10)
+    batches = [
+        [Row(str(paths["a.pdf"]), str(paths["a.html"]), 200), Row(str(paths["shared.pdf"]), str(paths["b.html"]), 200)],
+        [Row(str(paths["b.pdf"]), str(paths["b.html"]), 100)],
+    ]
+    db = _FakeSession(batches, shared=[str(paths["shared.pdf"])])
+
+    stats = await RetentionService(batch_size=2, batch_sleep=0).purge_reports(db, cutoff=None)
+
+    assert stats["reports"] == 3 and stats["rows"] == 3 and stats["bytes"] == 500
+    assert stats["batches"] == 2
+    assert stats["files"] == 4 and stats["file_bytes"] == 40
+    assert paths["shared.pdf"].exists() and not paths["a.pdf"].exists()
+
+
+class _PartitionSession:
+    """Records which statements run in a transaction and which in autocommit"""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.statements = []
+        session = self
+
+        class _Autocommit:
+            async def execute(self, stmt, params=None):
+                session.statements.append(("autocommit", str(stmt)))
+
+        self.autocommit = _Autocommit()
+
+    async def connection(self, execution_options=None):
+        assert execution_options == {"isolation_level": "AUTOCOMMIT"}
+        return self.autocommit
+
+    async def execute(self, stmt, params=None):
+        if stmt is retention.LIST_PARTITIONS:
+            result = _Result(self.partitions)
+            result.mappings = lambda: result
+            return result
+        self.statements.append(("transaction", str(stmt)))
+        return _Result([])
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_expired_partitions_are_detached_concurrently_before_drop():
+    from datetime import datetime
+
+    db = _PartitionSession([
+        {"name": "scan_results_2024_01", "rows": 10, "bytes": 100, "detach_pending": False},
+        {"name": "scan_results_2024_02", "rows": 5, "bytes": 50, "detach_pending": True},
+        {"name": "scan_results_2024_03", "rows": 1, "bytes": 1, "detach_pending": False},
+    ])
+
+    stats = await RetentionService(batch_sleep=0).drop_expired_partitions(db, datetime(2024, 3, 15))
+
+    assert stats == {"partitions": ["scan_results_2024_01", "scan_results_2024_02"], "rows": 15, "bytes": 150}
+    dropping = [s for s in db.statements if "scan_results_2024" in s[1]]
+    assert dropping == [
+        ("autocommit", 'ALTER TABLE scan_results DETACH PARTITION "scan_results_2024_01" CONCURRENTLY'),
+        ("transaction", 'DROP TABLE "scan_results_2024_01"'),
+        ("autocommit", 'ALTER TABLE scan_results DETACH PARTITION "scan_results_2024_02" FINALIZE'),
+        ("transaction", 'DROP TABLE "scan_results_2024_02"'),
+    ]
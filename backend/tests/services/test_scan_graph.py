@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.connectors.base import BaseConnector
+from app.core.config import settings
+from app.schemas import ScanFinding
+from app.services.scan import scan_target
+
+
+class GraphConnector(BaseConnector):
+    """Test connector that sleeps, logs its calls and emits fixed entities"""
+
+    def __init__(self, name, delay=0.0, inputs=None, outputs=(), entities=None, log=None):
+        self.name = name
+        self.delay = delay
+        self.inputs = inputs
+        self.outputs = outputs
+        self.entities = entities or {}
+        self.log = log if log is not None else []
+
+    async def fetch(self, target, runtime=None):
+        loop = asyncio.get_running_loop()
+        self.log.append((self.name, target, "start", loop.time()))
+        await asyncio.sleep(self.delay)
+        self.log.append((self.name, target, "end", loop.time()))
+        return {"target": target}
+
+    def normalize(self, raw):
+        return ScanFinding(category=self.name, details=raw, entities=dict(self.entities))
+
+
+@pytest.mark.asyncio
+async def test_downstream_connectors_fan_out_over_discovered_entities():
+    log = []
+    connectors = {
+        "whois": GraphConnector("whois", inputs=("domain",), outputs=("email",),
+                                entities={"email": ["a@example.com", "b@example.com"]}, log=log),
+        "breach": GraphConnector("breach", inputs=("email",), log=log),
+    }
+    result = await scan_target("example.com", connectors)
+
+    assert result["status"] == "completed"
+    ran = sorted((f.category, f.entity) for f in result["results"])
+    assert ran == [("breach", "a@example.com"), ("breach", "b@example.com"), ("whois", None)]
+    assert result["timing"]["connector_runs"] == 3
+
+
+@pytest.mark.asyncio
+async def test_downstream_starts_before_unrelated_roots_finish():
+    log = []
+    connectors = {
+        "whois": GraphConnector("whois", 0.01, inputs=("domain",), outputs=("email",),
+                                entities={"email": ["a@example.com"]}, log=log),
+        "crawl": GraphConnector("crawl", 0.2, log=log),
+        "breach": GraphConnector("breach", 0.05, inputs=("email",), log=log),
+    }
+    result = await scan_target("example.com", connectors)
+
+    times = {(name, event): t for name, _, event, t in log}
+    assert times[("breach", "start")] < times[("crawl", "end")]
+
+    path = result["timing"]["critical_path"]
+    assert [hop["connector"] for hop in path["path"]] == ["crawl"]
+    assert path["seconds"] >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_critical_path_follows_dependency_chain():
+    connectors = {
+        "whois": GraphConnector("whois", 0.05, inputs=("domain",), outputs=("email",),
+                                entities={"email": ["a@example.com"]}),
+        "crawl": GraphConnector("crawl", 0.01),
+        "breach": GraphConnector("breach", 0.1, inputs=("email",)),
+    }
+    result = await scan_target("example.com", connectors)
+
+    path = result["timing"]["critical_path"]
+    assert [(hop["connector"], hop["entity"]) for hop in path["path"]] == [
+        ("whois", "example.com"), ("breach", "a@example.com")
+    ]
+    assert path["path"][1]["start"] >= path["path"][0]["seconds"]
+    assert path["seconds"] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_entities_are_deduplicated_and_capped(monkeypatch):
+    monkeypatch.setattr(settings, "SCAN_GRAPH_MAX_ENTITIES", 3)
+    emails = ["a@example.com", "a@example.com", "b@example.com", "c@example.com", "d@example.com"]
+    connectors = {
+        "whois": GraphConnector("whois", inputs=("domain",), outputs=("email",), entities={"email": emails}),
+        "mx": GraphConnector("mx", inputs=("domain",), outputs=("email",), entities={"email": ["a@example.com"]}),
+        "breach": GraphConnector("breach", inputs=("email",)),
+    }
+    result = await scan_target("example.com", connectors)
+
+    breached = sorted(f.entity for f in result["results"] if f.category == "breach")
+    assert breached == ["a@example.com", "b@example.com", "c@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_connectors_only_run_on_their_input_kinds():
+    connectors = {
+        "whois": GraphConnector("whois", inputs=("domain",), outputs=("email",),
+                                entities={"email": ["a@example.com"], "ip": ["192.0.2.1"]}),
+        "breach": GraphConnector("breach", inputs=("email",)),
+    }
+    result = await scan_target("someone@example.com", connectors, target_type="email")
+
+    ran = [(f.category, f.entity) for f in result["results"]]
+    assert ran == [("breach", None)]
@@ -0,0 +1,174 @@
+import uuid
+from datetime import datetime, timezone
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.db.bulk import batched
+from app.models.enums import UserRole
+from app.models.user import User
+from app.routers import scans as scans_router
+from app.schemas import ScanFinding
+from app.services.scan import (
+    ScanService,
+    SCAN_RESULT_COLUMNS,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+)
+
+
+def test_batched_splits_rows():
+    """Test that rows are split into fixed-size batches"""
+    assert [len(b) for b in batched(range(12), 5)] == [5, 5, 2]
+
+
+@pytest.mark.asyncio
+async def test_save_scan_results_copies_in_batches(monkeypatch):
+    """Test that findings are written through COPY, one call per batch"""
+    monkeypatch.setattr("app.services.scan.settings.SCAN_RESULTS_BATCH_SIZE", 2)
+    driver = MagicMock()
+    driver.copy_records_to_table = AsyncMock()
+    raw = MagicMock(driver_connection=driver)
+    connection = MagicMock()
+    connection.dialect.driver = "asyncpg"
+    connection.get_raw_connection = AsyncMock(return_value=raw)
+    db = MagicMock()
+    db.connection = AsyncMock(return_value=connection)
+    db.commit = AsyncMock()
+
+    findings = [ScanFinding(category=f"c{i}", details={"i": i}) for i in range(3)]
+    findings.append(ScanFinding(category="slow", details={}, status="timed_out"))
+    job_id = str(uuid.uuid4())
+    ids = await ScanService().save_scan_results(job_id, "example.com", findings, db)
+
+    assert len(ids) == 4
+    calls = driver.copy_records_to_table.await_args_list
+    assert [len(c.kwargs["records"]) for c in calls] == [2, 2]
+    assert calls[0].kwargs["columns"] == list(SCAN_RESULT_COLUMNS)
+    first = calls[0].kwargs["records"][0]
+    assert first[0] == ids[0] and first[3] == "c0" and first[4] == '{"i": 0}'
+    assert calls[1].kwargs["records"][1][4] == '{"scan_status": "timed_out"}'
+    db.commit.assert_awaited_once()
+
+
+def test_cursor_round_trip_and_field_projection():
+    """Test keyset cursor encoding and that projections always keep the cursor columns"""
+    created_at = datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+    result_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, result_id)) == (created_at, result_id)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+    assert parse_fields("category, penalty_score") == ("id", "category", "penalty_score", "created_at")
+    assert "raw_data" in parse_fields(None)
+    with pytest.raises(ValueError):
+        parse_fields("category,password")
+
+
+@pytest.mark.asyncio
+async def test_results_page_returns_next_cursor_only_when_more_rows():
+    """Test that a page fetches limit + 1 rows and hands out a cursor for the last one"""
+    job_id = uuid.uuid4()
+    rows = [
+        {"id": uuid.uuid4(), "category": "subdomain", "created_at": datetime(2024, 1, 1, 0, 0, i, tzinfo=timezone.utc)}
+        for i in range(3)
+    ]
+    db = MagicMock()
+    executed = MagicMock()
+    executed.mappings.return_value.all.return_value = rows
+    db.execute = AsyncMock(return_value=executed)
+
+    page, next_cursor = await ScanService().get_scan_results_page(
+        job_id, db, limit=2, fields=("id", "category", "created_at")
+    )
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1]["created_at"], rows[1]["id"])
+    stmt = db.execute.await_args.args[0]
+    assert stmt._limit_clause.value == 3
+    assert "raw_data" not in str(stmt)
+
+    executed.mappings.return_value.all.return_value = rows[2:]
+    page, next_cursor = await ScanService().get_scan_results_page(
+        job_id, db, limit=2, cursor=next_cursor, fields=("id", "category", "created_at")
+    )
+    assert page == rows[2:] and next_cursor is None
+    assert "(scan_results.created_at, scan_results.id) >" in str(db.execute.await_args.args[0])
+
+
+def _job_lookup(found):
+    """Session stub whose single lookup returns ``found`` and records the statement"""
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = found
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def _where(db):
+    stmt = db.execute.await_args.args[0]
+    return str(stmt.whereclause.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_owned_job_filters_by_owner_except_for_admins():
+    """Test that users only look up their own jobs while admins look up any"""
+    job_id = uuid.uuid4()
+    viewer = User(id=uuid.uuid4(), role=UserRole.viewer)
+    admin = User(id=uuid.uuid4(), role=UserRole.admin)
+
+    db = _job_lookup(None)
+    assert await ScanService().get_owned_job(job_id, viewer, db) is None
+    assert "scan_jobs.user_id" in _where(db)
+
+    db = _job_lookup(MagicMock())
+    assert await ScanService().get_owned_job(job_id, admin, db) is not None
+    assert "scan_jobs.user_id" not in _where(db)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("format", ["json", "ndjson"])
+async def test_results_of_another_users_job_are_not_found(format):
+    """Test that paginated and NDJSON results 404 before reading any rows"""
+    db = _job_lookup(None)
+    with pytest.raises(HTTPException) as exc:
+        await scans_router.get_scan_results(
+            str(uuid.uuid4()), limit=10, cursor=None, fields=None, format=format,
+            current_user=User(id=uuid.uuid4(), role=UserRole.viewer), db=db
+        )
+    assert exc.value.status_code == 404
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_events_of_another_users_job_are_not_found():
+    """Test that the SSE stream 404s instead of relaying someone else's scan"""
+    db = _job_lookup(None)
+    user = User(id=uuid.uuid4(), role=UserRole.viewer)
+    for job_id in (str(uuid.uuid4()), "not-a-job"):
+        with pytest.raises(HTTPException) as exc:
+            await scans_router.stream_scan_events(job_id, MagicMock(), last_event_id=None, current_user=user, db=db)
+        assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_scan_returns_the_row_id_the_task_reports_under(monkeypatch):
+    """Test that the API, the ScanJob row and the enqueued task share one job id"""
+    sent = []
+    monkeypatch.setattr("app.services.scan.celery_app.send_task", lambda name, **kw: sent.append(kw))
+    db = MagicMock()
+    db.commit = AsyncMock()
+    db.refresh = AsyncMock()
+    user = User(id=uuid.uuid4(), role=UserRole.viewer)
+
+    created = await scans_router.create_scan("example.com", current_user=user, db=db)
+
+    job = db.add.call_args.args[0]
+    assert created["job_id"] == str(job.id) == sent[0]["args"][1]
+    assert job.user_id == user.id
+
+    db = _job_lookup(job)
+    status = await scans_router.get_scan_status(created["job_id"], current_user=user, db=db)
+    assert status["job_id"] == created["job_id"] and status["target"] == "example.com"
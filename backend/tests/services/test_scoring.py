@@ -1,5 +1,14 @@
+import random
 import pytest
-from app.services.scoring import ScoringInput, calculate_oes
+from app.services.scoring import (
+    ScoringInput,
+    calculate_oes,
+    calculate_oes_batch,
+    columns_from_inputs,
+    rescore,
+    BOOL_FIELDS,
+    COUNT_FIELDS,
+)
 
 def test_perfect_score():
     """Test that a perfect input results in a score of 100"""
@@ -205,4 +214,50 @@ def test_deduction_caps():
     
     result = calculate_oes(input_data)
     assert result.deductions['D2'] == 25.0  # Should be capped at 25
-    assert result.score == 75.0  # 100 - 25 
\ No newline at end of file
+    assert result.score == 75.0  # 100 - 25
+
+
+def test_batch_matches_scalar():
+    """Test that the vectorized batch engine matches calculate_oes row for row"""
+    rng = random.Random(1234)
+    inputs = []
+    for _ in range(500):
+        row = {name: rng.random() < 0.5 for name in BOOL_FIELDS}
+        row.update({name: rng.choice([0, 1, 5, 11, 29, 30, 51, 400]) for name in COUNT_FIELDS})
+        inputs.append(ScoringInput(**row))
+
+    batch = calculate_oes_batch(columns_from_inputs(inputs))
+    assert len(batch) == len(inputs)
+    for i, input_data in enumerate(inputs):
+        assert batch.result(i) == calculate_oes(input_data)
+
+
+def test_batch_rejects_negative_counts():
+    """Test that the batch engine applies the same ge=0 validation"""
+    columns = {name: [False] for name in BOOL_FIELDS}
+    columns.update({name: [0] for name in COUNT_FIELDS})
+    columns["breach_instances"] = [-1]
+    with pytest.raises(ValueError):
+        calculate_oes_batch(columns)
+
+
+def test_rescore_only_recomputes_changed_dimensions():
+    """Unchanged dimensions keep their previous deductions"""
+    rng = random.Random(11)
+    inputs = []
+    for _ in range(2):
+        row = {name: rng.random() < 0.5 for name in BOOL_FIELDS}
+        row.update({name: rng.choice([0, 1, 5, 11, 29, 30, 51, 400]) for name in COUNT_FIELDS})
+        inputs.append(ScoringInput(**row))
+    previous = calculate_oes(inputs[0])
+
+    full = rescore(inputs[1], previous, ["D1", "D2", "D3", "D4", "D5", "D6"])
+    assert full == calculate_oes(inputs[1])
+
+    partial = rescore(inputs[1], previous, ["D2"])
+    expected = calculate_oes(inputs[1]).deductions["D2"]
+    assert partial.deductions == {**previous.deductions, "D2": expected}
+    assert partial.total_deduction == sum(partial.deductions.values())
+
+    with pytest.raises(ValueError):
+        rescore(inputs[1], previous, ["D7"])
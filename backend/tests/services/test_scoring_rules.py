@@ -0,0 +1,113 @@
+import copy
+import json
+import random
+
+import numpy as np
+import pytest
+
+from app.schemas import ScanFinding
+from app.services.features import FindingsExtractor
+from app.services.scoring import (
+    BOOL_FIELDS,
+    COUNT_FIELDS,
+    FIELD_DIMENSIONS,
+    RULES,
+    ScoringInput,
+    calculate_oes,
+    calculate_oes_batch,
+    columns_from_inputs,
+)
+from app.services.scoring_rules import RULE_SPEC, compile_rules, load_rule_spec
+
+
+def _inputs(n, seed=7):
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(n):
+        row = {name: rng.random() < 0.5 for name in BOOL_FIELDS}
+        row.update({name: rng.choice([0, 1, 9, 10, 11, 29, 30, 51]) for name in COUNT_FIELDS})
+        inputs.append(ScoringInput(**row))
+    return inputs
+
+
+def _custom_spec(version):
+    spec = copy.deepcopy(RULE_SPEC)
+    spec["version"] = version
+    spec["dimensions"]["D2"]["rules"][0] = {"field": "breach_instances", "op": "ge", "value": 3, "weight": 7.5}
+    spec["dimensions"]["D6"]["rules"] = []
+    return spec
+
+
+def test_compiled_sets_are_cached_by_version():
+    assert compile_rules(RULE_SPEC, BOOL_FIELDS, COUNT_FIELDS) is RULES
+    assert calculate_oes(_inputs(1)[0]).rules_version == RULE_SPEC["version"]
+
+    changed = copy.deepcopy(RULE_SPEC)
+    changed["dimensions"]["D1"]["cap"] = 12
+    with pytest.raises(ValueError, match="already compiled"):
+        compile_rules(changed, BOOL_FIELDS, COUNT_FIELDS)
+
+
+def test_custom_spec_scores_identically_in_scalar_and_batch():
+    rules = compile_rules(_custom_spec("test-fractional"), BOOL_FIELDS, COUNT_FIELDS)
+    inputs = _inputs(300)
+
+    batch = calculate_oes_batch(columns_from_inputs(inputs), rules=rules)
+    for i, input_data in enumerate(inputs):
+        scalar = calculate_oes(input_data, rules=rules)
+        assert batch.result(i) == scalar
+        assert scalar.deductions["D6"] == 0
+        assert scalar.rules_version == "test-fractional"
+    assert np.any(batch.deductions["D2"] % 1 == 0.5)
+
+
+def test_field_dimensions_follow_the_compiled_table():
+    assert FIELD_DIMENSIONS is RULES.field_dimensions
+    assert FIELD_DIMENSIONS["has_waf"] == ("D3",)
+
+    spec = _custom_spec("test-moved-field")
+    spec["dimensions"]["D6"]["rules"] = [{"field": "has_waf", "op": "false", "weight": 4}]
+    rules = compile_rules(spec, BOOL_FIELDS, COUNT_FIELDS)
+    assert rules.dimension_fields["D6"] == ("has_waf",)
+    assert rules.field_dimensions["has_waf"] == ("D3", "D6")
+    assert "ioc_match_count" not in rules.field_dimensions
+
+    finding = ScanFinding(category="cdn", details={"signals": {"has_waf": False}})
+    extractor = FindingsExtractor(rules).add_all([finding])
+    assert extractor.score().deductions["D3"] == 2
+    assert extractor.score().deductions["D6"] == 4
+
+
+@pytest.mark.parametrize("broken, message", [
+    ({"field": "shoe_size", "op": "gt", "value": 1, "weight": 1}, "unknown scoring field"),
+    ({"field": "has_waf", "op": "gt", "value": 1, "weight": 1}, "does not support op"),
+    ({"field": "open_ports_count", "op": "gt", "weight": 1}, "value must be a number"),
+    ({"field": "open_ports_count", "op": "gt", "value": 1, "weight": "1; import os"}, "weight must be a number"),
+])
+def test_invalid_rules_are_rejected(broken, message):
+    spec = copy.deepcopy(RULE_SPEC)
+    spec["version"] = f"test-invalid-{message}"
+    spec["dimensions"]["D3"]["rules"].append(broken)
+    with pytest.raises(ValueError, match=message):
+        compile_rules(spec, BOOL_FIELDS, COUNT_FIELDS)
+
+
+@pytest.mark.parametrize("name, message", [
+    ("D 7", "must be an identifier"),
+    ("d1", "differ only by case"),
+])
+def test_invalid_dimension_names_are_rejected(name, message):
+    spec = copy.deepcopy(RULE_SPEC)
+    spec["version"] = f"test-dimension-{name}"
+    spec["dimensions"][name] = {"cap": 5, "rules": []}
+    with pytest.raises(ValueError, match=message):
+        compile_rules(spec, BOOL_FIELDS, COUNT_FIELDS)
+
+
+def test_rule_spec_loads_from_json(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(_custom_spec("test-json")))
+
+    rules = compile_rules(load_rule_spec(str(path)), BOOL_FIELDS, COUNT_FIELDS)
+    assert rules.version == "test-json"
+    assert load_rule_spec(None) is RULE_SPEC
@@ -0,0 +1,104 @@
+import os
+import uuid
+from concurrent.futures import Future
+
+import billiard
+import pytest
+
+from app.core.config import settings
+from app.services import report_render
+from app.services.report_render import build_report_context
+from app.tasks import report as report_tasks
+from app.utils.crypto import is_encrypted
+from app.utils.files import atomic_write
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_OUTPUT_DIR", str(tmp_path))
+    saved, rendered = [], []
+    rows = [{"category": "whois", "raw_data": {"registrar": "R", "privacy": False}, "penalty_score": 0.0}]
+
+    async def load_context(job_id):
+        return build_report_context({"id": job_id, "target": "example.com"}, rows)
+
+    async def save_report(job_id, pdf_path, html_path, overall_score, metadata):
+        saved.append((pdf_path, html_path, overall_score, metadata))
+
+    def submit_pdf(html, path, key=None):
+        rendered.append(html)
+        future = Future()
+        future.set_result(atomic_write(path, b"%PDF-1.7 fake", key))
+        return future
+
+    monkeypatch.setattr(report_tasks, "_load_context", load_context)
+    monkeypatch.setattr(report_tasks, "_save_report", save_report)
+    monkeypatch.setattr(report_tasks, "submit_pdf", submit_pdf)
+    return saved, rendered
+
+
+def test_generate_report_writes_hash_named_files(pipeline):
+    saved, rendered = pipeline
+
+    result = report_tasks.generate_report.apply(args=[str(uuid.uuid4()), "r1", "pdf"]).get()
+
+    assert result["status"] == "completed" and not result["cached"]
+    assert result["overall_score"] == 98.0
+    pdf_path, html_path, _, metadata = saved[0]
+    assert os.path.basename(pdf_path) == f"{metadata['content_hashes']['pdf']}.pdf"
+    with open(pdf_path, "rb") as f:
+        assert f.read() == b"%PDF-1.7 fake"
+    assert "example.com" in open(html_path, encoding="utf-8").read()
+    assert os.path.exists(html_path + ".gz")
+    assert len(rendered) == 1
+
+
+def test_identical_report_is_served_from_cache(pipeline):
+    saved, rendered = pipeline
+
+    first = report_tasks.generate_report.apply(args=[str(uuid.uuid4()), "r1", "pdf"]).get()
+    second = report_tasks.generate_report.apply(args=[str(uuid.uuid4()), "r2", "html"]).get()
+
+    assert second["cached"] and saved[1][3]["cached"]
+    assert len(rendered) == 1
+    assert saved[0][0] == saved[1][0] and first["content_hash"] != second["content_hash"]
+
+
+def test_reports_are_encrypted_at_rest_when_keyed(pipeline, monkeypatch):
+    saved, _ = pipeline
+    monkeypatch.setattr(settings, "REPORT_ENCRYPTION_KEY", "00" * 32)
+
+    result = report_tasks.generate_report.apply(args=[str(uuid.uuid4()), "r1", "html"]).get()
+
+    pdf_path, html_path, _, metadata = saved[0]
+    assert metadata["encrypted"]
+    assert all(is_encrypted(p) for p in (pdf_path, html_path, html_path + ".gz"))
+    assert result["file_size"] == metadata["sizes"]["html"] < os.path.getsize(html_path)
+
+
+def _submit_in_daemon(path, results):
+    try:
+        results.put(("ok", report_render.submit_pdf("<p>report</p>", path).result(timeout=30)))
+    except Exception as exc:
+        results.put(("error", repr(exc)))
+
+
+def test_submit_pdf_renders_inline_in_daemonic_prefork_children(tmp_path, monkeypatch):
+    """Celery prefork children are daemonic and cannot start a PDF process pool"""
+    monkeypatch.setattr(settings, "REPORT_PDF_WORKERS", 2)
+    monkeypatch.setattr(report_render, "_pool", None)
+    monkeypatch.setattr(
+        report_render, "html_to_pdf_file",
+        lambda html, path, key=None: atomic_write(path, b"%PDF-1.7 " + html.encode(), key)
+    )
+    path = os.path.join(tmp_path, "report.pdf")
+    results = billiard.get_context("fork").Queue()
+
+    child = billiard.get_context("fork").Process(target=_submit_in_daemon, args=(path, results), daemon=True)
+    child.start()
+    outcome = results.get(timeout=60)
+    child.join()
+
+    assert outcome == ("ok", len(b"%PDF-1.7 <p>report</p>"))
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-1.7 <p>report</p>"
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from app.worker import (
+    MAINTENANCE_QUEUE,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    REPORT_QUEUE,
+    SCAN_QUEUE,
+    WORKER_PROFILES,
+    celery_app,
+    worker_argv,
+)
+
+
+def _route(name):
+    return celery_app.amqp.router.route({}, name, args=(), kwargs={})
+
+
+@pytest.mark.parametrize("task, queue, priority", [
+    ("app.tasks.scan.run_scan", SCAN_QUEUE, PRIORITY_INTERACTIVE),
+    ("app.tasks.scan.run_scan_batch", SCAN_QUEUE, PRIORITY_BULK),
+    ("app.tasks.report.generate_report", REPORT_QUEUE, PRIORITY_INTERACTIVE),
+    ("app.tasks.scan.cleanup_old_scans", MAINTENANCE_QUEUE, PRIORITY_BULK),
+    ("app.tasks.report.cleanup_old_reports", MAINTENANCE_QUEUE, PRIORITY_BULK),
+])
+def test_tasks_route_to_their_queue(task, queue, priority):
+    route = _route(task)
+    assert route["queue"].name == queue
+    assert route["priority"] == priority
+
+
+def test_profiles_consume_disjoint_queues():
+    queues = [q for profile in WORKER_PROFILES.values() for q in profile["queues"]]
+    assert sorted(queues) == sorted({SCAN_QUEUE, REPORT_QUEUE, MAINTENANCE_QUEUE})
+    assert WORKER_PROFILES["report"]["pool"] == "prefork"
+    assert "--queues=scan" in worker_argv("scan") and "--pool=threads" in worker_argv("scan")
+
+
+def test_worker_loop_is_shared_by_task_threads():
+    from app.services.scan import close_worker_loop, get_worker_loop, run_in_worker_loop
+    import asyncio
+
+    async def which_loop():
+        await asyncio.sleep(0.01)
+        return asyncio.get_running_loop()
+
+    loops = []
+    threads = [threading.Thread(target=lambda: loops.append(run_in_worker_loop(which_loop()))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, loops))) == 1 and loops[0] is get_worker_loop()
+    close_worker_loop()
+    assert loops[0].is_closed()
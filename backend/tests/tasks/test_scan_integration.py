@@ -1,10 +1,45 @@
 import pytest
 from unittest.mock import MagicMock, AsyncMock
+from app.connectors.base import BaseConnector
+from app.models.scan_job import ScanStatus
 from app.schemas import ScanFinding
-from app.services.scan import scan_target
+from app.services.rescan import PreviousScan
+from app.services.scan import finding_from_row, finding_raw_data, scan_target
+from app.tasks import scan as scan_tasks
 from app.tasks.scan import run_scan
 
 
+@pytest.fixture
+def scan_store(monkeypatch):
+    """In-memory stand-in for the scan_jobs/scan_results tables the task writes"""
+    store = {"status": {}, "rows": {}}
+
+    async def update_status(job_id, status, progress=0, error_message=None):
+        store["status"][job_id] = status
+
+    async def save_scan(job_id, target, findings):
+        store["rows"][job_id] = [
+            {"domain_or_email": f.entity or target, "category": f.category, "raw_data": finding_raw_data(f)}
+            for f in findings
+        ]
+        store["status"][job_id] = ScanStatus.done
+
+    async def load_previous_scan(target, target_type, job_id):
+        done = [j for j, status in store["status"].items() if status == ScanStatus.done and j != job_id]
+        if not done:
+            return None
+        previous = PreviousScan(job_id=done[-1])
+        for row in store["rows"][done[-1]]:
+            finding = finding_from_row(row, target)
+            previous.findings[(finding.category, finding.entity)] = finding
+        return previous
+
+    monkeypatch.setattr(scan_tasks, "_update_status", update_status)
+    monkeypatch.setattr(scan_tasks, "_save_scan", save_scan)
+    monkeypatch.setattr(scan_tasks, "_load_previous_scan", load_previous_scan)
+    return store
+
+
 @pytest.mark.asyncio
 async def test_scan_task_with_connectors():
     """Test that scan task integrates with connectors and scoring"""
@@ -20,7 +55,7 @@ async def test_scan_task_with_connectors():
     
     # Check that the task completed successfully
     assert result["status"] == "completed"
-    assert result["overall_score"] == 90.0  # 100 - 10 (default penalty)
+    assert result["overall_score"] == 100.0  # No signals, so no deductions
     assert len(result["results"]) == 1
 
 
@@ -41,7 +76,182 @@ def test_scan_task_handles_connector_errors():
     assert len(result["results"]) == 0
 
 
-def test_run_scan_celery_wiring():
+def test_run_scan_celery_wiring(scan_store):
     result = run_scan.apply(args=["example.com", "jobid", "domain"]).get()
     assert isinstance(result, dict)
-    assert "status" in result 
\ No newline at end of file
+    assert "status" in result
+    assert scan_store["status"]["jobid"] == ScanStatus.done
+
+
+class CountingConnector(BaseConnector):
+    """Connector whose data stays fresh for an hour"""
+    name = "whois"
+    data_ttl = 3600
+
+    def __init__(self):
+        self.fetches = 0
+
+    async def fetch(self, target, runtime=None):
+        self.fetches += 1
+        return {"registrar": "a"}
+
+    def normalize(self, raw):
+        return ScanFinding(category=self.name, details=raw)
+
+
+def test_second_run_reuses_first_runs_findings(scan_store):
+    conn = CountingConnector()
+
+    first = run_scan.apply(args=["example.com", "job-1", "domain", {"whois": conn}]).get()
+    second = run_scan.apply(
+        args=["example.com", "job-2", "domain", {"whois": conn}], kwargs={"incremental": True}
+    ).get()
+
+    assert conn.fetches == 1
+    assert "incremental" not in first
+    assert second["incremental"]["previous_job_id"] == "job-1"
+    assert second["incremental"]["reused"] == 1
+    assert second["results"][0].details == {"registrar": "a"}
+    assert scan_store["status"] == {"job-1": ScanStatus.done, "job-2": ScanStatus.done}
+
+
+def _slow_connector(name, delay, timeout=None):
+    """Build a mocked connector whose fetch takes `delay` seconds"""
+    import asyncio
+
+    async def fetch(target, runtime=None):
+        await asyncio.sleep(delay)
+        return {"raw": {"domain": target}}
+
+    mock_connector = MagicMock()
+    mock_connector.fetch = fetch
+    mock_connector.normalize = MagicMock(return_value=ScanFinding(category=name, details={}))
+    mock_connector.name = name
+    mock_connector.timeout = timeout
+    return mock_connector
+
+
+@pytest.mark.asyncio
+async def test_scan_marks_slow_connector_timed_out():
+    """Test that a connector past its deadline is reported without blocking the scan"""
+    connectors = {
+        "fast": _slow_connector("fast", 0, timeout=1),
+        "stuck": _slow_connector("stuck", 10, timeout=0.05),
+    }
+    result = await scan_target("example.com", connectors)
+
+    statuses = {f.category: f.status for f in result["results"]}
+    assert statuses == {"fast": "completed", "stuck": "timed_out"}
+
+
+@pytest.mark.asyncio
+async def test_scan_returns_partial_results_at_scan_deadline():
+    """Test that the whole-scan deadline cancels stragglers and keeps finished findings"""
+    connectors = {
+        "fast": _slow_connector("fast", 0, timeout=5),
+        "slow": _slow_connector("slow", 10, timeout=30),
+    }
+    result = await scan_target("example.com", connectors, scan_timeout=0.1)
+
+    assert result["status"] == "partial"
+    statuses = {f.category: f.status for f in result["results"]}
+    assert statuses == {"fast": "completed", "slow": "timed_out"}
+
+
+@pytest.mark.asyncio
+async def test_scan_respects_concurrency_budget():
+    """Test that the shared semaphore caps connectors running at once"""
+    import asyncio
+
+    running = 0
+    peak = 0
+
+    def counting_connector(name):
+        async def fetch(target, runtime=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {}
+
+        conn = _slow_connector(name, 0)
+        conn.fetch = fetch
+        return conn
+
+    connectors = {f"c{i}": counting_connector(f"c{i}") for i in range(6)}
+    result = await scan_target("example.com", connectors, semaphore=asyncio.Semaphore(2))
+
+    assert len(result["results"]) == 6
+    assert peak == 2
+
+
+def test_run_scan_batch_streams_every_target():
+    """Test that the batch task scans each target and reports per-target results"""
+    from app.tasks.scan import run_scan_batch
+
+    targets = [f"site{i}.example.com" for i in range(20)]
+    connectors = {"fast": _slow_connector("fast", 0.01, timeout=5)}
+    result = run_scan_batch.apply(args=[targets, "domain", connectors]).get()
+
+    assert result["status"] == "completed"
+    assert set(result["results"]) == set(targets)
+    assert all(r["status"] == "completed" for r in result["results"].values())
+    assert result["results"]["site0.example.com"]["results"][0]["category"] == "fast"
+
+
+def test_scan_target_sync_reuses_worker_loop():
+    """Test that sync scans share one event loop instead of creating one per call"""
+    from app.services.scan import scan_target_sync, get_worker_loop
+
+    connectors = {"fast": _slow_connector("fast", 0, timeout=5)}
+    scan_target_sync("a.example.com", connectors)
+    loop = get_worker_loop()
+    scan_target_sync("b.example.com", connectors)
+    assert get_worker_loop() is loop
+
+
+@pytest.mark.asyncio
+async def test_scan_injects_shared_runtime():
+    """Test that every connector fetch receives the loop's shared connector runtime"""
+    from app.connectors.runtime import get_connector_runtime
+
+    mock_connector = MagicMock()
+    mock_connector.fetch = AsyncMock(return_value={})
+    mock_connector.normalize = MagicMock(return_value=ScanFinding(category="whois", details={}))
+    mock_connector.timeout = 5
+
+    await scan_target("a.example.com", {"whois": mock_connector})
+    await scan_target("b.example.com", {"whois": mock_connector})
+
+    runtimes = [call.kwargs["runtime"] for call in mock_connector.fetch.call_args_list]
+    assert runtimes[0] is runtimes[1] is get_connector_runtime()
+
+
+@pytest.mark.asyncio
+async def test_scan_reports_each_finding_as_it_completes():
+    """Test that on_finding is awaited per finished connector with progress counts"""
+    seen = []
+
+    async def on_finding(finding, completed, total):
+        seen.append((finding.category, completed, total))
+
+    connectors = {
+        "fast": _slow_connector("fast", 0, timeout=5),
+        "slower": _slow_connector("slower", 0.02, timeout=5),
+    }
+    await scan_target("example.com", connectors, on_finding=on_finding)
+
+    assert seen == [("fast", 1, 2), ("slower", 2, 2)]
+
+
+def test_thread_pool_shutdown_closes_scan_loop():
+    """Test that worker_shutdown (all a threads-pool worker sends) closes the scan loop"""
+    from celery.signals import worker_shutdown
+    from app.services.scan import get_worker_loop
+
+    loop = get_worker_loop()
+    worker_shutdown.send(sender=None)
+
+    assert loop.is_closed()
+    assert get_worker_loop() is not loop
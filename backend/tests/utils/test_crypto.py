@@ -0,0 +1,91 @@
+import io
+import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from app.utils.crypto import (
+    HEADER_SIZE,
+    SegmentEncryptor,
+    TAG_SIZE,
+    decrypt_range,
+    load_key,
+    plaintext_size,
+    stored_size,
+)
+
+KEY = bytes(range(32))
+SEGMENT = 64
+
+
+def _encrypt(tmp_path, data, name="f.enc"):
+    path = tmp_path / name
+    with open(path, "wb") as f:
+        encryptor = SegmentEncryptor(f, KEY, SEGMENT)
+        # Uneven writes exercise the segment buffering
+        for i in range(0, len(data), 50):
+            encryptor.write(data[i:i + 50])
+        encryptor.close()
+    return str(path)
+
+
+def _decrypt(path, start=0, count=None):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size, _ = stored_size(path)
+        count = size - start if count is None else count
+        return b"".join(decrypt_range(fd, KEY, start, count))
+    finally:
+        os.close(fd)
+
+
+@pytest.mark.parametrize("length", [0, 1, SEGMENT, SEGMENT * 3, SEGMENT * 3 + 7])
+def test_round_trip(tmp_path, length):
+    data = os.urandom(length)
+    path = _encrypt(tmp_path, data)
+
+    assert stored_size(path) == (length, True)
+    assert plaintext_size(os.path.getsize(path), SEGMENT) == length
+    assert _decrypt(path) == data
+
+
+def test_range_reads_only_cover_requested_bytes(tmp_path):
+    data = os.urandom(SEGMENT * 5 + 3)
+    path = _encrypt(tmp_path, data)
+
+    assert _decrypt(path, 10, 5) == data[10:15]
+    assert _decrypt(path, SEGMENT - 2, SEGMENT + 4) == data[SEGMENT - 2:2 * SEGMENT + 2]
+    assert _decrypt(path, len(data) - 3, 3) == data[-3:]
+
+
+def test_tampering_is_detected(tmp_path):
+    path = _encrypt(tmp_path, os.urandom(SEGMENT * 2))
+    with open(path, "r+b") as f:
+        f.seek(HEADER_SIZE + 5)
+        byte = f.read(1)
+        f.seek(HEADER_SIZE + 5)
+        f.write(bytes([byte[0] ^ 1]))
+
+    with pytest.raises(InvalidTag):
+        _decrypt(path)
+
+
+def test_truncation_is_detected(tmp_path):
+    path = _encrypt(tmp_path, os.urandom(SEGMENT * 3))
+    os.truncate(path, os.path.getsize(path) - (SEGMENT + TAG_SIZE))
+
+    with pytest.raises(InvalidTag):
+        _decrypt(path)
+
+
+def test_plaintext_files_pass_through(tmp_path):
+    path = tmp_path / "plain.pdf"
+    path.write_bytes(b"%PDF")
+    assert stored_size(str(path)) == (4, False)
+
+
+def test_load_key():
+    assert load_key("") is None
+    assert load_key("00" * 16) == bytes(16)
+    with pytest.raises(ValueError):
+        load_key("too-short")
@@ -0,0 +1,178 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.orm import Session
+
+from app.models.enums import UserRole
+from app.models.user import User
+from app.services.auth import create_access_token, verify_token
+from app.routers import reports as reports_router
+from app.services import principals
+from app.services.principals import PrincipalCache
+from app.utils import dependencies
+
+
+def _user(**overrides):
+    fields = dict(
+        id=uuid.uuid4(), email="a@example.com", hashed_password="x",
+        role=UserRole.viewer, is_active=True, created_at=datetime(2024, 1, 1),
+    )
+    fields.update(overrides)
+    return User(**fields)
+
+
+@pytest.fixture
+def principal_cache(fake_redis, monkeypatch):
+    cache = PrincipalCache(redis=fake_redis)
+    monkeypatch.setattr(dependencies, "get_principal_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def db_lookups(monkeypatch):
+    users, calls = {}, []
+
+    async def fake_get_user_by_id(db, user_id):
+        calls.append(user_id)
+        return users.get(user_id)
+
+    monkeypatch.setattr(dependencies, "get_user_by_id", fake_get_user_by_id)
+    return users, calls
+
+
+def test_access_token_carries_iat():
+    payload = verify_token(create_access_token({"sub": "u1"}))
+    assert isinstance(payload["iat"], int)
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_database(principal_cache, db_lookups):
+    users, calls = db_lookups
+    user = _user()
+    users[str(user.id)] = user
+    token = create_access_token({"sub": str(user.id)})
+
+    first = await dependencies.get_current_user(token, db=None)
+    await asyncio.sleep(0)  # let the invalidation listener subscribe
+    second = await dependencies.get_current_user(token, db=None)
+    third = await dependencies.get_current_user(token, db=None)
+
+    assert calls == [str(user.id)]
+    assert first.email == second.email == third.email == "a@example.com"
+    assert third.role == UserRole.viewer and str(third.id) == str(user.id)
+
+
+@pytest.mark.asyncio
+async def test_invalidation_forces_fresh_lookup(principal_cache, db_lookups):
+    users, calls = db_lookups
+    user = _user()
+    users[str(user.id)] = user
+    token = create_access_token({"sub": str(user.id)})
+
+    await dependencies.get_current_user(token, db=None)
+    await asyncio.sleep(0)
+    users[str(user.id)] = _user(id=user.id, is_active=False)
+    await principal_cache.invalidate(str(user.id))
+
+    with pytest.raises(Exception) as exc:
+        await dependencies.get_current_user(token, db=None)
+    assert getattr(exc.value, "status_code", None) == 401
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_other_process_invalidation_drops_local_copy(fake_redis):
+    ours, theirs = PrincipalCache(redis=fake_redis), PrincipalCache(redis=fake_redis)
+    await ours.get("u1", 0)
+    await asyncio.sleep(0)
+    await ours.set("u1", 7, {"id": "u1"})
+    assert ours._local
+
+    await theirs.invalidate("u1")
+    await asyncio.sleep(0)
+    assert not ours._local
+    assert await ours.get("u1", 7) is None
+
+
+@pytest.fixture
+def user_session():
+    """Session on an in-memory users table (SQLite cannot render the Postgres DDL)"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id CHAR(32) PRIMARY KEY, email VARCHAR, hashed_password VARCHAR,"
+            " role VARCHAR, is_active BOOLEAN, created_at DATETIME)"
+        ))
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+async def _cached(cache, user_id):
+    await asyncio.sleep(0)
+    return await cache.redis.hget(cache.key(user_id), "1") is not None
+
+
+@pytest.mark.asyncio
+async def test_principals_are_invalidated_only_once_changes_commit(fake_redis, monkeypatch, user_session):
+    cache = PrincipalCache(redis=fake_redis)
+    monkeypatch.setattr(principals, "_cache", cache)
+    user = _user()
+    user_id = str(user.id)
+    user_session.add(user)
+    user_session.commit()
+    await cache.set(user_id, 1, principals.principal_from_user(user))
+
+    user.is_active = False
+    user_session.flush()
+    assert await _cached(cache, user_id)
+    user_session.commit()
+    assert not await _cached(cache, user_id)
+
+    # Bulk updates bypass mapper events; rolled back changes keep the cache
+    await cache.set(user_id, 1, principals.principal_from_user(user))
+    user_session.execute(update(User).where(User.email == user.email).values(role=UserRole.admin))
+    user_session.rollback()
+    assert await _cached(cache, user_id)
+    user_session.execute(update(User).where(User.email == user.email).values(role=UserRole.admin))
+    user_session.commit()
+    assert not await _cached(cache, user_id)
+
+
+def _no_job():
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = None
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_malformed_or_foreign_job_ids_are_not_found():
+    db = _no_job()
+    for job_id in ("not-a-job", str(uuid.uuid4())):
+        with pytest.raises(HTTPException) as exc:
+            await dependencies.get_owned_scan_job(job_id, _user(), db)
+        assert exc.value.status_code == 404
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_reports_of_another_users_job_are_not_found(monkeypatch):
+    service = MagicMock(side_effect=AssertionError("report must not be looked up"))
+    monkeypatch.setattr(reports_router, "ReportService", service)
+    calls = [
+        lambda job_id, db: reports_router.get_report_metadata(job_id, current_user=_user(), db=db),
+        lambda job_id, db: reports_router.download_report(job_id, MagicMock(), format="pdf", current_user=_user(), db=db),
+        lambda job_id, db: reports_router.generate_report(job_id, "pdf", current_user=_user(), db=db),
+    ]
+    for call in calls:
+        for job_id in ("not-a-job", str(uuid.uuid4())):
+            with pytest.raises(HTTPException) as exc:
+                await call(job_id, _no_job())
+            assert exc.value.status_code == 404
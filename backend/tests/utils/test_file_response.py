@@ -0,0 +1,147 @@
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.utils.file_response import RangeFileResponse, accepted_encodings, conditional_file_response, parse_range, RangeNotSatisfiable
+from app.utils.files import write_precompressed
+
+BODY = bytes(range(256)) * 40
+HASH = "ab" * 32
+
+
+@pytest.fixture
+def client(tmp_path):
+    pdf = tmp_path / f"{HASH}.pdf"
+    pdf.write_bytes(BODY)
+    html = tmp_path / f"{HASH}.html"
+    html_body = b"<html>" + b"report " * 500 + b"</html>"
+    html.write_bytes(html_body)
+    write_precompressed(str(html), html_body)
+
+    app = FastAPI()
+
+    @app.api_route("/pdf", methods=["GET", "HEAD"])
+    async def pdf_route(request: Request):
+        return conditional_file_response(request, str(pdf), HASH, "application/pdf", filename="r.pdf")
+
+    @app.get("/html")
+    async def html_route(request: Request):
+        return conditional_file_response(request, str(html), HASH, "text/html", precompressed=True)
+
+    return TestClient(app)
+
+
+def test_full_download_carries_strong_etag(client):
+    response = client.get("/pdf")
+
+    assert response.status_code == 200 and response.content == BODY
+    assert response.headers["etag"] == f'"{HASH}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(BODY))
+
+
+def test_if_none_match_returns_304(client):
+    response = client.get("/pdf", headers={"If-None-Match": f'W/"other", "{HASH}"'})
+
+    assert response.status_code == 304 and response.content == b""
+
+
+def test_range_request_returns_partial_content(client):
+    response = client.get("/pdf", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.content == BODY[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(BODY)}"
+
+    assert client.get("/pdf", headers={"Range": "bytes=-10"}).content == BODY[-10:]
+    unsatisfiable = client.get("/pdf", headers={"Range": f"bytes={len(BODY)}-"})
+    assert unsatisfiable.status_code == 416
+
+
+def test_stale_if_range_sends_whole_file(client):
+    response = client.get("/pdf", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+
+    assert response.status_code == 200 and response.content == BODY
+
+
+def test_head_sends_headers_only(client):
+    response = client.head("/pdf")
+
+    assert response.status_code == 200 and response.content == b""
+    assert response.headers["content-length"] == str(len(BODY))
+
+
+def test_html_served_precompressed(client):
+    gz = client.get("/html", headers={"Accept-Encoding": "gzip"})
+    br = client.get("/html", headers={"Accept-Encoding": "gzip, br"})
+    identity = client.get("/html", headers={"Accept-Encoding": "identity"})
+
+    assert gz.headers["content-encoding"] == "gzip" and gz.headers["etag"] == f'"{HASH}-gzip"'
+    assert gz.content.startswith(b"<html>")
+    assert br.headers.get("content-encoding") in ("br", "gzip")
+    assert "content-encoding" not in identity.headers
+    assert gz.headers["vary"] == "Accept-Encoding"
+    assert int(gz.headers["content-length"]) < len(identity.content)
+
+
+def test_malformed_quality_is_not_acceptable(client):
+    assert accepted_encodings("gzip;q=abc, br;q=nan, deflate;q=, identity;q=0.5") == {"identity"}
+
+    response = client.get("/html", headers={"Accept-Encoding": "gzip;q=abc"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_parse_range_edge_cases():
+    assert parse_range(None, 10) is None
+    assert parse_range("bytes=0-1,4-5", 10) is None
+    assert parse_range("bytes=5-", 10) == (5, 9)
+    assert parse_range("bytes=5-100", 10) == (5, 9)
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=7-3", 10)
+
+
+@pytest.mark.asyncio
+async def test_zero_copy_extension_is_used(tmp_path):
+    path = tmp_path / "f.bin"
+    path.write_bytes(BODY)
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            sent.append(os.pread(message["file"], message["count"], message["offset"]))
+        else:
+            sent.append(message)
+
+    scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+    await RangeFileResponse(str(path), 10, 20, status_code=206)(scope, None, send)
+
+    assert sent[0]["status"] == 206
+    assert sent[1] == BODY[10:30]
+
+
+def test_encrypted_file_is_decrypted_for_ranges(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.utils.files import atomic_write
+
+    monkeypatch.setattr(settings, "REPORT_ENCRYPTION_KEY", "11" * 32)
+    monkeypatch.setattr(settings, "REPORT_ENCRYPTION_SEGMENT_SIZE", 1000)
+    path = tmp_path / f"{HASH}.pdf"
+    atomic_write(str(path), BODY, bytes.fromhex("11" * 32))
+
+    app = FastAPI()
+
+    @app.get("/enc")
+    async def enc_route(request: Request):
+        return conditional_file_response(request, str(path), HASH, "application/pdf")
+
+    client = TestClient(app)
+    full = client.get("/enc")
+    partial = client.get("/enc", headers={"Range": "bytes=990-2010"})
+
+    assert full.content == BODY and full.headers["content-length"] == str(len(BODY))
+    assert partial.status_code == 206 and partial.content == BODY[990:2011]
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.utils.security import PasswordHasher, verify_password
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(kind="thread", workers=2, max_concurrency=2)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip(hasher):
+    hashed = await hasher.hash("s3cret")
+    assert verify_password("s3cret", hashed)
+    assert await hasher.verify("s3cret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_burst(hasher):
+    hashed = await hasher.hash("s3cret")
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    tick_task = asyncio.create_task(ticker())
+    results = await asyncio.gather(*(hasher.verify("s3cret", hashed) for _ in range(8)))
+    tick_task.cancel()
+
+    assert all(results)
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    assert gaps and max(gaps) < 0.15
+    assert hasher.metrics["max_queued"] >= 6
+    assert hasher.metrics["queued"] == 0 and hasher.metrics["in_flight"] == 0
+    assert hasher.metrics["completed"] == 9
+
+
+@pytest.mark.asyncio
+async def test_outdated_cost_is_rehashed(hasher):
+    weak = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("s3cret")
+
+    matches, new_hash = await hasher.verify_and_update("s3cret", weak)
+
+    assert matches and new_hash is not None and new_hash != weak
+    assert await hasher.verify_and_update("s3cret", new_hash) == (True, None)
+    assert hasher.metrics["rehashed"] == 1